@@ -0,0 +1,21 @@
+"""
+Banc d'essai des performances du générateur de SKU
+
+    python -m benchmarks --rows 2000 --output benchmarks/results/v2.json
+    python -m benchmarks --rows 2000 --compare benchmarks/results/v1.json
+
+synthetic_bom: BOM synthétiques déterministes (taille, types, doublons, ELEC/MECA)
+scenarios: scénarios chronométrés, résultats JSON et comparaison entre versions
+"""
+
+from benchmarks.scenarios import SCENARIOS, compare_results, run_benchmarks
+from benchmarks.synthetic_bom import SyntheticBOMSpec, generate_bom, write_synthetic_bom
+
+__all__ = [
+    'SCENARIOS',
+    'SyntheticBOMSpec',
+    'compare_results',
+    'generate_bom',
+    'run_benchmarks',
+    'write_synthetic_bom',
+]
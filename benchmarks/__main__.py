@@ -0,0 +1,54 @@
+"""
+Point d'entrée: python -m benchmarks [--rows N] [--output FICHIER] [--compare FICHIER]
+"""
+
+import argparse
+import logging
+import sys
+
+from benchmarks.scenarios import SCENARIOS, compare_results, load_results, run_benchmarks
+from benchmarks.synthetic_bom import SyntheticBOMSpec
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Banc d'essai des performances du pipeline SKU")
+    parser.add_argument("--rows", type=int, default=1000, help="Lignes du BOM synthétique")
+    parser.add_argument("--electrical-ratio", type=float, default=0.4, help="Part de lignes électriques")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.1, help="Part de lignes en double")
+    parser.add_argument("--seed", type=int, default=42, help="Graine du générateur")
+    parser.add_argument("--repeat", type=int, default=3, help="Exécutions par scénario")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                        help="Scénario à exécuter (répétable; défaut: tous)")
+    parser.add_argument("--output", help="Fichier JSON des résultats")
+    parser.add_argument("--compare", help="Résultats JSON de référence à comparer")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Écart toléré avant régression")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    spec = SyntheticBOMSpec(rows=args.rows, electrical_ratio=args.electrical_ratio,
+                            duplicate_ratio=args.duplicate_ratio, seed=args.seed)
+    results = run_benchmarks(spec, args.scenario, args.repeat, args.output)
+
+    print(f"⏱️ BANC D'ESSAI ({spec.rows} lignes, {args.repeat} exécutions)")
+    print("=" * 60)
+    for name, measure in results['scenarios'].items():
+        print(f"{name:<18} {measure['min']:>9.3f} s  {measure['elements_par_seconde'] or 0:>10.0f} él./s")
+    if args.output:
+        print(f"📁 Résultats: {args.output}")
+
+    if args.compare:
+        rows = compare_results(load_results(args.compare), results, args.threshold)
+        print("\nComparaison avec la référence:")
+        for row in rows:
+            flag = "❌ RÉGRESSION" if row['regression'] else "✅"
+            print(f"{row['scenario']:<18} {row['avant']:>9.3f} s -> {row['apres']:>9.3f} s "
+                  f"({row['ecart']:+.1%}) {flag}")
+        if any(row['regression'] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""
+Scénarios chronométrés du pipeline SKU
+
+Chaque scénario prépare son état (base SQLite neuve, cache des BOM vidé) hors
+chronométrage, puis mesure une seule opération. Les résultats sont enregistrés
+en JSON (environnement, spécification du BOM, temps par exécution) pour être
+comparés d'une version à l'autre avec compare_results.
+"""
+
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from benchmarks.synthetic_bom import SyntheticBOMSpec, write_synthetic_bom
+from bom_analyzer import BOMComparator
+from bom_cache import bom_cache
+from main import BOMProcessor
+from odoo_integration import ODOOIntegration
+from sku_generator import SKUGenerator
+
+logger = logging.getLogger(__name__)
+
+RESULTS_FORMAT_VERSION = 1
+
+
+class BenchmarkContext:
+    """Fichiers partagés par les scénarios d'une exécution du banc d'essai"""
+
+    def __init__(self, work_dir: str, spec: SyntheticBOMSpec):
+        self.work_dir = work_dir
+        self.spec = spec
+        self.bom_file = os.path.join(work_dir, "BOM_synthetique.xlsx")
+        self.sheets = write_synthetic_bom(self.bom_file, spec)
+        self._db_count = 0
+
+    def fresh_generator(self) -> SKUGenerator:
+        """Base SKU vide, propre à une exécution"""
+        self._db_count += 1
+        return SKUGenerator(os.path.join(self.work_dir, f"bench_{self._db_count}.db"))
+
+    def components(self, generator: SKUGenerator):
+        processor = BOMProcessor(generator)
+        return (processor.extract_electrical_components(self.sheets['BOM Électrique'])
+                + processor.extract_mechanical_components(self.sheets['BOM Mécanique']))
+
+
+# Un scénario: setup(context) -> état, puis run(état) -> nombre d'éléments traités (chronométré)
+Scenario = Dict[str, Callable]
+
+
+def _normalize_setup(context: BenchmarkContext):
+    generator = context.fresh_generator()
+    texts = (list(context.sheets['BOM Électrique']['ComponentType'])
+             + list(context.sheets['BOM Mécanique']['Type'])
+             + list(context.sheets['BOM Électrique']['Description']))
+    return generator, texts
+
+
+def _normalize_run(state) -> int:
+    generator, texts = state
+    for text in texts:
+        generator.normalize_text(text, generator.sous_famille_length)
+    return len(texts)
+
+
+def _generate_setup(context: BenchmarkContext):
+    generator = context.fresh_generator()
+    return generator, context.components(generator)
+
+
+def _generate_run(state) -> int:
+    generator, components = state
+    for component in components:
+        generator.generate_sku(component)
+    return len(components)
+
+
+def _process_setup(context: BenchmarkContext):
+    bom_cache.clear()
+    return BOMProcessor(context.fresh_generator()), context.bom_file
+
+
+def _process_run(state) -> int:
+    processor, bom_file = state
+    results = processor.process_bom_file(bom_file)
+    return sum(len(df) for df in results.values())
+
+
+def _analyze_setup(context: BenchmarkContext):
+    # Base déjà alimentée par le BOM: l'analyse retrouve les composants existants
+    generator = context.fresh_generator()
+    BOMProcessor(generator).process_bom_file(context.bom_file)
+    bom_cache.clear()
+    return BOMComparator(generator), context.bom_file
+
+
+def _analyze_run(state) -> int:
+    comparator, bom_file = state
+    analysis = comparator.analyze_new_bom(bom_file)
+    return analysis['nouveau'] + analysis['existant']
+
+
+def _odoo_setup(context: BenchmarkContext):
+    generator = context.fresh_generator()
+    results = BOMProcessor(generator).process_bom_file(context.bom_file)
+    return ODOOIntegration(), results, os.path.join(context.work_dir, "bench_odoo.csv")
+
+
+def _odoo_run(state) -> int:
+    integration, results, output_file = state
+    count, _ = integration.export_to_odoo_csv(results, output_file)
+    return count
+
+
+# Démarrage à froid: un interpréteur neuf importe le point d'entrée (pandas et NumPy
+# ne doivent être chargés qu'au premier traitement, voir lazy_imports.py)
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _startup_setup(module: str):
+    def setup(context: BenchmarkContext):
+        return [sys.executable, "-c", f"import {module}"]
+    return setup
+
+
+def _startup_run(command) -> int:
+    subprocess.run(command, cwd=REPO_DIR, check=True, capture_output=True)
+    return 1
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    'normalize_text': {'setup': _normalize_setup, 'run': _normalize_run},
+    'generate_sku': {'setup': _generate_setup, 'run': _generate_run},
+    'process_bom_file': {'setup': _process_setup, 'run': _process_run},
+    'analyze_new_bom': {'setup': _analyze_setup, 'run': _analyze_run},
+    'odoo_export': {'setup': _odoo_setup, 'run': _odoo_run},
+    'startup_gui': {'setup': _startup_setup('gui'), 'run': _startup_run},
+    'startup_main': {'setup': _startup_setup('main'), 'run': _startup_run},
+}
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_scenario(name: str, context: BenchmarkContext, repeat: int = 3) -> dict:
+    """Exécuter un scénario `repeat` fois; temps en secondes"""
+    scenario = SCENARIOS[name]
+    timings = []
+    items = 0
+    for _ in range(repeat):
+        state = scenario['setup'](context)
+        start = time.perf_counter()
+        items = scenario['run'](state)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    return {
+        'elements': items,
+        'executions': [round(t, 6) for t in timings],
+        'min': round(best, 6),
+        'mediane': round(statistics.median(timings), 6),
+        'elements_par_seconde': round(items / best, 1) if best > 0 else None,
+    }
+
+
+def run_benchmarks(spec: Optional[SyntheticBOMSpec] = None, scenarios: Optional[List[str]] = None,
+                   repeat: int = 3, output_file: Optional[str] = None,
+                   work_dir: Optional[str] = None) -> dict:
+    """
+    Exécuter les scénarios sur un BOM synthétique.
+    Retourne {'format', 'date', 'environnement', 'bom', 'repetitions', 'scenarios': {nom: mesures}}
+    """
+    spec = spec or SyntheticBOMSpec()
+    names = scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise ValueError(f"Scénarios inconnus: {unknown} (disponibles: {list(SCENARIOS)})")
+
+    own_dir = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix="sku_bench_")
+    # Les journaux par composant fausseraient les mesures
+    previous_level = logging.root.manager.disable
+    logging.disable(logging.WARNING)
+    try:
+        context = BenchmarkContext(work_dir, spec)
+        measures = {}
+        for name in names:
+            measures[name] = run_scenario(name, context, repeat)
+            logger.debug(f"{name}: {measures[name]['min']:.3f} s")
+    finally:
+        logging.disable(previous_level)
+        bom_cache.clear()
+        if own_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {
+        'format': RESULTS_FORMAT_VERSION,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'environnement': {
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'plateforme': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'bom': spec.to_dict(),
+        'repetitions': repeat,
+        'scenarios': measures,
+    }
+
+    if output_file:
+        os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    return results
+
+
+def load_results(file_path: str) -> dict:
+    with open(file_path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.10) -> List[dict]:
+    """
+    Comparer deux résultats scénario par scénario (temps minimal).
+    Retourne une ligne par scénario commun: {'scenario', 'avant', 'apres', 'ecart', 'regression'};
+    regression = plus lent de plus de `threshold` (0.10 = 10 %).
+    """
+    if baseline.get('bom', {}).get('rows') != current.get('bom', {}).get('rows'):
+        logger.warning("Les deux résultats n'ont pas été mesurés sur la même taille de BOM")
+
+    rows = []
+    for name, measure in current['scenarios'].items():
+        if name not in baseline['scenarios']:
+            continue
+        before = baseline['scenarios'][name]['min']
+        after = measure['min']
+        change = (after - before) / before if before else 0.0
+        rows.append({
+            'scenario': name,
+            'avant': before,
+            'apres': after,
+            'ecart': round(change, 4),
+            'regression': change > threshold,
+        })
+    return rows
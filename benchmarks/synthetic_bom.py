@@ -0,0 +1,136 @@
+"""
+Générateur de BOM synthétiques au gabarit unifié (feuilles 'BOM Électrique' et
+'BOM Mécanique'), déterministe pour une graine donnée: deux exécutions avec la
+même spécification produisent exactement le même classeur.
+"""
+
+import random
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List
+
+import pandas as pd
+
+# Répartition des types observée sur le BOM V2.1 (poids relatifs)
+ELECTRICAL_TYPE_MIX = {
+    "Assemblage": 22,
+    "Cosses, oeillets, fourchettes": 22,
+    "Boitiers": 21,
+    "Broches": 13,
+    "Fusibles": 13,
+    "Verrous": 12,
+    "Contrôleur DELs": 10,
+    "Borniers": 7,
+    "Connecteurs": 6,
+    "Communication": 5,
+    "Relais et contacteurs": 5,
+    "Porte-fusibles": 4,
+    "Convertisseurs DC-DC": 3,
+    "Résistances": 3,
+    "Condensateurs": 3,
+}
+
+MECHANICAL_TYPE_MIX = {
+    "015 | BOULONNERIE": 71,
+    "121 | PIÈCES PLIÉES": 48,
+    "101 | ASSEMBLAGE MÉCANIQUE": 35,
+    "018 | COMPOSANTES MECANIQUES": 28,
+    "111 | PIÈCES DÉCOUPÉES LASER": 23,
+    "131 | PIÈCES USINÉES": 18,
+    "004 | PLASTIQUE (UHMW, LEXAN, ...)": 12,
+    "180 | ÉTIQUETTES": 8,
+    "140 | FABRICATION ADDITIVE": 8,
+    "102 | ASSEMBLAGE SOUDÉ": 8,
+}
+
+ELECTRICAL_MANUFACTURERS = ["Phoenix Contact", "IFM", "Molex", "TE Connectivity", "Littelfuse",
+                            "Vishay", "Würth Elektronik", "Omron"]
+MECHANICAL_MANUFACTURERS = ["NOOVELIA", "DIVEL INC.", "McMaster-Carr", "Misumi", "Unbrako", "Igus"]
+
+ELECTRICAL_COLUMNS = ['Name', 'Description', 'Designator', 'Quantity', 'Manufacturer PN',
+                      'Manufacturer', 'ComponentType']
+MECHANICAL_COLUMNS = ['Type', 'Manufacturier', 'No. de pièce', 'Description Française', 'QTE TOTALE']
+
+
+@dataclass
+class SyntheticBOMSpec:
+    """Paramètres d'un BOM synthétique"""
+    rows: int = 1000                 # Lignes au total (les deux feuilles)
+    electrical_ratio: float = 0.4    # Part des lignes dans la feuille électrique
+    duplicate_ratio: float = 0.1     # Part des lignes qui répètent un composant déjà présent
+    seed: int = 42
+    electrical_types: Dict[str, float] = field(default_factory=lambda: dict(ELECTRICAL_TYPE_MIX))
+    mechanical_types: Dict[str, float] = field(default_factory=lambda: dict(MECHANICAL_TYPE_MIX))
+
+    def __post_init__(self):
+        if self.rows < 0:
+            raise ValueError(f"Nombre de lignes invalide: {self.rows}")
+        for name in ('electrical_ratio', 'duplicate_ratio'):
+            value = getattr(self, name)
+            if not 0 <= value <= 1:
+                raise ValueError(f"{name} doit être entre 0 et 1: {value}")
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _electrical_part(rng: random.Random, index: int, component_type: str) -> dict:
+    prefix = ''.join(word[0] for word in component_type.split() if word[0].isalpha()).upper() or 'X'
+    quantity = rng.randint(1, 12)
+    return {
+        'Name': f"{prefix}-{index:05d}",
+        'Description': f"{component_type} {rng.choice(['2,5 mm', 'M12', '24 V', '10 A', 'IP67'])} réf. {index}",
+        'Designator': ', '.join(f"{prefix}{index}_{n}" for n in range(1, quantity + 1)),
+        'Quantity': quantity,
+        'Manufacturer PN': f"{rng.randint(1000000, 9999999)}",
+        'Manufacturer': rng.choice(ELECTRICAL_MANUFACTURERS),
+        'ComponentType': component_type,
+    }
+
+
+def _mechanical_part(rng: random.Random, index: int, component_type: str) -> dict:
+    label = component_type.split('|')[-1].strip()
+    return {
+        'Type': component_type,
+        'Manufacturier': rng.choice(MECHANICAL_MANUFACTURERS),
+        'No. de pièce': f"D-{index:07d}",
+        'Description Française': f"{label} {rng.choice(['ACIER', 'ALU 6061', 'INOX 304', 'UHMW'])} #{index}",
+        'QTE TOTALE': float(rng.randint(1, 40)),
+    }
+
+
+def _sheet_rows(rng: random.Random, count: int, duplicate_ratio: float, type_mix: Dict[str, float],
+                make_part, first_index: int) -> List[dict]:
+    if count == 0:
+        return []
+    unique_count = max(1, count - round(count * duplicate_ratio))
+    types = rng.choices(list(type_mix), weights=list(type_mix.values()), k=unique_count)
+    rows = [make_part(rng, first_index + i, component_type) for i, component_type in enumerate(types)]
+    # Doublons: un même composant utilisé à plusieurs endroits du BOM
+    rows += [dict(rng.choice(rows[:unique_count])) for _ in range(count - unique_count)]
+    rng.shuffle(rows)
+    return rows
+
+
+def generate_bom(spec: SyntheticBOMSpec) -> Dict[str, pd.DataFrame]:
+    """Feuilles du BOM synthétique, comme pd.read_excel(sheet_name=None)"""
+    rng = random.Random(spec.seed)
+    electrical_rows = round(spec.rows * spec.electrical_ratio)
+    mechanical_rows = spec.rows - electrical_rows
+
+    electrical = _sheet_rows(rng, electrical_rows, spec.duplicate_ratio, spec.electrical_types,
+                             _electrical_part, 1)
+    mechanical = _sheet_rows(rng, mechanical_rows, spec.duplicate_ratio, spec.mechanical_types,
+                             _mechanical_part, 1)
+    return {
+        'BOM Électrique': pd.DataFrame(electrical, columns=ELECTRICAL_COLUMNS),
+        'BOM Mécanique': pd.DataFrame(mechanical, columns=MECHANICAL_COLUMNS),
+    }
+
+
+def write_synthetic_bom(file_path: str, spec: SyntheticBOMSpec) -> Dict[str, pd.DataFrame]:
+    """Écrire le BOM synthétique dans un classeur Excel; retourne ses feuilles"""
+    sheets = generate_bom(spec)
+    with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
+        for sheet_name, df in sheets.items():
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+    return sheets
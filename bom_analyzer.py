@@ -3,11 +3,19 @@
 Script pour comparer et analyser les BOM avec gestion des SKU existants
 """
 
-import pandas as pd
-import sqlite3
+from __future__ import annotations
+
+import sys
 from sku_generator import SKUGenerator, Component
+from bom_cache import read_bom
+import instrumentation
+import mapping_registry
 from pathlib import Path
 import logging
+from logging_setup import setup_logging
+from lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +29,11 @@ class BOMComparator:
         """Analyse un nouveau BOM et compare avec les composants existants"""
         logger.info(f"Analyse du nouveau BOM: {file_path}")
 
-        # Lire le nouveau BOM
-        excel_data = pd.read_excel(file_path, sheet_name=None)
+        # Lire le nouveau BOM (avec les tables de correspondance à jour)
+        mapping_registry.reload_if_changed()
+        with instrumentation.span('bom.lecture') as span:
+            excel_data = read_bom(file_path)
+            span.add_rows(sum(len(df) for df in excel_data.values()))
 
         results = {
             'nouveau': 0,
@@ -32,14 +43,16 @@ class BOMComparator:
 
         # Analyser BOM Électrique
         if 'BOM Électrique' in excel_data:
-            elec_analysis = self._analyze_sheet(excel_data['BOM Électrique'], "ELEC")
+            with instrumentation.span('analyse.elec', len(excel_data['BOM Électrique'])):
+                elec_analysis = self._analyze_sheet(excel_data['BOM Électrique'], "ELEC")
             results['details']['Électrique'] = elec_analysis
             results['nouveau'] += elec_analysis['nouveau']
             results['existant'] += elec_analysis['existant']
 
         # Analyser BOM Mécanique
         if 'BOM Mécanique' in excel_data:
-            meca_analysis = self._analyze_sheet_meca(excel_data['BOM Mécanique'], "MECA")
+            with instrumentation.span('analyse.meca', len(excel_data['BOM Mécanique'])):
+                meca_analysis = self._analyze_sheet_meca(excel_data['BOM Mécanique'], "MECA")
             results['details']['Mécanique'] = meca_analysis
             results['nouveau'] += meca_analysis['nouveau']
             results['existant'] += meca_analysis['existant']
@@ -133,43 +146,51 @@ class BOMComparator:
         }
 
     def get_database_stats(self) -> dict:
-        """Obtient les statistiques de la base de données"""
-        conn = sqlite3.connect(self.sku_generator.db_path)
+        """Obtient les statistiques de la base de données (table maintenue par triggers)"""
+        conn = instrumentation.connect(self.sku_generator.db_path)
         cursor = conn.cursor()
 
-        # Total des composants
-        cursor.execute("SELECT COUNT(*) FROM components")
-        total = cursor.fetchone()[0]
-
-        # Par domaine
-        cursor.execute("SELECT domain, COUNT(*) FROM components GROUP BY domain")
-        by_domain = dict(cursor.fetchall())
-
-        # Par route
-        cursor.execute("SELECT route, COUNT(*) FROM components GROUP BY route ORDER BY COUNT(*) DESC")
-        by_route = dict(cursor.fetchall())
-
-        # Par routing
-        cursor.execute("SELECT routing, COUNT(*) FROM components GROUP BY routing ORDER BY COUNT(*) DESC")
-        by_routing = dict(cursor.fetchall())
+        cursor.execute("""
+            SELECT dimension, key, count FROM component_stats
+            WHERE count > 0
+            ORDER BY dimension, count DESC
+        """)
+        rows = cursor.fetchall()
 
         conn.close()
 
+        by_dimension = {'total': {}, 'domain': {}, 'route': {}, 'routing': {}, 'sous_famille': {}}
+        for dimension, key, count in rows:
+            by_dimension.setdefault(dimension, {})[key] = count
+
         return {
-            'total': total,
-            'par_domaine': by_domain,
-            'par_route': by_route,
-            'par_routing': by_routing
+            'total': by_dimension['total'].get('', 0),
+            'par_domaine': by_dimension['domain'],
+            'par_route': by_dimension['route'],
+            'par_routing': by_dimension['routing'],
+            'par_sous_famille': by_dimension['sous_famille']
         }
 
+    def reconcile_database_stats(self) -> dict:
+        """Reconstruit les statistiques à partir de la table components"""
+        self.sku_generator.reconcile_stats()
+        return self.get_database_stats()
+
 def main():
     """Fonction principale pour analyser les BOM"""
-    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    setup_logging()
 
     # Initialiser le générateur
     generator = SKUGenerator()
     comparator = BOMComparator(generator)
 
+    # Commande de réconciliation des statistiques
+    if "--reconcile-stats" in sys.argv[1:]:
+        stats = comparator.reconcile_database_stats()
+        print(f"✅ Statistiques réconciliées: {stats['total']} composants")
+        print(f"Par domaine: {stats['par_domaine']}")
+        return
+
     # Analyser le fichier actuel (simulation d'un nouveau BOM)
     file_path = "(V2.1) BOM unifié électrique-mécanique.xlsx"
 
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Cache des BOM lus et préchargement en arrière-plan
+
+Lire un classeur BOM (pd.read_excel sur toutes les feuilles) est l'étape la plus
+lente de l'analyse. BOMParseCache garde les derniers classeurs lus, indexés par
+(chemin, date de modification, taille): un fichier modifié est relu. BOMPrefetcher
+lit à l'avance, dans un thread de faible priorité, les BOM récemment modifiés du
+dernier dossier utilisé, pour que le choix d'un fichier affiche les résultats
+presque immédiatement.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from lazy_imports import lazy_import
+pd = lazy_import('pandas')
+
+from config import PREFETCH_CONFIG
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, int, int]
+
+
+def _cache_key(file_path: str) -> CacheKey:
+    """(chemin absolu, mtime en ns, taille): change dès que le fichier est réécrit"""
+    path = os.path.abspath(file_path)
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+class BOMParseCache:
+    """Classeurs BOM lus, en LRU borné (les DataFrames sont partagés: ne pas les modifier)"""
+
+    def __init__(self, max_entries: int = PREFETCH_CONFIG.get("cache_entries", 8)):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, Dict[str, pd.DataFrame]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Lectures en cours: un second demandeur attend au lieu de relire le fichier
+        self._inflight: Dict[CacheKey, threading.Event] = {}
+        # Lectures demandées par l'utilisateur: le préchargement leur cède la place
+        self._foreground = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _store(self, key: CacheKey, sheets: Dict[str, pd.DataFrame]):
+        with self._lock:
+            # Une version plus ancienne du même fichier n'a plus d'utilité
+            for stale in [k for k in self._entries if k[0] == key[0] and k != key]:
+                del self._entries[stale]
+            self._entries[key] = sheets
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def contains(self, file_path: str) -> bool:
+        try:
+            key = _cache_key(file_path)
+        except OSError:
+            return False
+        with self._lock:
+            return key in self._entries
+
+    @property
+    def foreground_busy(self) -> bool:
+        return self._foreground > 0
+
+    def read(self, file_path: str, background: bool = False) -> Dict[str, pd.DataFrame]:
+        """Toutes les feuilles du classeur (équivalent de pd.read_excel(sheet_name=None))"""
+        key = _cache_key(file_path)
+
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    if not background:
+                        self.hits += 1
+                    return self._entries[key]
+                pending = self._inflight.get(key)
+                if pending is None:
+                    pending = self._inflight[key] = threading.Event()
+                    if not background:
+                        self.misses += 1
+                        self._foreground += 1
+                    break
+            # Lecture déjà en cours (préchargement): attendre son résultat
+            pending.wait()
+            with self._lock:
+                if key in self._entries:
+                    continue
+            # La lecture en cours a échoué: la refaire nous-mêmes
+            if not background:
+                continue
+            raise OSError(f"Lecture impossible: {file_path}")
+
+        try:
+            sheets = pd.read_excel(file_path, sheet_name=None)
+            self._store(key, sheets)
+            return sheets
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                if not background:
+                    self._foreground -= 1
+            pending.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Cache partagé par BOMProcessor, BOMComparator et la comparaison de révisions
+bom_cache = BOMParseCache()
+
+
+def read_bom(file_path: str) -> Dict[str, pd.DataFrame]:
+    """Lire un BOM via le cache partagé"""
+    return bom_cache.read(file_path)
+
+
+class BOMPrefetcher:
+    """
+    Précharge les BOM récents d'un dossier dans le cache, un fichier à la fois.
+    Bornes: `max_files` fichiers les plus récents de moins de `max_age_days` jours
+    et de moins de `max_file_mb` Mo; pause dès qu'une lecture utilisateur est en
+    cours; arrêt par stop() (le fichier en cours de lecture est abandonné ensuite).
+    """
+
+    def __init__(self, cache: BOMParseCache = bom_cache, directory: Optional[str] = None,
+                 max_files: int = PREFETCH_CONFIG.get("max_files", 3),
+                 max_age_days: float = PREFETCH_CONFIG.get("max_age_days", 7),
+                 max_file_mb: float = PREFETCH_CONFIG.get("max_file_mb", 20),
+                 scan_interval: float = PREFETCH_CONFIG.get("scan_interval", 30)):
+        self.cache = cache
+        self.directory = directory
+        self.max_files = max_files
+        self.max_age = max_age_days * 86400
+        self.max_bytes = max_file_mb * 1024 * 1024
+        self.scan_interval = scan_interval
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.prefetched: List[str] = []
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='bom-prefetch', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def set_directory(self, directory: str):
+        """Nouveau dossier à surveiller (rescanné immédiatement)"""
+        if directory != self.directory:
+            self.directory = directory
+            self._wake.set()
+
+    def candidates(self) -> List[str]:
+        """BOM récents du dossier, du plus récent au plus ancien"""
+        if not self.directory or not os.path.isdir(self.directory):
+            return []
+        now = time.time()
+        found = []
+        for entry in os.scandir(self.directory):
+            # ~$fichier.xlsx: verrou d'Excel, pas un classeur
+            if not entry.is_file() or entry.name.startswith('~$') or Path(entry.name).suffix.lower() != '.xlsx':
+                continue
+            stat = entry.stat()
+            if now - stat.st_mtime <= self.max_age and stat.st_size <= self.max_bytes:
+                found.append((stat.st_mtime, entry.path))
+        found.sort(reverse=True)
+        return [path for _, path in found[:self.max_files]]
+
+    def run_once(self) -> int:
+        """Un passage: précharger les candidats absents du cache. Retourne le nombre lu."""
+        directory = self.directory
+        loaded = 0
+        for file_path in self.candidates():
+            # Céder la place aux lectures demandées par l'utilisateur
+            while self.cache.foreground_busy and not self._stop.is_set():
+                time.sleep(0.05)
+            if self._stop.is_set() or self.directory != directory:
+                break
+            if self.cache.contains(file_path):
+                continue
+            try:
+                self.cache.read(file_path, background=True)
+                loaded += 1
+                self.prefetched.append(file_path)
+                logger.debug(f"BOM préchargé: {file_path}")
+            except Exception as e:
+                # Fichier verrouillé, en cours de synchronisation ou pas un BOM: ignoré
+                logger.debug(f"Préchargement ignoré pour {file_path}: {e}")
+        return loaded
+
+    def _run(self):
+        # Linux: chaque thread a sa propre priorité d'ordonnancement (nice)
+        if hasattr(os, 'setpriority') and hasattr(threading, 'get_native_id'):
+            try:
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+            except OSError:
+                pass
+
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.debug(f"Erreur de préchargement: {e}")
+            self._wake.wait(self.scan_interval)
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Comparaison de deux révisions d'un BOM (ex: V2.1 -> V2.2)
+
+Chaque ligne reçoit une empreinte calculée sur les champs d'identité du composant
+(les mêmes que create_component_hash: nom, description, type, fabricant, référence)
+et le domaine. Les lignes d'une même empreinte sont regroupées (quantités
+additionnées, désignateurs réunis), puis les deux révisions sont jointes par
+table de hachage: coût linéaire en nombre de lignes, sans comparaison deux à deux.
+Seuls les composants ajoutés ont besoin d'une génération de SKU.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from lazy_imports import lazy_import
+pd = lazy_import('pandas')
+
+from bom_cache import read_bom
+from logging_setup import setup_logging
+from sku_generator import Component, SKUGenerator
+
+logger = logging.getLogger(__name__)
+
+# Feuilles et colonnes du BOM unifié, par domaine (None: colonne absente du gabarit)
+BOM_SHEETS = {
+    'ELEC': ('BOM Électrique', {
+        'name': 'Name',
+        'description': 'Description',
+        'component_type': 'ComponentType',
+        'manufacturer': 'Manufacturer',
+        'manufacturer_part': 'Manufacturer PN',
+        'quantity': 'Quantity',
+        'designator': 'Designator',
+    }),
+    'MECA': ('BOM Mécanique', {
+        'name': 'No. de pièce',
+        'description': 'Description Française',
+        'component_type': 'Type',
+        'manufacturer': 'Manufacturier',
+        'manufacturer_part': 'No. de pièce',
+        'quantity': 'QTE TOTALE',
+        'designator': None,
+    }),
+}
+
+IDENTITY_FIELDS = ['domain', 'name', 'description', 'component_type', 'manufacturer', 'manufacturer_part']
+
+_DESIGNATOR_SPLIT = re.compile(r'[\s,;]+')
+
+
+def _text(df: pd.DataFrame, column: Optional[str]) -> pd.Series:
+    """Colonne convertie comme dans BOMProcessor (str(valeur), '' si la colonne manque)"""
+    if column is None or column not in df.columns:
+        return pd.Series('', index=df.index, dtype=object)
+    return df[column].map(str).astype(object)
+
+
+def _normalize_designators(value: str) -> str:
+    """'R2, R1 R3' -> 'R1,R2,R3' (ordre et séparateurs sans importance)"""
+    if not value or value == 'nan':
+        return ''
+    return ','.join(sorted(set(filter(None, _DESIGNATOR_SPLIT.split(value)))))
+
+
+def bom_frame(excel_data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Toutes les lignes du BOM dans un seul DataFrame aux colonnes normalisées"""
+    frames = []
+    for domain, (sheet_name, columns) in BOM_SHEETS.items():
+        if sheet_name not in excel_data:
+            continue
+        sheet = excel_data[sheet_name]
+        frame = pd.DataFrame({field: _text(sheet, column) for field, column in columns.items()
+                              if field != 'quantity'}, index=sheet.index)
+        frame.insert(0, 'domain', domain)
+        quantity_column = columns['quantity']
+        frame['quantity'] = (pd.to_numeric(sheet[quantity_column], errors='coerce')
+                             if quantity_column in sheet.columns else float('nan'))
+        frame['row'] = sheet.index + 2  # Numéro de ligne Excel (en-tête en ligne 1)
+        frames.append(frame)
+
+    if not frames:
+        return pd.DataFrame(columns=IDENTITY_FIELDS + ['designator', 'quantity', 'row'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def fingerprint_parts(frame: pd.DataFrame) -> pd.DataFrame:
+    """Une ligne par composant distinct: empreinte, quantité totale, désignateurs réunis"""
+    frame = frame.assign(
+        fingerprint=pd.util.hash_pandas_object(frame[IDENTITY_FIELDS], index=False).to_numpy(),
+        designator=frame['designator'].map(_normalize_designators),
+    )
+    grouped = frame.groupby('fingerprint', sort=False)
+    parts = grouped[IDENTITY_FIELDS + ['row']].first()
+    parts['quantity'] = grouped['quantity'].sum(min_count=1)
+    parts['lines'] = grouped.size()
+    parts['designator'] = grouped['designator'].first()
+
+    # Désignateurs à réunir seulement pour les composants répartis sur plusieurs lignes
+    repeated = parts.index[parts['lines'] > 1]
+    if len(repeated):
+        merged = frame[frame['fingerprint'].isin(repeated)].groupby('fingerprint')['designator'].agg(
+            lambda values: _normalize_designators(','.join(values)))
+        parts.loc[merged.index, 'designator'] = merged
+    return parts
+
+
+def diff_frames(old: pd.DataFrame, new: pd.DataFrame) -> dict:
+    """
+    Compare deux BOM normalisés (voir bom_frame).
+    Retourne {'ajoutes', 'supprimes', 'quantite_modifiee', 'designateur_modifie': DataFrame,
+              'inchanges': int}
+    """
+    old_parts = fingerprint_parts(old)
+    new_parts = fingerprint_parts(new)
+
+    joined = old_parts[['quantity', 'designator']].join(
+        new_parts[['quantity', 'designator']], how='outer', lsuffix='_avant', rsuffix='_apres'
+    )
+    in_old = joined.index.isin(old_parts.index)
+    in_new = joined.index.isin(new_parts.index)
+    both = joined[in_old & in_new]
+
+    quantity_changed = ~((both['quantity_avant'] == both['quantity_apres'])
+                         | (both['quantity_avant'].isna() & both['quantity_apres'].isna()))
+    designator_changed = both['designator_avant'] != both['designator_apres']
+
+    def details(index, source: pd.DataFrame, extra: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        result = source.loc[index, IDENTITY_FIELDS + ['row']]
+        if extra is not None:
+            result = result.join(extra.loc[index])
+        return result.reset_index(drop=True)
+
+    return {
+        'ajoutes': details(joined.index[~in_old], new_parts, new_parts[['quantity', 'designator']]),
+        'supprimes': details(joined.index[~in_new], old_parts, old_parts[['quantity', 'designator']]),
+        'quantite_modifiee': details(both.index[quantity_changed], new_parts,
+                                     both[['quantity_avant', 'quantity_apres']]),
+        'designateur_modifie': details(both.index[designator_changed], new_parts,
+                                       both[['designator_avant', 'designator_apres']]),
+        'inchanges': int((~quantity_changed & ~designator_changed).sum()),
+    }
+
+
+def diff_bom_files(old_file: str, new_file: str) -> dict:
+    """Compare deux révisions de BOM (fichiers Excel au gabarit unifié)"""
+    logger.info(f"Comparaison de révisions: {Path(old_file).name} -> {Path(new_file).name}")
+    old = bom_frame(read_bom(old_file))
+    new = bom_frame(read_bom(new_file))
+    return diff_frames(old, new)
+
+
+def components_to_generate(diff: dict, sku_generator: Optional[SKUGenerator] = None) -> Dict[str, List[Component]]:
+    """
+    Composants ajoutés, par domaine, au format attendu par la fenêtre de validation
+    et BOMProcessor.generate_skus_for_selected_components. Les composants invalides
+    sont écartés comme lors de l'extraction complète.
+    """
+    components_by_domain: Dict[str, List[Component]] = {}
+    for row in diff['ajoutes'].itertuples(index=False):
+        component = Component(
+            name=row.name,
+            description=row.description,
+            domain=row.domain,
+            component_type=row.component_type,
+            route="",
+            routing="",
+            manufacturer=row.manufacturer,
+            manufacturer_part=row.manufacturer_part,
+            quantity=None if pd.isna(row.quantity) else row.quantity,
+            designator=row.designator or None,
+        )
+        if sku_generator is not None and not sku_generator.validate_component(component):
+            continue
+        components_by_domain.setdefault(row.domain, []).append(component)
+    return components_by_domain
+
+
+def diff_summary(diff: dict) -> Dict[str, int]:
+    """Nombre de composants par catégorie de changement"""
+    return {key: (len(value) if isinstance(value, pd.DataFrame) else value) for key, value in diff.items()}
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Comparer deux révisions d'un BOM")
+    parser.add_argument("old_file", help="Révision précédente (ex: V2.1)")
+    parser.add_argument("new_file", help="Nouvelle révision (ex: V2.2)")
+    parser.add_argument("--output", help="Classeur Excel du détail (une feuille par catégorie)")
+    parser.add_argument("--json", action="store_true", help="Résumé au format JSON")
+    args = parser.parse_args()
+
+    setup_logging()
+
+    diff = diff_bom_files(args.old_file, args.new_file)
+    summary = diff_summary(diff)
+
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False))
+    else:
+        print("🔀 COMPARAISON DE RÉVISIONS")
+        print("=" * 60)
+        print(f"Ajoutés: {summary['ajoutes']}")
+        print(f"Supprimés: {summary['supprimes']}")
+        print(f"Quantité modifiée: {summary['quantite_modifiee']}")
+        print(f"Désignateur modifié: {summary['designateur_modifie']}")
+        print(f"Inchangés: {summary['inchanges']}")
+        for row in diff['ajoutes'].head(10).itertuples(index=False):
+            print(f"  + [{row.domain}] {row.name} ({row.component_type})")
+
+    if args.output:
+        from excel_writer import write_excel
+        write_excel(args.output, {key: value for key, value in diff.items() if isinstance(value, pd.DataFrame)})
+        print(f"📁 Détail exporté: {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
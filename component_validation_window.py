@@ -5,7 +5,6 @@ Fenêtre de validation des composants avant génération des SKU
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pandas as pd
 from pathlib import Path
 from typing import Dict, List
 from sku_generator import Component, SKUGenerator
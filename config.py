@@ -61,6 +61,66 @@ MECHANICAL_ROUTINGS = {
     "SOUDURE": "WELD"
 }
 
+# Types de composants -> code de sous-famille du SKU simplifié (FAMILLE-SOUS_FAMILLE-SEQUENCE)
+# L'ordre compte: le premier nom contenu dans le type du composant (ou le contenant) l'emporte
+SKU_TYPE_MAPPING = {
+    # Types électriques (lisibles en français - 5-6 lettres)
+    "Résistances": "RESIST",
+    "Condensateurs": "CONDEN",
+    "Inductances": "INDUCT",
+    "Diodes": "DIODES",
+    "Transistors": "TRANSI",
+    "Circuits intégrés": "CIRCUI",
+    "Connecteurs": "CONNEC",
+    "Relais": "RELAIS",
+    "Fusibles": "FUSIBL",
+    "Accessoires de borniers": "BORNIE",
+    "Cosses, oeillets, fourchettes": "COSSES",
+    "Broches": "BROCHE",
+    "Fil": "FILAGE",
+    "Boitiers": "BOITIE",
+
+    # Types mécaniques optimisés (action + matériau/finition optionnels)
+    "Pièces Pliées": "PLIAGE",
+    "PIÈCES PLIÉES": "PLIAGE",
+    "Pièces Usinées": "USINER",
+    "PIÈCES USINÉES": "USINER",
+    "Pièces Découpées": "DECOUP",
+    "PIÈCES DÉCOUPÉES LASER": "DECOUP",
+    # Boulonnerie : différencier par taille/matériau
+    "Boulonnerie": "VISSER",
+    "BOULONNERIE": "VISSER",
+    "Vis M3": "VISSM3",  # Exemple avec dimension
+    "Vis M4": "VISSM4",
+    "Vis M5": "VISSM5",
+    "Vis M6": "VISSM6",
+    "Vis M8": "VISSM8",
+    "Boulon M10": "BOULM10",
+    "Boulon M12": "BOULM12",
+    # Assemblages
+    "Assemblage Mécanique": "MONTER",
+    "ASSEMBLAGE MÉCANIQUE": "MONTER",
+    "Assemblage Final": "FINAL",
+    "Sous-assemblage": "SOUSAS",
+    # Matériaux avec finition
+    "Plastique": "PLASTI",
+    "PLASTIQUE": "PLASTI",
+    "Aluminium": "ALUMI",
+    "Acier": "ACIER",
+    "Inox": "INOX",
+    "Composantes Mécaniques": "COMPNT",
+    "COMPOSANTES MECANIQUES": "COMPNT"
+}
+
+# Tables de correspondance (voir mapping_registry.py)
+MAPPING_CONFIG = {
+    "file": None,               # Fichier JSON externe {"types", "routes", "routings"} remplaçant ces tables
+    # Ajouter CUSTOM_COMPONENT_TYPES après SKU_TYPE_MAPPING. Change la sous-famille des
+    # nouveaux composants de ces types (ex: LEDs -> LED au lieu de LEDS): à activer avant
+    # la première génération seulement
+    "include_custom_types": False
+}
+
 # Configuration du format des SKU
 SKU_FORMAT = {
     "separator": "-",           # Séparateur entre les parties
@@ -68,27 +128,51 @@ SKU_FORMAT = {
     "route_length": 4,          # Longueur du code route
     "routing_length": 4,        # Longueur du code routing
     "type_length": 4,           # Longueur du code type
-    "sequence_padding": 5       # Nombre de zéros pour la séquence
+    "sequence_padding": 5,      # Nombre de zéros pour la séquence
+    "sous_famille_length": 6,   # Longueur maximale de la sous-famille (SKU simplifié)
+    "sequence_length": 4,       # Largeur du code de séquence (base 29)
+    "sequence_max_length": 6,   # Largeur maximale atteinte par croissance
+    "capacity_warning_ratio": 0.9  # Avertir quand une sous-famille atteint ce taux
 }
 
 # Configuration de la base de données
 DATABASE_CONFIG = {
     "name": "sku_database.db",
     "backup_interval": 100,     # Sauvegarder après N insertions
-    "auto_backup": True
+    "auto_backup": True,        # Sauvegardes à chaud (voir db_backup.py)
+    "backup_dir": "backups",    # Relatif au dossier de la base
+    "backup_keep": 10,          # Sauvegardes automatiques conservées
+    "backup_schedule_minutes": 60,  # Sauvegarde périodique s'il y a eu des insertions (0: désactivée)
+    "journal_mode": "WAL"       # Sauvegardes et lectures sans bloquer la génération (DELETE sur un partage réseau)
+}
+
+# Journal des allocations (reprise après incident et réplication, voir sku_journal.py)
+JOURNAL_CONFIG = {
+    "enabled": True,
+    "dir": "journal",           # Relatif au dossier de la base
+    "fsync_every": 64,          # fsync toutes les N lignes...
+    "fsync_interval": 1.0,      # ...ou toutes les N secondes s'il reste des lignes en attente
+    "max_bytes": 64 * 1024 * 1024,  # Journal archivé et recommencé au-delà (aussi après chaque sauvegarde)
+    "archive_keep": 10          # Archives de journal conservées
 }
 
 # Configuration des logs
 LOGGING_CONFIG = {
     "level": "INFO",            # DEBUG, INFO, WARNING, ERROR
     "file": "sku_generator.log",
-    "format": "%(asctime)s - %(levelname)s - %(message)s"
+    "format": "%(asctime)s - %(levelname)s - %(message)s",
+    "console": True,            # Copie des messages sur la console
+    "max_bytes": 5 * 1024 * 1024,  # Rotation du fichier au-delà de cette taille
+    "backup_count": 5,          # Fichiers sku_generator.log.N conservés
+    "sample_every": 100         # Messages DEBUG par SKU: un sur N (voir logging_setup.py)
 }
 
 # Configuration des exports
 EXPORT_CONFIG = {
     "excel_format": "xlsx",
     "include_metadata": True,   # Inclure les métadonnées dans l'export
+    "excel_backend": "auto",    # auto, pandas, openpyxl (write-only) ou xlsxwriter
+    "excel_streaming_threshold": 20000,  # Lignes à partir desquelles 'auto' écrit en flux
     "sheet_names": {
         "electrical": "SKU_Électrique",
         "mechanical": "SKU_Mécanique",
@@ -96,6 +180,28 @@ EXPORT_CONFIG = {
     }
 }
 
+# Préchargement des BOM récents du dernier dossier utilisé (voir bom_cache.py)
+PREFETCH_CONFIG = {
+    "enabled": True,
+    "max_files": 3,             # Fichiers les plus récents préchargés
+    "max_age_days": 7,          # Ignorer les BOM plus anciens
+    "max_file_mb": 20,          # Ignorer les classeurs plus gros
+    "cache_entries": 8,         # Classeurs gardés en mémoire (LRU)
+    "scan_interval": 30         # Secondes entre deux passages
+}
+
+# Mesure des étapes d'un traitement (voir instrumentation.py)
+INSTRUMENTATION_CONFIG = {
+    "enabled": True,            # Résumé des durées à la fin de main.py et dans l'interface
+}
+
+# Mode profilage (--profile, case à cocher de l'interface; voir profiling.py)
+PROFILING_CONFIG = {
+    "output_dir": "profiles",   # Un dossier horodaté par tâche profilée
+    "top_functions": 40,        # Fonctions listées dans profile.txt
+    "archive": True             # Archive .zip du dossier, à joindre à un rapport
+}
+
 # Règles de validation
 VALIDATION_RULES = {
     "min_name_length": 2,       # Longueur minimale du nom
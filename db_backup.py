@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Sauvegardes à chaud de la base SKU (API de sauvegarde SQLite)
+
+La base est en mode WAL (DATABASE_CONFIG['journal_mode'], posé par
+SKUGenerator.init_database): la copie se fait en une seule étape dans une
+transaction de lecture, qui voit une image cohérente de la base pendant que la
+génération de SKU continue d'écrire. Une copie par petites étapes serait
+reprise depuis le début à chaque écriture et ne finirait jamais pendant un lot.
+
+    db_backup.enable_auto_backup("sku_database.db")   # points d'entrée
+    # SKUGenerator.save_component -> notify_insert(): sauvegarde toutes les
+    # DATABASE_CONFIG['backup_interval'] insertions, dans un thread dédié
+
+Une sauvegarde planifiée (backup_schedule_minutes) a lieu s'il y a eu des
+insertions depuis la précédente. Après chaque sauvegarde automatique, le
+journal des allocations actif est recommencé (sku_journal.rotate_journal). Les sauvegardes automatiques sont
+renouvelées (backup_keep plus récentes conservées); les sauvegardes manuelles
+et celles prises avant une réinitialisation ou une restauration sont gardées.
+
+    python db_backup.py backup
+    python db_backup.py list
+    python db_backup.py restore backups/sku_database_20250101-120000-000000_auto.db
+"""
+
+import argparse
+import atexit
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import instrumentation
+import sku_journal
+from config import DATABASE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Raisons des sauvegardes renouvelées automatiquement (les autres sont conservées)
+AUTOMATIC_REASONS = ('auto', 'planifie')
+
+_SNAPSHOT_PATTERN = re.compile(r'^(?P<stem>.+)_(?P<stamp>\d{8}-\d{6}-\d{6})_(?P<reason>[a-z_]+)\.db$')
+
+
+def _is_memory_db(db_path: str) -> bool:
+    return db_path == ':memory:' or db_path.startswith('file::memory:') or 'mode=memory' in db_path
+
+
+def backup_directory(db_path: str, backup_dir: Optional[str] = None) -> str:
+    """Dossier des sauvegardes (relatif au dossier de la base s'il n'est pas absolu)"""
+    backup_dir = backup_dir or DATABASE_CONFIG.get("backup_dir", "backups")
+    if os.path.isabs(backup_dir):
+        return backup_dir
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), backup_dir)
+
+
+def create_snapshot(db_path: str, backup_dir: Optional[str] = None, reason: str = 'manuel') -> str:
+    """
+    Copier la base en cours d'utilisation dans <dossier>/<base>_<date>_<raison>.db
+    (fichier autonome, sans -wal). Retourne le chemin de la sauvegarde.
+    """
+    if not re.fullmatch(r'[a-z_]+', reason):
+        raise ValueError(f"Raison de sauvegarde invalide: '{reason}' (lettres minuscules et _)")
+    if _is_memory_db(db_path) or not os.path.exists(db_path):
+        raise FileNotFoundError(f"Base de données introuvable: {db_path}")
+
+    directory = backup_directory(db_path, backup_dir)
+    os.makedirs(directory, exist_ok=True)
+    target = os.path.join(directory, f"{Path(db_path).stem}_{datetime.now():%Y%m%d-%H%M%S-%f}_{reason}.db")
+    tmp_file = f"{target}.tmp"
+
+    source = sqlite3.connect(db_path)
+    destination = sqlite3.connect(tmp_file)
+    try:
+        source.backup(destination, pages=-1)
+        destination.execute("PRAGMA journal_mode = DELETE")
+    except Exception:
+        destination.close()
+        os.remove(tmp_file)
+        raise
+    finally:
+        source.close()
+    destination.close()
+    # Une sauvegarde visible est toujours complète
+    os.replace(tmp_file, target)
+    return target
+
+
+def list_snapshots(db_path: str, backup_dir: Optional[str] = None) -> List[Dict]:
+    """Sauvegardes de la base, plus récentes d'abord: {'fichier', 'date', 'raison', 'octets'}"""
+    directory = backup_directory(db_path, backup_dir)
+    if not os.path.isdir(directory):
+        return []
+
+    stem = Path(db_path).stem
+    snapshots = []
+    for entry in os.scandir(directory):
+        match = _SNAPSHOT_PATTERN.match(entry.name)
+        if not match or match.group('stem') != stem or not entry.is_file():
+            continue
+        snapshots.append({
+            'fichier': entry.path,
+            'date': datetime.strptime(match.group('stamp'), '%Y%m%d-%H%M%S-%f').isoformat(timespec='seconds'),
+            'raison': match.group('reason'),
+            'octets': entry.stat().st_size,
+            '_stamp': match.group('stamp'),
+        })
+    snapshots.sort(key=lambda snapshot: snapshot.pop('_stamp'), reverse=True)
+    return snapshots
+
+
+def rotate_snapshots(db_path: str, keep: Optional[int] = None, backup_dir: Optional[str] = None) -> List[str]:
+    """Supprimer les sauvegardes automatiques au-delà des `keep` plus récentes. Retourne les fichiers supprimés."""
+    keep = DATABASE_CONFIG.get("backup_keep", 10) if keep is None else keep
+    automatic = [snapshot['fichier'] for snapshot in list_snapshots(db_path, backup_dir)
+                 if snapshot['raison'] in AUTOMATIC_REASONS]
+    removed = []
+    for file_path in automatic[max(keep, 0):]:
+        try:
+            os.remove(file_path)
+            removed.append(file_path)
+        except OSError as e:
+            logger.warning(f"Sauvegarde non supprimée {file_path}: {e}")
+    return removed
+
+
+def restore_snapshot(snapshot: str, db_path: str, safety_backup: bool = True) -> Optional[str]:
+    """
+    Remplacer le contenu de la base par une sauvegarde (copie en une étape, base
+    ouverte ailleurs comprise). La sauvegarde est vérifiée d'abord; avec
+    safety_backup, l'état courant est sauvegardé avant d'être écrasé.
+    Retourne le chemin de cette sauvegarde de sécurité.
+    """
+    if not os.path.exists(snapshot):
+        raise FileNotFoundError(f"Sauvegarde introuvable: {snapshot}")
+
+    source = sqlite3.connect(f"file:{Path(snapshot).resolve().as_posix()}?mode=ro", uri=True)
+    try:
+        check = source.execute("PRAGMA quick_check").fetchone()[0]
+        if check != 'ok':
+            raise ValueError(f"Sauvegarde corrompue ({snapshot}): {check}")
+
+        safety = None
+        if safety_backup and os.path.exists(db_path):
+            safety = create_snapshot(db_path, reason='avant_restauration')
+
+        destination = sqlite3.connect(db_path)
+        try:
+            source.backup(destination)
+        finally:
+            destination.close()
+    finally:
+        source.close()
+
+    # Le schéma restauré peut être d'une version antérieure: revérifié à la prochaine connexion
+    from sku_generator import forget_schema
+    forget_schema(db_path)
+    logger.info(f"Base {db_path} restaurée depuis {snapshot}")
+    return safety
+
+
+class BackupManager:
+    """Sauvegardes automatiques d'une base: toutes les `interval` insertions et/ou périodiquement"""
+
+    def __init__(self, db_path: str, interval: Optional[int] = None, keep: Optional[int] = None,
+                 schedule_minutes: Optional[float] = None, backup_dir: Optional[str] = None):
+        self.db_path = db_path
+        self.interval = DATABASE_CONFIG.get("backup_interval", 100) if interval is None else interval
+        self.keep = keep
+        schedule_minutes = (DATABASE_CONFIG.get("backup_schedule_minutes", 0)
+                            if schedule_minutes is None else schedule_minutes)
+        self.schedule_seconds = schedule_minutes * 60 if schedule_minutes else None
+        self.backup_dir = backup_dir
+
+        self.last_snapshot: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.snapshots_taken = 0
+
+        self._lock = threading.Lock()
+        self._inserts = 0                   # Insertions depuis la dernière sauvegarde
+        self._pending: Optional[str] = None  # Raison de la sauvegarde demandée
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"backup-{Path(db_path).stem}", daemon=True)
+        self._thread.start()
+
+    def notify_insert(self, count: int = 1):
+        """Appelé après chaque insertion (coût: un compteur sous verrou)"""
+        with self._lock:
+            self._inserts += count
+            due = self.interval > 0 and self._inserts >= self.interval and self._pending is None
+        if due:
+            self.request('auto')
+
+    def request(self, reason: str = 'manuel'):
+        """Demander une sauvegarde (sans attendre; plusieurs demandes rapprochées n'en font qu'une)"""
+        with self._lock:
+            self._pending = reason
+            self._idle.clear()
+        self._wake.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Attendre la fin des sauvegardes demandées"""
+        return self._idle.wait(timeout)
+
+    def stop(self, wait: bool = True):
+        """Arrêter le thread (une sauvegarde demandée est d'abord terminée)"""
+        self._stop.set()
+        self._wake.set()
+        if wait:
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            woke = self._stop.is_set() or self._wake.wait(self.schedule_seconds)
+            self._wake.clear()
+            with self._lock:
+                reason, self._pending = self._pending, None
+                if reason is None and not woke and self._inserts:
+                    reason = 'planifie'
+                if reason is None:
+                    self._idle.set()
+                    if self._stop.is_set():
+                        return
+                    continue
+                self._inserts = 0
+            self._backup(reason)
+            with self._lock:
+                if self._pending is None:
+                    self._idle.set()
+
+    def _backup(self, reason: str):
+        start = time.perf_counter()
+        try:
+            snapshot = create_snapshot(self.db_path, self.backup_dir, reason)
+            removed = rotate_snapshots(self.db_path, self.keep, self.backup_dir)
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Échec de la sauvegarde de {self.db_path}: {e}")
+            return
+
+        seconds = time.perf_counter() - start
+        instrumentation.record('db.sauvegarde', seconds)
+        self.last_snapshot = snapshot
+        self.last_error = None
+        self.snapshots_taken += 1
+        rotation = f", {len(removed)} ancienne(s) supprimée(s)" if removed else ""
+        logger.info(f"Sauvegarde {reason}: {snapshot} ({seconds:.2f} s{rotation})")
+
+        # Sauvegarde faite: le journal peut repartir d'elle
+        try:
+            sku_journal.rotate_journal(self.db_path)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            logger.warning(f"Rotation du journal de {self.db_path} reportée: {e}")
+
+
+# Sauvegardes automatiques actives: chemin absolu de la base -> gestionnaire
+_managers: Dict[str, BackupManager] = {}
+_managers_lock = threading.Lock()
+
+
+def enable_auto_backup(db_path: str, **options) -> Optional[BackupManager]:
+    """Activer les sauvegardes automatiques d'une base (sans effet si DATABASE_CONFIG['auto_backup'] est faux)"""
+    if not DATABASE_CONFIG.get("auto_backup", False) or _is_memory_db(db_path):
+        return None
+    key = os.path.abspath(db_path)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = _managers[key] = BackupManager(db_path, **options)
+        return manager
+
+
+def get_manager(db_path: str) -> Optional[BackupManager]:
+    return _managers.get(os.path.abspath(db_path))
+
+
+def notify_insert(db_path: str, count: int = 1):
+    """Compter une insertion (rien à faire si aucune sauvegarde automatique n'est active)"""
+    if not _managers:
+        return
+    manager = _managers.get(os.path.abspath(db_path))
+    if manager is not None:
+        manager.notify_insert(count)
+
+
+def disable_auto_backup(db_path: str, wait: bool = True):
+    with _managers_lock:
+        manager = _managers.pop(os.path.abspath(db_path), None)
+    if manager is not None:
+        manager.stop(wait)
+
+
+def shutdown(wait: bool = True):
+    """Terminer les sauvegardes en cours et arrêter les threads (appelé à la sortie)"""
+    with _managers_lock:
+        managers = list(_managers.values())
+        _managers.clear()
+    for manager in managers:
+        manager.stop(wait)
+
+
+atexit.register(shutdown)
+
+
+def main():
+    """Point d'entrée: sauvegarde, liste et restauration"""
+    parser = argparse.ArgumentParser(description="Sauvegardes de la base SKU")
+    parser.add_argument("--db", dest="db_path", default=DATABASE_CONFIG.get("name", "sku_database.db"),
+                        help="Base de données SKU")
+    parser.add_argument("--dir", dest="backup_dir", help="Dossier des sauvegardes")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('backup', help="Sauvegarder maintenant")
+    subparsers.add_parser('list', help="Lister les sauvegardes")
+    restore = subparsers.add_parser('restore', help="Restaurer une sauvegarde")
+    restore.add_argument('snapshot', nargs='?', help="Fichier de sauvegarde (défaut: la plus récente)")
+    restore.add_argument('--no-safety-backup', action='store_true',
+                         help="Ne pas sauvegarder l'état courant avant de l'écraser")
+    args = parser.parse_args()
+
+    from logging_setup import setup_logging
+    setup_logging()
+
+    if args.command == 'backup':
+        snapshot = create_snapshot(args.db_path, args.backup_dir)
+        print(f"✅ Sauvegarde: {snapshot}")
+        return 0
+
+    snapshots = list_snapshots(args.db_path, args.backup_dir)
+    if args.command == 'list':
+        for snapshot in snapshots:
+            print(f"{snapshot['date']}  {snapshot['raison']:<22} {snapshot['octets'] / 1024:>9.0f} Ko  "
+                  f"{snapshot['fichier']}")
+        if not snapshots:
+            print("Aucune sauvegarde")
+        return 0
+
+    snapshot = args.snapshot or (snapshots[0]['fichier'] if snapshots else None)
+    if snapshot is None:
+        print("❌ Aucune sauvegarde à restaurer")
+        return 1
+    safety = restore_snapshot(snapshot, args.db_path, safety_backup=not args.no_safety_backup)
+    print(f"✅ Base restaurée depuis {snapshot}")
+    if safety:
+        print(f"💾 État précédent sauvegardé: {safety}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
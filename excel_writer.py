@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Écriture des classeurs Excel avec moteur interchangeable
+
+- 'pandas'   : pd.ExcelWriter(engine='openpyxl'), le comportement historique;
+               chaque cellule est un objet en mémoire jusqu'à la sauvegarde.
+- 'openpyxl' : classeur openpyxl en écriture seule (write_only), les lignes sont
+               sérialisées au fil de l'eau, mémoire constante.
+- 'xlsxwriter': xlsxwriter en mode constant_memory (si le module est installé),
+               le plus rapide des modes en flux.
+- 'auto'     : 'pandas' pour les petits résultats, mode en flux au-delà du seuil
+               EXPORT_CONFIG['excel_streaming_threshold'] (lignes cumulées).
+
+Les trois moteurs produisent les mêmes feuilles, en-têtes et valeurs de cellules.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, Iterator, List, Optional
+
+from config import EXPORT_CONFIG
+from lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+logger = logging.getLogger(__name__)
+
+# Détection sans import: xlsxwriter n'est chargé qu'à la première écriture
+HAS_XLSXWRITER = importlib.util.find_spec("xlsxwriter") is not None
+
+BACKENDS = ('auto', 'pandas', 'openpyxl', 'xlsxwriter')
+
+STREAMING_THRESHOLD = EXPORT_CONFIG.get("excel_streaming_threshold", 20000)
+
+# Nombre de lignes converties à la fois en valeurs Python natives
+ROW_CHUNK = 10000
+
+
+def choose_backend(total_rows: int, backend: Optional[str] = None) -> str:
+    """Résoudre 'auto' (ou la configuration) en moteur effectif"""
+    backend = backend or EXPORT_CONFIG.get("excel_backend", "auto")
+    if backend not in BACKENDS:
+        raise ValueError(f"Moteur Excel inconnu: {backend} (attendu: {', '.join(BACKENDS)})")
+    if backend == 'xlsxwriter' and not HAS_XLSXWRITER:
+        logger.warning("xlsxwriter non installé: écriture en flux via openpyxl")
+        return 'openpyxl'
+    if backend != 'auto':
+        return backend
+    if total_rows < STREAMING_THRESHOLD:
+        return 'pandas'
+    return 'xlsxwriter' if HAS_XLSXWRITER else 'openpyxl'
+
+
+def _iter_rows(df: pd.DataFrame) -> Iterator[list]:
+    """Lignes du DataFrame en valeurs natives, comme les écrit pandas (NaN -> vide, inf -> 'inf')"""
+    float_columns = [i for i, dtype in enumerate(df.dtypes) if pd.api.types.is_float_dtype(dtype)]
+    for start in range(0, len(df), ROW_CHUNK):
+        chunk = df.iloc[start:start + ROW_CHUNK].astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        for i in float_columns:
+            column = df.iloc[start:start + ROW_CHUNK, i].to_numpy()
+            infinite = np.isinf(column)
+            if infinite.any():
+                chunk.iloc[infinite, i] = np.where(column[infinite] > 0, 'inf', '-inf')
+        # astype(object) a déjà converti les scalaires NumPy en types Python
+        yield from chunk.to_numpy().tolist()
+
+
+def _write_pandas(output_file: str, sheets: Dict[str, pd.DataFrame]):
+    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+        for sheet_name, df in sheets.items():
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+
+def _write_openpyxl(output_file: str, sheets: Dict[str, pd.DataFrame]):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for sheet_name, df in sheets.items():
+        worksheet = workbook.create_sheet(title=sheet_name)
+        worksheet.append([str(column) for column in df.columns])
+        for row in _iter_rows(df):
+            worksheet.append(row)
+    workbook.save(output_file)
+
+
+def _write_xlsxwriter(output_file: str, sheets: Dict[str, pd.DataFrame]):
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(output_file, {
+        'constant_memory': True,
+        'nan_inf_to_errors': True,
+        'strings_to_numbers': False,
+        'strings_to_formulas': False,
+        'strings_to_urls': False,
+    })
+    try:
+        for sheet_name, df in sheets.items():
+            worksheet = workbook.add_worksheet(sheet_name)
+            worksheet.write_row(0, 0, [str(column) for column in df.columns])
+            # constant_memory impose l'écriture ligne par ligne, dans l'ordre (None -> cellule vide)
+            for row_index, row in enumerate(_iter_rows(df), start=1):
+                worksheet.write_row(row_index, 0, row)
+    finally:
+        workbook.close()
+
+
+_WRITERS = {
+    'pandas': _write_pandas,
+    'openpyxl': _write_openpyxl,
+    'xlsxwriter': _write_xlsxwriter,
+}
+
+
+def write_excel(output_file: str, sheets: Dict[str, pd.DataFrame], backend: Optional[str] = None) -> str:
+    """
+    Écrire un classeur d'une feuille par DataFrame (sans index).
+    Retourne le moteur effectivement utilisé.
+    """
+    total_rows = sum(len(df) for df in sheets.values())
+    engine = choose_backend(total_rows, backend)
+    _WRITERS[engine](output_file, sheets)
+    logger.debug(f"Classeur {output_file}: {total_rows} lignes écrites (moteur {engine})")
+    return engine
+
+
+def _synthetic_results(rows: int) -> Dict[str, pd.DataFrame]:
+    """Résultats semblables à ceux de BOMProcessor, pour le banc d'essai"""
+    rng = np.random.default_rng(0)
+    half = rows // 2
+
+    def frame(count: int, domain: str, prefix: str) -> pd.DataFrame:
+        index = np.arange(count)
+        return pd.DataFrame({
+            'SKU': [f"{prefix}-{i:06d}" for i in index],
+            'Name': [f"Composant {i}" for i in index],
+            'Description': [f"Description du composant {i}" for i in index],
+            'ComponentType': rng.choice(['Résistances', 'Condensateurs', 'Boulonnerie'], count),
+            'Manufacturer': rng.choice(['Vishay', 'Murata', 'Unbrako', None], count),
+            'Manufacturer_PN': [f"PN{i}" for i in index],
+            'Quantity': rng.integers(1, 100, count),
+            'Domain': domain,
+        })
+
+    return {
+        'SKU_Électrique': frame(half, 'ELEC', 'ELEC-RESIST'),
+        'SKU_Mécanique': frame(rows - half, 'MECA', 'MECA-VISSER'),
+    }
+
+
+def run_benchmark(rows: int = 100000, backends: Optional[List[str]] = None) -> List[dict]:
+    """Temps d'écriture de chaque moteur disponible sur `rows` lignes synthétiques"""
+    sheets = _synthetic_results(rows)
+    backends = backends or ['pandas', 'openpyxl'] + (['xlsxwriter'] if HAS_XLSXWRITER else [])
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in backends:
+            output_file = os.path.join(tmp, f"bench_{backend}.xlsx")
+            start = time.perf_counter()
+            write_excel(output_file, sheets, backend)
+            elapsed = time.perf_counter() - start
+            results.append({
+                'moteur': backend,
+                'lignes': rows,
+                'secondes': round(elapsed, 2),
+                'taille_ko': os.path.getsize(output_file) // 1024,
+            })
+    return results
+
+
+def main():
+    """Point d'entrée: banc d'essai des moteurs d'écriture"""
+    parser = argparse.ArgumentParser(description="Moteurs d'écriture Excel")
+    parser.add_argument("--bench", action="store_true", help="Comparer les moteurs disponibles")
+    parser.add_argument("--rows", type=int, default=100000, help="Lignes synthétiques du banc d'essai")
+    args = parser.parse_args()
+
+    if not args.bench:
+        parser.print_help()
+        return 0
+
+    print(f"📊 Écriture Excel de {args.rows} lignes")
+    print("=" * 50)
+    results = run_benchmark(args.rows)
+    reference = results[0]['secondes']
+    for result in results:
+        speedup = reference / result['secondes'] if result['secondes'] else float('inf')
+        print(f"   {result['moteur']:<11} {result['secondes']:>7.2f} s  "
+              f"{result['taille_ko']:>7} Ko  x{speedup:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
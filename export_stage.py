@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Étape d'export parallèle: tous les formats écrits en même temps à partir d'un
+instantané des résultats
+
+Les formats dominés par les E/S (CSV, JSON, exports différentiels) tournent dans
+des threads. L'encodage XLSX est du Python pur (openpyxl/xlsxwriter) qui garde le
+GIL: au-delà de PROCESS_MIN_ROWS lignes il part dans un processus séparé. En
+dessous, le coût de démarrage d'un processus dépasse le gain.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional
+
+from lazy_imports import lazy_import
+pd = lazy_import('pandas')
+
+import instrumentation
+
+logger = logging.getLogger(__name__)
+
+# Lignes à partir desquelles un format CPU (voir EXPORT_FORMATS) sort du processus courant
+PROCESS_MIN_ROWS = 20000
+
+# Processus démarrés à neuf: un fork de la GUI ou du dossier surveillé copierait des
+# verrous tenus par leurs autres threads (Tk, journalisation, sauvegardes...) et
+# l'enfant pourrait s'y bloquer
+PROCESS_START_METHOD = 'spawn'
+
+
+def _available_cpus() -> int:
+    """Processeurs utilisables par ce processus (affinité comprise quand elle est connue)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def snapshot_results(results: dict) -> Mapping[str, pd.DataFrame]:
+    """Copie figée des résultats: les exports concurrents ne voient jamais une modification"""
+    return MappingProxyType({domain: df.copy(deep=True) for domain, df in results.items()})
+
+
+# ---------- Formats (fonctions de module: sérialisables vers un processus) ----------
+def write_results_excel(results: Mapping[str, pd.DataFrame], output_file: str, backend: Optional[str] = None) -> int:
+    """Classeur des résultats, une feuille SKU_<domaine> par domaine"""
+    from excel_writer import write_excel
+    write_excel(output_file, {f"SKU_{domain}": df for domain, df in results.items()}, backend)
+    return sum(len(df) for df in results.values())
+
+
+def write_odoo_csv(results: Mapping[str, pd.DataFrame], output_file: str) -> int:
+    """CSV d'import ODOO de tous les résultats"""
+    from odoo_integration import ODOOIntegration
+    count, _ = ODOOIntegration().export_to_odoo_csv(dict(results), output_file)
+    return count
+
+
+def write_odoo_json(results: Mapping[str, pd.DataFrame], output_file: str, **options) -> int:
+    """JSON pour l'API ODOO (options: compact, ndjson, chunk_size)"""
+    from odoo_integration import ODOOIntegration
+    count, _ = ODOOIntegration().export_to_odoo_json(dict(results), output_file, **options)
+    return count
+
+
+def write_odoo_delta_csv(results: Mapping[str, pd.DataFrame], output_file: str,
+                         db_path: str, target: str = "odoo_csv") -> int:
+    """CSV ODOO des seuls composants ajoutés/modifiés depuis le dernier export (lit la base)"""
+    from odoo_integration import ODOOIntegration
+    count, _ = ODOOIntegration().export_delta_to_odoo_csv(db_path, output_file, target)
+    return count
+
+
+# Formats disponibles: nom -> (fonction d'écriture, encodage CPU à sortir du processus)
+EXPORT_FORMATS: Dict[str, tuple] = {
+    'excel': (write_results_excel, True),
+    'odoo_csv': (write_odoo_csv, False),
+    'odoo_json': (write_odoo_json, False),
+    'odoo_delta_csv': (write_odoo_delta_csv, False),
+}
+
+
+@dataclass(frozen=True)
+class ExportJob:
+    """Un fichier à produire par l'étape d'export"""
+    format: str
+    output_file: str
+    options: dict = field(default_factory=dict)
+
+    def writer(self) -> Callable:
+        if self.format not in EXPORT_FORMATS:
+            raise ValueError(f"Format d'export inconnu: {self.format} (disponibles: {', '.join(EXPORT_FORMATS)})")
+        return EXPORT_FORMATS[self.format][0]
+
+
+def _timed(writer: Callable, results, output_file: str, options: dict) -> tuple:
+    """Exécuter un format et mesurer sa durée (dans le thread ou le processus d'exécution)"""
+    start = time.perf_counter()
+    count = writer(results, output_file, **options)
+    return count, time.perf_counter() - start
+
+
+def run_export_stage(results: dict, jobs: List[ExportJob], max_threads: int = 4) -> dict:
+    """
+    Produire tous les fichiers en parallèle.
+    Retourne {'formats': {format: {'fichier', 'lignes', 'secondes', 'erreur'}}, 'secondes': durée totale}.
+    Un format en échec n'interrompt pas les autres: son erreur est rapportée.
+    """
+    start = time.perf_counter()
+    writers = [job.writer() for job in jobs]  # Format inconnu: ValueError avant tout export
+    snapshot = snapshot_results(results)
+    total_rows = sum(len(df) for df in snapshot.values())
+
+    # Sur un seul processeur, un processus de plus n'apporte que son coût de démarrage
+    use_processes = total_rows >= PROCESS_MIN_ROWS and _available_cpus() > 1
+    process_jobs = [job for job in jobs if EXPORT_FORMATS[job.format][1] and use_processes]
+    thread_pool = ThreadPoolExecutor(max_workers=max(1, min(max_threads, len(jobs))),
+                                     thread_name_prefix='export')
+    process_pool = None
+    if process_jobs:
+        process_pool = ProcessPoolExecutor(max_workers=len(process_jobs),
+                                           mp_context=multiprocessing.get_context(PROCESS_START_METHOD))
+
+    futures = []
+    try:
+        for job, writer in zip(jobs, writers):
+            if job in process_jobs:
+                # Le processus reçoit une copie sérialisée: le dictionnaire figé ne voyage pas
+                future = process_pool.submit(_timed, writer, dict(snapshot), job.output_file, job.options)
+            else:
+                future = thread_pool.submit(_timed, writer, snapshot, job.output_file, job.options)
+            futures.append((job, future))
+
+        report = {}
+        for job, future in futures:
+            try:
+                count, seconds = future.result()
+                report[job.format] = {'fichier': job.output_file, 'lignes': count,
+                                      'secondes': seconds, 'erreur': None}
+                # Durée mesurée dans le thread ou le processus d'exécution
+                instrumentation.record(f"export.{job.format}", seconds, count)
+            except Exception as e:
+                logger.error(f"Export {job.format} en échec ({job.output_file}): {e}")
+                report[job.format] = {'fichier': job.output_file, 'lignes': 0,
+                                      'secondes': None, 'erreur': str(e)}
+    finally:
+        thread_pool.shutdown(wait=True)
+        if process_pool is not None:
+            process_pool.shutdown(wait=True)
+
+    elapsed = time.perf_counter() - start
+    logger.info("Étape d'export: " + ", ".join(
+        f"{name} {entry['secondes']:.2f} s" if entry['erreur'] is None else f"{name} en échec"
+        for name, entry in report.items()
+    ) + f" (total {elapsed:.2f} s)")
+    return {'formats': report, 'secondes': elapsed}
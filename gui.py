@@ -5,7 +5,6 @@ Interface utilisateur simple pour le générateur de SKU
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-import pandas as pd
 from pathlib import Path
 import threading
 import sys
@@ -16,14 +15,28 @@ from queue import Queue, Empty
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from sku_generator import SKUGenerator, Component
+from config import INSTRUMENTATION_CONFIG, PREFETCH_CONFIG
+import db_backup
+import instrumentation
+import sku_journal
+from logging_setup import setup_logging
+from profiling import profiled
 from main import BOMProcessor
 from bom_analyzer import BOMComparator
+from bom_cache import BOMPrefetcher, bom_cache
+from bom_diff import components_to_generate, diff_bom_files, diff_summary
 from component_validation_window import ComponentValidationWindow
 from odoo_integration import ODOOIntegration
+from sku_search import SKUSearchIndex
+from export_stage import ExportJob, run_export_stage
 
 class SKUGeneratorGUI:
     """Interface graphique pour le générateur de SKU"""
 
+    # Délai d'attente après la dernière frappe avant la recherche incrémentale
+    SEARCH_DEBOUNCE_MS = 150
+    LIVE_SEARCH_LIMIT = 15
+
     def __init__(self, root):
         self.root = root
         self.root.title("Générateur de SKU Industriel - Noovelia")
@@ -38,6 +51,20 @@ class SKUGeneratorGUI:
         # File dialog: remember last directory (session only)
         self._last_dir = os.getcwd()
 
+        # Préchargement en arrière-plan des BOM récents du dernier dossier
+        self.bom_prefetcher = BOMPrefetcher(bom_cache, self._last_dir)
+        if PREFETCH_CONFIG.get("enabled", True):
+            self.bom_prefetcher.start()
+
+        # Recherche incrémentale: index trié en mémoire + debounce des frappes
+        self.search_index = SKUSearchIndex(self.generator.db_path)
+        self._search_after_id = None
+        self._search_generation = 0
+
+        # Durées par étape affichées à la fin de chaque analyse/génération
+        if INSTRUMENTATION_CONFIG.get("enabled", False):
+            instrumentation.enable()
+
         # Thread-safe logging queue
         self._log_queue = Queue()
 
@@ -80,6 +107,8 @@ class SKUGeneratorGUI:
 
         ttk.Button(button_frame, text="📁 Analyser nouveau BOM",
                    command=self.analyze_bom).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="🔀 Comparer révisions",
+                   command=self.compare_bom_revisions).pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(button_frame, text="⚙️ Traiter et générer SKU",
                    command=self.process_bom).pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(button_frame, text="🔄 Actualiser stats",
@@ -89,6 +118,11 @@ class SKUGeneratorGUI:
         ttk.Button(button_frame, text="🗑️ Effacer résultats",
                    command=self.clear_results).pack(side=tk.LEFT)
 
+        # Profilage des traitements (artefact à joindre à un rapport de lenteur)
+        self.profile_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(button_frame, text="🔬 Profiler",
+                        variable=self.profile_var).pack(side=tk.RIGHT)
+
         # Ligne boutons de démo
         demo_frame = ttk.Frame(process_frame)
         demo_frame.pack(fill=tk.X, padx=10, pady=(0,5))
@@ -110,6 +144,7 @@ class SKUGeneratorGUI:
         self.search_entry = ttk.Entry(search_input_frame, width=30, font=("Consolas", 10))
         self.search_entry.pack(side=tk.LEFT, padx=(0, 5))
         self.search_entry.bind('<Return>', lambda e: self.search_sku())
+        self.search_entry.bind('<KeyRelease>', self._on_search_keystroke)
 
         ttk.Button(search_input_frame, text="🔍 Rechercher",
                    command=self.search_sku).pack(side=tk.LEFT, padx=(5, 0))
@@ -184,6 +219,19 @@ class SKUGeneratorGUI:
         self._enqueue_log(f"    • {name:<25} → ", "info")
         self._enqueue_log(f"{sku}\n", "sku")
 
+    def log_profile(self, session):
+        """Indiquer où le profil de la tâche a été enregistré (thread-safe)"""
+        if session is not None:
+            self.log_info(f"🔬 Profil enregistré: {session.archive_path or session.directory}")
+
+    def log_timings(self):
+        """Afficher les durées par étape du dernier traitement (thread-safe)"""
+        if not instrumentation.is_enabled():
+            return
+        self.log_section("DURÉE DES ÉTAPES")
+        for line in instrumentation.format_summary():
+            self._enqueue_log(f"{line}\n", "info")
+
     def clear_results(self):
         """Effacer la zone de résultats (thread-safe)"""
         self.root.after(0, lambda: self.results_text.delete(1.0, tk.END))
@@ -212,6 +260,11 @@ class SKUGeneratorGUI:
     def _progress_stop(self):
         self.root.after(0, self.progress.stop)
 
+    def _remember_dir(self, file_path):
+        """Mémoriser le dossier du fichier choisi et y déplacer le préchargement"""
+        self._last_dir = os.path.dirname(file_path)
+        self.bom_prefetcher.set_directory(self._last_dir)
+
     def check_file_access(self, file_path):
         """Vérifier l'accès au fichier avant traitement"""
         try:
@@ -243,6 +296,9 @@ class SKUGeneratorGUI:
             # UI update on main thread
             self.root.after(0, lambda: self.stats_text.config(text=stats_text))
 
+            # Les SKU ont pu changer: l'index de recherche sera rechargé à la prochaine frappe
+            self.search_index.invalidate()
+
         except Exception as e:
             self.root.after(0, lambda: self.stats_text.config(text=f"❌ Erreur: {str(e)}"))
 
@@ -257,7 +313,8 @@ class SKUGeneratorGUI:
         if not file_path:
             return
         # remember last dir
-        self._last_dir = os.path.dirname(file_path)
+        self._remember_dir(file_path)
+        profile = self.profile_var.get()  # Lu dans le thread de l'interface
 
         def analyze_thread():
             try:
@@ -284,7 +341,10 @@ class SKUGeneratorGUI:
                 self.log_success("Accès au fichier confirmé!")
                 self.log_info("Analyse en cours...")
 
-                analysis = self.comparator.analyze_new_bom(file_path)
+                instrumentation.reset()
+                with profiled(f"analyse_{Path(file_path).stem}", profile) as session:
+                    analysis = self.comparator.analyze_new_bom(file_path)
+                self.log_profile(session)
 
                 # Résultats principaux
                 self.log_section("RÉSULTATS GLOBAUX")
@@ -310,6 +370,7 @@ class SKUGeneratorGUI:
                                 self.log_info(f"    • {comp['nom']} ({comp['type']})")
 
                 self.log_success("Analyse terminée avec succès!")
+                self.log_timings()
 
             except PermissionError as e:
                 self.log_error("Accès au fichier refusé!")
@@ -332,6 +393,74 @@ class SKUGeneratorGUI:
         thread.daemon = True
         thread.start()
 
+    def compare_bom_revisions(self):
+        """Comparer deux révisions d'un BOM et ne générer les SKU que pour les ajouts"""
+        old_file = filedialog.askopenfilename(
+            title="Sélectionner la révision PRÉCÉDENTE du BOM",
+            filetypes=[("Excel files", "*.xlsx *.xls"), ("All files", "*.*")],
+            initialdir=self._last_dir,
+        )
+        if not old_file:
+            return
+        self._remember_dir(old_file)
+
+        new_file = filedialog.askopenfilename(
+            title="Sélectionner la NOUVELLE révision du BOM",
+            filetypes=[("Excel files", "*.xlsx *.xls"), ("All files", "*.*")],
+            initialdir=self._last_dir,
+        )
+        if not new_file:
+            return
+        self._remember_dir(new_file)
+
+        def compare_thread():
+            try:
+                self._progress_start()
+                self.clear_results()
+
+                self.log_header(f"🔀 RÉVISIONS: {Path(old_file).name} → {Path(new_file).name}")
+
+                for file_path in (old_file, new_file):
+                    can_access, error_msg = self.check_file_access(file_path)
+                    if not can_access:
+                        self.log_error(f"Impossible d'accéder au fichier {Path(file_path).name}: {error_msg}")
+                        return
+
+                diff = diff_bom_files(old_file, new_file)
+                summary = diff_summary(diff)
+
+                self.log_section("CHANGEMENTS")
+                self.log_info(f"🆕 Ajoutés: {summary['ajoutes']}")
+                self.log_info(f"🗑️ Supprimés: {summary['supprimes']}")
+                self.log_info(f"🔢 Quantité modifiée: {summary['quantite_modifiee']}")
+                self.log_info(f"🏷️ Désignateur modifié: {summary['designateur_modifie']}")
+                self.log_info(f"✔️ Inchangés: {summary['inchanges']}")
+
+                for row in diff['ajoutes'].head(10).itertuples(index=False):
+                    self.log_info(f"    + [{row.domain}] {row.name} ({row.component_type})")
+                for row in diff['supprimes'].head(10).itertuples(index=False):
+                    self.log_info(f"    - [{row.domain}] {row.name} ({row.component_type})")
+
+                components_by_domain = components_to_generate(diff, self.generator)
+                if not components_by_domain:
+                    self.log_success("Aucun nouveau composant: pas de SKU à générer")
+                    return
+
+                # Validation puis génération limitées aux composants ajoutés
+                self.root.after(0, lambda: self.show_validation_window(components_by_domain, new_file))
+
+            except PermissionError:
+                self.log_error("Fichier en cours d'utilisation ou accès refusé")
+                self.log_info("💡 Fermez le fichier Excel et réessayez")
+            except Exception as e:
+                self.log_error(f"Erreur lors de la comparaison: {str(e)}")
+            finally:
+                self._progress_stop()
+
+        thread = threading.Thread(target=compare_thread)
+        thread.daemon = True
+        thread.start()
+
     def process_bom(self):
         """Traiter un BOM et générer les SKU"""
         file_path = filedialog.askopenfilename(
@@ -342,7 +471,7 @@ class SKUGeneratorGUI:
 
         if not file_path:
             return
-        self._last_dir = os.path.dirname(file_path)
+        self._remember_dir(file_path)
 
         def process_thread():
             try:
@@ -410,6 +539,8 @@ class SKUGeneratorGUI:
 
     def process_validated_components(self, selected_components, file_path):
         """Traiter les composants validés et générer les SKU"""
+        profile = self.profile_var.get()  # Lu dans le thread de l'interface
+
         def process_thread():
             try:
                 self._progress_start()
@@ -419,21 +550,38 @@ class SKUGeneratorGUI:
                 self.log_info(f"Fichier: {Path(file_path).name}")
 
                 # Générer les SKU pour les composants sélectionnés
-                results = self.processor.generate_skus_for_selected_components(selected_components)
-
-                # Générer le nom de fichier de sortie
-                input_name = Path(file_path).stem
-                output_file = f"SKU_{input_name}.xlsx"
-
-                # Exporter les résultats
-                self.processor.export_results(results, output_file)
+                instrumentation.reset()
+                with profiled(f"generation_{Path(file_path).stem}", profile) as session:
+                    results = self.processor.generate_skus_for_selected_components(selected_components)
+
+                    # Générer le nom de fichier de sortie
+                    input_name = Path(file_path).stem
+                    output_file = f"SKU_{input_name}.xlsx"
+
+                    # Exporter les résultats et l'ODOO en parallèle (ODOO: seulement les SKU
+                    # ajoutés/modifiés depuis le dernier export)
+                    report = run_export_stage(results, [
+                        ExportJob('excel', output_file),
+                        ExportJob('odoo_delta_csv', f"ODOO_{output_file}",
+                                  {'db_path': self.generator.db_path, 'target': 'gui_csv'}),
+                    ])
+                self.log_profile(session)
+
+                excel_report = report['formats']['excel']
+                if excel_report['erreur']:
+                    raise RuntimeError(f"Export Excel: {excel_report['erreur']}")
+
+                odoo_report = report['formats']['odoo_delta_csv']
+                if odoo_report['erreur']:
+                    self.log_error(f"Erreur export ODOO: {odoo_report['erreur']}")
+                elif odoo_report['lignes']:
+                    self.log_info(f"📤 Export ODOO: {odoo_report['lignes']} produits nouveaux ou modifiés → {odoo_report['fichier']}")
+                else:
+                    self.log_info("📤 Export ODOO: aucun changement depuis le dernier export")
 
-                # Export ODOO automatique
-                try:
-                    odoo_count, odoo_file = self.odoo_integration.export_to_odoo_csv(results, f"ODOO_{output_file}")
-                    self.log_info(f"📤 Export ODOO: {odoo_count} produits → {odoo_file}")
-                except Exception as e:
-                    self.log_error(f"Erreur export ODOO: {str(e)}")
+                timings = ", ".join(f"{name} {entry['secondes']:.2f} s"
+                                    for name, entry in report['formats'].items() if entry['erreur'] is None)
+                self.log_info(f"⏱️ Exports: {timings} (total {report['secondes']:.2f} s)")
 
                 # Afficher le résumé par domaine
                 self.log_section("RÉSULTATS DU TRAITEMENT")
@@ -447,6 +595,7 @@ class SKUGeneratorGUI:
 
                 self.log_success(f"✅ TRAITEMENT TERMINÉ: {total_components} composants")
                 self.log_info(f"📁 Fichier généré: {output_file}")
+                self.log_timings()
 
                 # Mettre à jour les statistiques
                 self.update_stats()
@@ -482,7 +631,7 @@ class SKUGeneratorGUI:
 
         if not file_path:
             return
-        self._last_dir = os.path.dirname(file_path)
+        self._remember_dir(file_path)
 
         def process_thread():
             try:
@@ -570,6 +719,65 @@ class SKUGeneratorGUI:
         thread.daemon = True
         thread.start()
 
+    # ---------- Recherche incrémentale ----------
+    def _on_search_keystroke(self, event):
+        """Relancer le minuteur de debounce à chaque frappe dans la zone SKU"""
+        if event.keysym in ('Return', 'KP_Enter'):
+            return
+
+        if self._search_after_id is not None:
+            self.root.after_cancel(self._search_after_id)
+        self._search_after_id = self.root.after(self.SEARCH_DEBOUNCE_MS, self._run_live_search)
+
+    def _run_live_search(self):
+        """Lancer une recherche incrémentale; toute recherche précédente devient périmée"""
+        self._search_after_id = None
+        self._search_generation += 1
+        generation = self._search_generation
+
+        text = self.search_entry.get().strip().upper()
+        if not text:
+            return
+
+        def is_cancelled():
+            return generation != self._search_generation
+
+        def live_search_thread():
+            try:
+                results = self.search_index.search(text, self.LIVE_SEARCH_LIMIT, is_cancelled=is_cancelled)
+            except Exception as e:
+                self.root.after(0, lambda: self._show_live_error(generation, str(e)))
+                return
+            if results is not None and not is_cancelled():
+                self.root.after(0, lambda: self._show_live_results(generation, text, results))
+
+        threading.Thread(target=live_search_thread, daemon=True).start()
+
+    def _show_live_results(self, generation, text, results):
+        """Afficher les résultats incrémentaux (ignorés s'ils sont périmés)"""
+        if generation != self._search_generation:
+            return
+
+        self.results_text.delete(1.0, tk.END)
+        self.results_text.insert(tk.END, f"🔎 Suggestions pour '{text}' ", "header")
+        self.results_text.insert(tk.END, f"({len(results)} résultat(s), {len(self.search_index)} SKU indexés)\n", "info")
+        self.results_text.insert(tk.END, "-" * 40 + "\n", "separator")
+
+        if not results:
+            self.results_text.insert(tk.END, "Aucun SKU correspondant\n", "info")
+            return
+
+        for comp in results:
+            self.results_text.insert(tk.END, f"    • {comp['nom']:<25} → ", "info")
+            self.results_text.insert(tk.END, f"{comp['sku']}\n", "sku")
+        self.results_text.insert(tk.END, "\n⏎ Entrée pour le détail complet du SKU\n", "info")
+
+    def _show_live_error(self, generation, message):
+        if generation != self._search_generation:
+            return
+        self.results_text.delete(1.0, tk.END)
+        self.results_text.insert(tk.END, f"❌ Erreur lors de la recherche: {message}\n", "error")
+
     def search_sku(self):
         """Rechercher un composant par son SKU"""
         sku = self.search_entry.get().strip().upper()
@@ -578,6 +786,12 @@ class SKUGeneratorGUI:
             messagebox.showwarning("Recherche", "Veuillez entrer un SKU à rechercher")
             return
 
+        # Annuler toute recherche incrémentale en attente ou en cours
+        if self._search_after_id is not None:
+            self.root.after_cancel(self._search_after_id)
+            self._search_after_id = None
+        self._search_generation += 1
+
         def search_thread():
             try:
                 self._progress_start()
@@ -678,10 +892,11 @@ class SKUGeneratorGUI:
                     self.log_info("   2. Assurez-vous que le composant a été traité")
                     self.log_info("   3. Formats acceptés: DOMAINE-ROUTE-ROUTING-TYPE-SEQUENCE ou FAMILLE-SOUS_FAMILLE-SEQUENCE")
 
-                    # Proposer une recherche partielle
+                    # Proposer une recherche partielle (servie par l'index en mémoire)
                     if '-' in sku:
                         self.log_info("\\n🔍 Recherche de SKU similaires...")
-                        partial_results = self.generator.search_partial_sku(sku)
+                        self.search_index.ensure_loaded()
+                        partial_results = self.search_index.search_substring(sku, limit=15)
                         if partial_results:
                             self.log_section("SKU SIMILAIRES TROUVÉS")
                             for comp in partial_results[:10]:
@@ -812,8 +1027,11 @@ class SKUGeneratorGUI:
 
 def main():
     """Fonction principale"""
+    setup_logging()
     root = tk.Tk()
     app = SKUGeneratorGUI(root)
+    db_backup.enable_auto_backup(app.generator.db_path)
+    sku_journal.enable_journal(app.generator.db_path)
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Instrumentation des chemins chauds: où passe le temps d'un traitement de BOM
+
+    with instrumentation.span('bom.lecture') as s:
+        excel_data = read_bom(file_path)
+        s.add_rows(sum(len(df) for df in excel_data.values()))
+    instrumentation.count('sku.nouveaux')
+
+Étapes (appels, secondes, lignes), compteurs et requêtes SQLite (via connect())
+sont agrégés par nom. Désactivée par défaut: span() retourne alors un objet
+partagé sans effet et count() sort immédiatement, le coût se limite à un test
+de booléen. main.py et l'interface l'activent selon INSTRUMENTATION_CONFIG.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _NullSpan:
+    """Étape non mesurée (instrumentation désactivée)"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def add_rows(self, rows: int):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('recorder', 'name', 'rows', 'start')
+
+    def __init__(self, recorder: 'Recorder', name: str, rows: int):
+        self.recorder = recorder
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.recorder.record(self.name, time.perf_counter() - self.start, self.rows)
+        return False
+
+    def add_rows(self, rows: int):
+        self.rows += rows
+
+
+class Recorder:
+    """Mesures agrégées d'un traitement (thread-safe)"""
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        # Fonctions recevant chaque requête SQL exécutée (traces du mode profilage)
+        self._statement_listeners: Tuple[Callable[[str], None], ...] = ()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.perf_counter()
+            self.stages: Dict[str, List[float]] = {}  # nom -> [appels, secondes, lignes]
+            self.counters: Dict[str, int] = {}
+            self.statements: Dict[str, int] = {}      # SELECT/INSERT/... -> nombre
+
+    def span(self, name: str, rows: int = 0):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, rows)
+
+    def record(self, name: str, seconds: float, rows: int = 0):
+        """Ajouter une durée mesurée ailleurs (ex: dans un autre processus)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = [0, 0.0, 0]
+            stage[0] += 1
+            stage[1] += seconds
+            stage[2] += rows or 0
+
+    def count(self, name: str, n: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def _count_statement(self, statement: str):
+        kind = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'AUTRE'
+        with self._lock:
+            self.statements[kind] = self.statements.get(kind, 0) + 1
+
+    def add_statement_listener(self, listener: Callable[[str], None]):
+        with self._lock:
+            self._statement_listeners += (listener,)
+
+    def remove_statement_listener(self, listener: Callable[[str], None]):
+        with self._lock:
+            self._statement_listeners = tuple(l for l in self._statement_listeners if l is not listener)
+
+    def connect(self, db_path: str, **kwargs) -> sqlite3.Connection:
+        """sqlite3.connect dont les requêtes sont comptées (et tracées) quand l'instrumentation est active"""
+        conn = sqlite3.connect(db_path, **kwargs)
+        if self.enabled or self._statement_listeners:
+            last = [None]
+
+            def trace(statement: str):
+                # Chaque instruction d'un trigger rappelle la requête qui l'a déclenché (texte
+                # identique, ou '-- TRIGGER' selon la version de SQLite): comptée une seule fois
+                if statement == last[0] or statement.startswith('--'):
+                    return
+                last[0] = statement
+                if self.enabled:
+                    self._count_statement(statement)
+                for listener in self._statement_listeners:
+                    listener(statement)
+
+            conn.set_trace_callback(trace)
+        return conn
+
+    def summary(self) -> dict:
+        """
+        {'duree': secondes depuis reset(),
+         'etapes': {nom: {'appels', 'secondes', 'lignes'}} (triées par durée décroissante),
+         'compteurs': {nom: valeur},
+         'requetes_sql': {'total': n, 'par_type': {SELECT: n, ...}}}
+        """
+        with self._lock:
+            stages = sorted(self.stages.items(), key=lambda item: item[1][1], reverse=True)
+            return {
+                'duree': round(time.perf_counter() - self.started, 6),
+                'etapes': {name: {'appels': int(calls), 'secondes': round(seconds, 6), 'lignes': int(rows)}
+                           for name, (calls, seconds, rows) in stages},
+                'compteurs': dict(sorted(self.counters.items())),
+                'requetes_sql': {'total': sum(self.statements.values()),
+                                 'par_type': dict(sorted(self.statements.items()))},
+            }
+
+
+# Enregistreur du processus
+recorder = Recorder()
+
+
+def enable():
+    recorder.enabled = True
+
+
+def disable():
+    recorder.enabled = False
+
+
+def is_enabled() -> bool:
+    return recorder.enabled
+
+
+def reset():
+    recorder.reset()
+
+
+def span(name: str, rows: int = 0):
+    """Contexte mesurant une étape; span.add_rows(n) pour le nombre de lignes traitées"""
+    return recorder.span(name, rows)
+
+
+def record(name: str, seconds: float, rows: int = 0):
+    recorder.record(name, seconds, rows)
+
+
+def count(name: str, n: int = 1):
+    recorder.count(name, n)
+
+
+def connect(db_path: str, **kwargs) -> sqlite3.Connection:
+    return recorder.connect(db_path, **kwargs)
+
+
+def summary() -> dict:
+    return recorder.summary()
+
+
+def format_summary(data: Optional[dict] = None) -> List[str]:
+    """Résumé lisible (une ligne par étape, compteurs, requêtes SQL)"""
+    data = data or summary()
+    lines = [f"Durée totale: {data['duree']:.2f} s"]
+    for name, stage in data['etapes'].items():
+        rows = f", {stage['lignes']} lignes" if stage['lignes'] else ""
+        lines.append(f"  {name:<28} {stage['secondes']:>8.3f} s  ({stage['appels']} appel(s){rows})")
+    if data['compteurs']:
+        lines.append("Compteurs: " + ", ".join(f"{name}={value}" for name, value in data['compteurs'].items()))
+    sql = data['requetes_sql']
+    if sql['total']:
+        detail = ", ".join(f"{kind} {value}" for kind, value in sql['par_type'].items())
+        lines.append(f"Requêtes SQL: {sql['total']} ({detail})")
+    return lines
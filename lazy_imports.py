@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Import différé des dépendances lourdes (pandas, NumPy)
+
+    pd = lazy_import('pandas')
+
+`pd` est un module vide jusqu'au premier accès à un attribut (pd.DataFrame,
+pd.read_excel...), qui importe réellement pandas. Ouvrir l'interface ou chercher
+un SKU ne paie donc plus l'import de pandas/NumPy (~0,3 s). Les annotations de
+type qui mentionnent pd.DataFrame doivent rester non évaluées
+(`from __future__ import annotations` dans le module).
+"""
+
+import importlib
+import sys
+import threading
+import types
+
+_lock = threading.Lock()
+
+
+class LazyModule(types.ModuleType):
+    """Module chargé au premier accès à l'un de ses attributs"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_loaded'] = False
+
+    def _load(self) -> types.ModuleType:
+        with _lock:
+            module = importlib.import_module(self.__name__)
+            if not self.__dict__['_lazy_loaded']:
+                # Attributs recopiés: les accès suivants ne passent plus par __getattr__
+                self.__dict__.update(module.__dict__)
+                self.__dict__['_lazy_loaded'] = True
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "chargé" if self.__dict__['_lazy_loaded'] else "différé"
+        return f"<module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Le module s'il est déjà importé, sinon un LazyModule"""
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
+
+
+def is_loaded(name: str) -> bool:
+    """Le module a-t-il réellement été importé ?"""
+    return name in sys.modules
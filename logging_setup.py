@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Configuration des logs hors du chemin chaud
+
+Les modules ne font que logging.getLogger(__name__); les points d'entrée
+(main.py, gui.py, scripts en ligne de commande) appellent setup_logging() une
+fois. Les enregistrements passent par une file (QueueHandler): le thread qui
+génère les SKU ne fait qu'y déposer l'enregistrement, la mise en forme et
+l'écriture (console et sku_generator.log avec rotation par taille) se font
+dans le thread du QueueListener.
+
+Les messages par SKU sont en DEBUG et échantillonnés (SampledLogger): un lot
+de 100 000 composants n'écrit pas 100 000 lignes, le résumé du lot suffit.
+"""
+
+import atexit
+import itertools
+import logging
+import logging.handlers
+import queue
+import threading
+from typing import Optional
+
+from config import LOGGING_CONFIG
+
+_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler qui ne met pas en forme dans le thread appelant.
+    QueueHandler.prepare() formate le message complet (date, niveau) avant la mise
+    en file; ici seul le message est résolu (arguments %) et la mise en forme est
+    laissée aux handlers du listener. La file ne quitte pas le processus.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+def setup_logging(level: Optional[str] = None, log_file: Optional[str] = None,
+                  console: Optional[bool] = None) -> logging.handlers.QueueListener:
+    """
+    Installer la journalisation asynchrone sur le logger racine (idempotent: un
+    second appel remplace la configuration précédente). Paramètres absents:
+    valeurs de LOGGING_CONFIG. log_file='' désactive le fichier.
+    """
+    global _listener, _queue_handler
+
+    level = level or LOGGING_CONFIG.get("level", "INFO")
+    log_file = LOGGING_CONFIG.get("file") if log_file is None else log_file
+    console = LOGGING_CONFIG.get("console", True) if console is None else console
+    formatter = logging.Formatter(LOGGING_CONFIG.get("format", "%(asctime)s - %(levelname)s - %(message)s"))
+
+    handlers = []
+    if log_file:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=LOGGING_CONFIG.get("max_bytes", 5 * 1024 * 1024),
+            backupCount=LOGGING_CONFIG.get("backup_count", 5),
+            encoding='utf-8',
+            delay=True,
+        )
+        handlers.append(file_handler)
+    if console:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    with _lock:
+        _stop_listener()
+        log_queue = queue.SimpleQueue()
+        _queue_handler = _DeferredQueueHandler(log_queue)
+        root = logging.getLogger()
+        root.addHandler(_queue_handler)
+        root.setLevel(level)
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        return _listener
+
+
+def _stop_listener():
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        # stop() vide la file avant de rendre la main: aucun message perdu
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def shutdown_logging():
+    """Écrire les messages en attente et fermer les fichiers (appelé à la sortie)"""
+    with _lock:
+        _stop_listener()
+
+
+atexit.register(shutdown_logging)
+
+
+class SampledLogger:
+    """
+    Messages DEBUG à haute fréquence (un par SKU): un sur `every` est transmis.
+    Rien n'est calculé quand DEBUG est désactivé; passer les valeurs en arguments
+    (style %) plutôt qu'en f-string pour que la mise en forme n'ait lieu que si le
+    message est retenu.
+    """
+
+    def __init__(self, logger: logging.Logger, every: Optional[int] = None):
+        self.logger = logger
+        self.every = max(1, every or LOGGING_CONFIG.get("sample_every", 100))
+        self._counter = itertools.count()  # next() est atomique sous le GIL
+
+    def debug(self, msg: str, *args):
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        if next(self._counter) % self.every == 0:
+            self.logger.debug(msg, *args)
@@ -3,12 +3,28 @@
 Script principal pour traiter les fichiers BOM et générer les SKU
 """
 
-import pandas as pd
+from __future__ import annotations
+
+import argparse
 import sys
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from sku_generator import SKUGenerator, Component
+from bom_cache import read_bom
+import db_backup
+import instrumentation
+import mapping_registry
+import sku_journal
+from config import INSTRUMENTATION_CONFIG
+from logging_setup import setup_logging
+from profiling import profiled
+from excel_writer import write_excel
 from typing import Dict, List
 import logging
+from lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +34,26 @@ class BOMProcessor:
     def __init__(self, sku_generator: SKUGenerator):
         self.sku_generator = sku_generator
 
+    @contextmanager
+    def _batch_summary(self, domain: str, rows: int):
+        """Résumé INFO d'un lot de génération (les messages par SKU sont en DEBUG échantillonné)"""
+        before = dict(self.sku_generator.generation_counts)
+        start = time.perf_counter()
+        yield
+        counts = {key: value - before.get(key, 0) for key, value in self.sku_generator.generation_counts.items()}
+        logger.info(f"Lot {domain}: {rows} lignes -> {counts.get('nouveaux', 0)} nouveaux SKU, "
+                    f"{counts.get('existants', 0)} existants, {counts.get('rejetes', 0)} rejetés "
+                    f"({time.perf_counter() - start:.2f} s)")
+
+    def _read_bom(self, file_path: str) -> dict:
+        """Lire toutes les feuilles du BOM (étape 'bom.lecture' de l'instrumentation)"""
+        # Tables de correspondance modifiées depuis le BOM précédent: nouvelle version
+        mapping_registry.reload_if_changed()
+        with instrumentation.span('bom.lecture') as span:
+            excel_data = read_bom(file_path)
+            span.add_rows(sum(len(df) for df in excel_data.values()))
+        return excel_data
+
     def process_electrical_bom(self, df: pd.DataFrame) -> pd.DataFrame:
         """Traite le BOM électrique"""
         results = []
@@ -142,10 +178,12 @@ class BOMProcessor:
         results = {}
 
         for domain, components in components_by_domain.items():
-            if domain == "ELEC":
-                results["Électrique"] = self._process_selected_electrical_components(components)
-            elif domain == "MECA":
-                results["Mécanique"] = self._process_selected_mechanical_components(components)
+            with instrumentation.span(f'generation.{domain.lower()}', len(components)), \
+                    self._batch_summary(domain, len(components)):
+                if domain == "ELEC":
+                    results["Électrique"] = self._process_selected_electrical_components(components)
+                elif domain == "MECA":
+                    results["Mécanique"] = self._process_selected_mechanical_components(components)
 
         return results
 
@@ -206,21 +244,23 @@ class BOMProcessor:
 
         try:
             # Lire toutes les feuilles
-            excel_data = pd.read_excel(file_path, sheet_name=None)
+            excel_data = self._read_bom(file_path)
 
             components_by_domain = {}
 
             # Extraire les composants électriques
             if 'BOM Électrique' in excel_data:
                 logger.info("Extraction des composants électriques...")
-                elec_components = self.extract_electrical_components(excel_data['BOM Électrique'])
+                with instrumentation.span('extraction.elec', len(excel_data['BOM Électrique'])):
+                    elec_components = self.extract_electrical_components(excel_data['BOM Électrique'])
                 if elec_components:
                     components_by_domain['ELEC'] = elec_components
 
             # Extraire les composants mécaniques
             if 'BOM Mécanique' in excel_data:
                 logger.info("Extraction des composants mécaniques...")
-                meca_components = self.extract_mechanical_components(excel_data['BOM Mécanique'])
+                with instrumentation.span('extraction.meca', len(excel_data['BOM Mécanique'])):
+                    meca_components = self.extract_mechanical_components(excel_data['BOM Mécanique'])
                 if meca_components:
                     components_by_domain['MECA'] = meca_components
 
@@ -285,21 +325,25 @@ class BOMProcessor:
 
         try:
             # Lire toutes les feuilles
-            excel_data = pd.read_excel(file_path, sheet_name=None)
+            excel_data = self._read_bom(file_path)
 
             results = {}
 
             # Traiter BOM Électrique
             if 'BOM Électrique' in excel_data:
                 logger.info("Traitement BOM Électrique...")
-                elec_results = self.process_electrical_bom(excel_data['BOM Électrique'])
+                with instrumentation.span('generation.elec', len(excel_data['BOM Électrique'])), \
+                        self._batch_summary('ELEC', len(excel_data['BOM Électrique'])):
+                    elec_results = self.process_electrical_bom(excel_data['BOM Électrique'])
                 results['Électrique'] = elec_results
                 logger.info(f"BOM Électrique: {len(elec_results)} composants traités")
 
             # Traiter BOM Mécanique
             if 'BOM Mécanique' in excel_data:
                 logger.info("Traitement BOM Mécanique...")
-                meca_results = self.process_mechanical_bom(excel_data['BOM Mécanique'])
+                with instrumentation.span('generation.meca', len(excel_data['BOM Mécanique'])), \
+                        self._batch_summary('MECA', len(excel_data['BOM Mécanique'])):
+                    meca_results = self.process_mechanical_bom(excel_data['BOM Mécanique'])
                 results['Mécanique'] = meca_results
                 logger.info(f"BOM Mécanique: {len(meca_results)} composants traités")
 
@@ -311,35 +355,50 @@ class BOMProcessor:
 
     def export_results(self, results: dict, output_file: str):
         """Exporte les résultats vers un fichier Excel"""
-        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-            for domain, df in results.items():
-                df.to_excel(writer, sheet_name=f"SKU_{domain}", index=False)
+        sheets = {f"SKU_{domain}": df for domain, df in results.items()}
+        with instrumentation.span('export.excel', sum(len(df) for df in results.values())):
+            backend = write_excel(output_file, sheets)
 
-        logger.info(f"Résultats exportés vers: {output_file}")
+        logger.info(f"Résultats exportés vers: {output_file} (moteur {backend})")
 
 def main():
     """Fonction principale"""
-    # Configuration du logging
-    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    # Configuration du logging (asynchrone, fichier avec rotation)
+    setup_logging()
+
+    parser = argparse.ArgumentParser(description="Traiter un BOM et générer les SKU")
+    parser.add_argument("input_file", nargs="?", default="(V2.1) BOM unifié électrique-mécanique.xlsx",
+                        help="Fichier BOM (gabarit unifié)")
+    parser.add_argument("--output", default="SKU_Results.xlsx", help="Classeur des résultats")
+    parser.add_argument("--profile", action="store_true",
+                        help="Enregistrer un profil (cProfile + requêtes SQL) dans profiles/")
+    args = parser.parse_args()
 
     # Fichier d'entrée
-    input_file = "(V2.1) BOM unifié électrique-mécanique.xlsx"
-    output_file = "SKU_Results.xlsx"
+    input_file = args.input_file
+    output_file = args.output
 
     if not Path(input_file).exists():
         logger.error(f"Fichier non trouvé: {input_file}")
         sys.exit(1)
 
+    if INSTRUMENTATION_CONFIG.get("enabled", False):
+        instrumentation.enable()
+        instrumentation.reset()
+
     try:
         # Initialiser le générateur de SKU
         generator = SKUGenerator()
+        db_backup.enable_auto_backup(generator.db_path)
+        sku_journal.enable_journal(generator.db_path)
         processor = BOMProcessor(generator)
 
-        # Traiter le fichier BOM
-        results = processor.process_bom_file(input_file)
+        with profiled(f"main_{Path(input_file).stem}", args.profile) as session:
+            # Traiter le fichier BOM
+            results = processor.process_bom_file(input_file)
 
-        # Exporter les résultats
-        processor.export_results(results, output_file)
+            # Exporter les résultats
+            processor.export_results(results, output_file)
 
         # Afficher un résumé
         print("\n" + "="*50)
@@ -362,6 +421,16 @@ def main():
         print(f"Résultats sauvegardés dans: {output_file}")
         print("Base de données SKU: sku_database.db")
 
+        if instrumentation.is_enabled():
+            print("\n" + "="*50)
+            print("DURÉE DES ÉTAPES")
+            print("="*50)
+            for line in instrumentation.format_summary():
+                print(line)
+
+        if session is not None:
+            print(f"\n🔬 Profil enregistré: {session.archive_path or session.directory}")
+
     except Exception as e:
         logger.error(f"Erreur fatale: {e}")
         sys.exit(1)
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Registre des tables de correspondance (types, routes, routings)
+
+Les tables viennent de config.py (SKU_TYPE_MAPPING, CUSTOM_COMPONENT_TYPES si
+MAPPING_CONFIG['include_custom_types'], ELECTRICAL_/MECHANICAL_ROUTES, ELECTRICAL_/MECHANICAL_ROUTINGS) ou d'un fichier
+JSON externe (MAPPING_CONFIG['file']). Elles sont compilées une fois par
+processus en une version immuable partagée par tous les SKUGenerator: tables
+inverses et clés nettoyées de normalize_text sont précalculées, créer un
+générateur ne reconstruit plus rien.
+
+    mappings = registry.current()       # CompiledMappings (version n)
+    registry.reload()                   # relit la source -> version n + 1
+    registry.reload_if_changed()        # idem si le fichier source a été modifié
+
+Une version compilée n'est jamais modifiée: un traitement en cours garde la
+sienne, les traitements suivants voient la nouvelle.
+"""
+
+import importlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+
+import config
+
+logger = logging.getLogger(__name__)
+
+SECTIONS = ('types', 'routes', 'routings')
+
+
+def clean_type_name(text: str) -> str:
+    """Forme comparée par normalize_text (majuscules, sans espaces ni É/È)"""
+    return text.upper().replace(' ', '').replace('È', 'E').replace('É', 'E')
+
+
+def _reverse(mapping: Dict[str, str]) -> Mapping[str, str]:
+    # En cas de code partagé, la dernière entrée gagne (même ordre que la table)
+    return MappingProxyType({code: name for name, code in mapping.items()})
+
+
+@dataclass(frozen=True)
+class CompiledMappings:
+    """Tables figées d'une version du registre"""
+    version: int
+    source: str
+    type_mapping: Mapping[str, str]
+    route_mapping: Mapping[str, str]
+    routing_mapping: Mapping[str, str]
+    # (nom nettoyé, code) dans l'ordre de la table: premier trouvé, premier servi
+    type_keys: Tuple[Tuple[str, str], ...]
+    route_keys: Tuple[Tuple[str, str], ...]
+    routing_keys: Tuple[Tuple[str, str], ...]
+    # Tables inverses code -> nom (décodage des SKU)
+    reverse: Mapping[str, Mapping[str, str]]
+
+
+def compile_mappings(type_mapping: Dict[str, str], route_mapping: Dict[str, str],
+                     routing_mapping: Dict[str, str], version: int = 1,
+                     source: str = "config") -> CompiledMappings:
+    """Compiler des tables nom -> code en structures de recherche immuables"""
+    for section, mapping in zip(SECTIONS, (type_mapping, route_mapping, routing_mapping)):
+        invalid = [name for name, code in mapping.items()
+                   if not isinstance(name, str) or not isinstance(code, str) or not name or not code]
+        if invalid:
+            raise ValueError(f"Table '{section}' ({source}): entrées invalides {invalid[:5]}")
+
+    type_mapping = dict(type_mapping)
+    route_mapping = dict(route_mapping)
+    routing_mapping = dict(routing_mapping)
+    return CompiledMappings(
+        version=version,
+        source=source,
+        type_mapping=MappingProxyType(type_mapping),
+        route_mapping=MappingProxyType(route_mapping),
+        routing_mapping=MappingProxyType(routing_mapping),
+        type_keys=tuple((clean_type_name(name), code) for name, code in type_mapping.items()),
+        route_keys=tuple((name.upper(), code) for name, code in route_mapping.items()),
+        routing_keys=tuple((name.upper(), code) for name, code in routing_mapping.items()),
+        reverse=MappingProxyType({
+            'type': _reverse(type_mapping),
+            'route': _reverse(route_mapping),
+            'routing': _reverse(routing_mapping),
+        }),
+    )
+
+
+def tables_from_config(module=config) -> Dict[str, Dict[str, str]]:
+    """Tables {'types', 'routes', 'routings'} définies dans config.py"""
+    mapping_config = getattr(module, 'MAPPING_CONFIG', {})
+    types = dict(module.SKU_TYPE_MAPPING)
+    if mapping_config.get("include_custom_types", False):
+        for name, code in module.get_component_type_mapping().items():
+            types.setdefault(name, code)
+    return {
+        'types': types,
+        'routes': module.get_route_mapping(),
+        'routings': module.get_routing_mapping(),
+    }
+
+
+def tables_from_file(file_path: str, defaults: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
+    """Fichier JSON {'types': {...}, 'routes': {...}, 'routings': {...}}; section absente: `defaults`"""
+    with open(file_path, encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{file_path}: objet JSON attendu")
+    unknown = sorted(set(data) - set(SECTIONS))
+    if unknown:
+        raise ValueError(f"{file_path}: sections inconnues {unknown} (attendues: {list(SECTIONS)})")
+    return {section: dict(data.get(section, defaults[section])) for section in SECTIONS}
+
+
+class MappingRegistry:
+    """Version courante des tables, rechargeable à chaud (thread-safe)"""
+
+    def __init__(self, file_path: Optional[str] = None):
+        self._lock = threading.Lock()
+        self._file_path = file_path
+        self._version = 0
+        self._mappings: Optional[CompiledMappings] = None
+        self._source_mtime: Optional[int] = None
+
+    def _source_path(self) -> str:
+        return self._file_path or config.MAPPING_CONFIG.get("file") or config.__file__
+
+    def _mtime(self, path: str) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self, reload_config: bool) -> CompiledMappings:
+        module = importlib.reload(config) if reload_config else config
+        tables = tables_from_config(module)
+        file_path = self._file_path or module.MAPPING_CONFIG.get("file")
+        source = "config"
+        if file_path:
+            tables = tables_from_file(file_path, tables)
+            source = file_path
+
+        mtime = self._mtime(self._source_path())
+        mappings = compile_mappings(tables['types'], tables['routes'], tables['routings'],
+                                    self._version + 1, source)
+        self._version = mappings.version
+        self._mappings = mappings
+        self._source_mtime = mtime
+        return mappings
+
+    def current(self) -> CompiledMappings:
+        mappings = self._mappings
+        if mappings is not None:
+            return mappings
+        with self._lock:
+            if self._mappings is None:
+                self._load(reload_config=False)
+            return self._mappings
+
+    @property
+    def version(self) -> int:
+        return self.current().version
+
+    def reload(self, file_path: Optional[str] = None) -> CompiledMappings:
+        """
+        Relire la source (config.py rechargé, ou `file_path`/MAPPING_CONFIG['file']).
+        Une source invalide lève ValueError et laisse la version courante en place.
+        """
+        with self._lock:
+            previous_file = self._file_path
+            if file_path is not None:
+                self._file_path = file_path
+            try:
+                mappings = self._load(reload_config=True)
+            except Exception:
+                self._file_path = previous_file
+                raise
+        logger.info(f"Tables de correspondance rechargées: version {mappings.version} ({mappings.source})")
+        return mappings
+
+    def reload_if_changed(self) -> bool:
+        """Recharger si le fichier source a changé depuis le dernier chargement"""
+        self.current()
+        if self._mtime(self._source_path()) == self._source_mtime:
+            return False
+        try:
+            self.reload()
+        except (OSError, ValueError, SyntaxError) as e:
+            logger.error(f"Rechargement des tables ignoré: {e}")
+            # Ne pas réessayer tant que le fichier n'a pas encore changé
+            self._source_mtime = self._mtime(self._source_path())
+            return False
+        return True
+
+
+# Registre du processus
+registry = MappingRegistry()
+
+
+def current() -> CompiledMappings:
+    return registry.current()
+
+
+def reload(file_path: Optional[str] = None) -> CompiledMappings:
+    return registry.reload(file_path)
+
+
+def reload_if_changed() -> bool:
+    return registry.reload_if_changed()
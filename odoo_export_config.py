@@ -3,6 +3,13 @@
 Configuration pour l'export vers ODOO
 """
 
+from __future__ import annotations
+
+from lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
+
+
 class ODOOExportConfig:
     """Configuration des colonnes pour export ODOO"""
 
@@ -55,50 +62,93 @@ class ODOOExportConfig:
         'DOC': 'Documentation'
     }
 
+    # Connexion JSON-RPC pour l'envoi direct des produits (mot de passe: variable ODOO_PASSWORD)
+    PUSH_SETTINGS = {
+        'url': 'http://localhost:8069',
+        'database': 'odoo',
+        'username': 'admin',
+        'batch_size': 500,                        # Produits par appel create/search_read
+        'max_workers': 4,                         # Lots envoyés en parallèle
+        'max_retries': 3,                         # Nouvelles tentatives par requête
+        'backoff': 0.5,                           # Délai initial (s), doublé à chaque essai
+        'timeout': 30,                            # Délai réseau par requête (s)
+    }
+
+    # Champs product.product envoyés par défaut (les champs x_* exigent un module personnalisé)
+    PUSH_FIELDS = [
+        'default_code', 'name', 'description', 'categ_id', 'type',
+        'standard_price', 'list_price', 'active', 'sale_ok', 'purchase_ok'
+    ]
+
+# Variantes FR/EN acceptées pour chaque domaine (clés en majuscules, sans espaces de bord)
+DOMAIN_ALIASES = {
+    'ELEC': 'ELEC',
+    'ELECTRIQUE': 'ELEC',
+    'ÉLECTRIQUE': 'ELEC',
+    'ELECTRICAL': 'ELEC',
+    'MECA': 'MECA',
+    'MECANIQUE': 'MECA',
+    'MÉCANIQUE': 'MECA',
+    'MECHANICAL': 'MECA',
+}
+
 def _normalize_domain(domain_value: str) -> str:
     """Normaliser la valeur de domaine vers les clés attendues ELEC/MECA."""
     if not isinstance(domain_value, str):
         return 'DOC'
-    val = domain_value.strip().upper()
-    # Gérer variantes FR/EN
-    if val in ('ELEC', 'ELECTRIQUE', 'ÉLECTRIQUE', 'ELECTRICAL'):
-        return 'ELEC'
-    if val in ('MECA', 'MECANIQUE', 'MÉCANIQUE', 'MECHANICAL'):
-        return 'MECA'
-    return 'DOC'
+    return DOMAIN_ALIASES.get(domain_value.strip().upper(), 'DOC')
 
-def prepare_odoo_export(df_results):
-    """Préparer les données pour export ODOO"""
+def _normalize_domain_series(domain_values: pd.Series) -> pd.Series:
+    """Version vectorisée de _normalize_domain pour une colonne entière."""
+    if not (pd.api.types.is_object_dtype(domain_values) or pd.api.types.is_string_dtype(domain_values)):
+        return pd.Series('DOC', index=domain_values.index, dtype=object)
+    # Les accesseurs .str renvoient NaN pour les valeurs non textuelles -> 'DOC'
+    keys = domain_values.str.strip().str.upper()
+    return keys.map(DOMAIN_ALIASES).fillna('DOC').astype(object)
+
+def _column(df_results: pd.DataFrame, name: str, default) -> pd.Series:
+    """Colonne du DataFrame, ou valeur par défaut diffusée si elle est absente."""
+    if name in df_results.columns:
+        return df_results[name]
+    return pd.Series(default, index=df_results.index, dtype=object)
 
-    odoo_data = []
+def prepare_odoo_frame(df_results: pd.DataFrame) -> pd.DataFrame:
+    """Préparer les données pour export ODOO (opérations par colonne sur tout le DataFrame)"""
 
-    for _, row in df_results.iterrows():
-        domain_raw = row.get('Domain', '')
-        domain_norm = _normalize_domain(domain_raw)
+    domain_norm = _normalize_domain_series(_column(df_results, 'Domain', ''))
+
+    # Description manquante ou vide -> nom du composant
+    description = df_results['Description']
+    missing_description = description.isna() | (description.astype(str) == '')
+    description = description.where(~missing_description, df_results['Name'])
+
+    odoo_df = pd.DataFrame({
         # Données de base
-        product_data = {
-            'default_code': row['SKU'],
-            'name': row['Name'],
-            'description': row['Description'] or row['Name'],
-            'categ_id': ODOOExportConfig.DOMAIN_CATEGORIES.get(domain_norm, 'Autres'),
+        'default_code': df_results['SKU'],
+        'name': df_results['Name'],
+        'description': description,
+        'categ_id': domain_norm.map(ODOOExportConfig.DOMAIN_CATEGORIES).fillna('Autres'),
 
-            # Fabricant
-            'manufacturer_name': row.get('Manufacturer', ''),
-            'manufacturer_pname': row.get('Manufacturer_PN', ''),
+        # Fabricant
+        'manufacturer_name': _column(df_results, 'Manufacturer', ''),
+        'manufacturer_pname': _column(df_results, 'Manufacturer_PN', ''),
 
-            # Données techniques
-            'x_domain': domain_norm,
-            'x_component_type': row.get('ComponentType', ''),
-            'x_designator': row.get('Designator', ''),
-            'x_quantity_bom': row.get('Quantity', 1),
+        # Données techniques
+        'x_domain': domain_norm,
+        'x_component_type': _column(df_results, 'ComponentType', ''),
+        'x_designator': _column(df_results, 'Designator', ''),
+        'x_quantity_bom': _column(df_results, 'Quantity', 1),
+    }, index=df_results.index)
 
-            # Valeurs par défaut
-            **ODOOExportConfig.ODOO_DEFAULTS
-        }
+    # Valeurs par défaut diffusées sur toute la colonne
+    for column, value in ODOOExportConfig.ODOO_DEFAULTS.items():
+        odoo_df[column] = value
 
-        odoo_data.append(product_data)
+    return odoo_df
 
-    return odoo_data
+def prepare_odoo_export(df_results):
+    """Préparer les données pour export ODOO (liste de produits, une entrée par ligne)"""
+    return prepare_odoo_frame(df_results).to_dict('records')
 
 if __name__ == "__main__":
     print("🔧 Configuration ODOO pour export SKU")
@@ -3,11 +3,82 @@
 Module d'intégration ODOO pour le générateur de SKU
 """
 
-import pandas as pd
+from __future__ import annotations
+
+import argparse
+import http.client
 import json
+import logging
+import os
+import re
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List
-from odoo_export_config import ODOOExportConfig, prepare_odoo_export
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+import instrumentation
+from config import DOMAINS, SKU_FORMAT
+from excel_writer import write_excel
+from logging_setup import setup_logging
+from odoo_export_config import ODOOExportConfig, prepare_odoo_frame
+from sku_sequence import SKU_ALPHABET
+from lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
+
+logger = logging.getLogger(__name__)
+
+# Colonnes de components -> colonnes des résultats BOMProcessor (entrée de prepare_odoo_frame)
+CATALOG_COLUMNS = {
+    'sku': 'SKU',
+    'name': 'Name',
+    'description': 'Description',
+    'domain': 'Domain',
+    'component_type': 'ComponentType',
+    'manufacturer': 'Manufacturer',
+    'manufacturer_part': 'Manufacturer_PN',
+}
+
+def sku_format_patterns() -> Dict[str, str]:
+    """
+    Expressions régulières des formats de SKU acceptés, dérivées de SKU_FORMAT:
+    'simplifie' FAMILLE-SOUS_FAMILLE-SEQUENCE (actuel) et 'historique'
+    DOMAINE-ROUTE-ROUTING-TYPE-SEQUENCE (SKU déjà publiés).
+    """
+    separator = re.escape(SKU_FORMAT.get("separator", "-"))
+    domain = "(?:" + "|".join(re.escape(code) for code in DOMAINS) + ")"
+    sous_famille = f"[A-Z0-9]{{1,{SKU_FORMAT.get('sous_famille_length', 6)}}}"
+    code = "[A-Z0-9]+"
+    # Séquence sur sequence_length à sequence_max_length caractères de l'alphabet SKU
+    sequence = (f"[{re.escape(SKU_ALPHABET)}]"
+                f"{{{SKU_FORMAT.get('sequence_length', 4)},{SKU_FORMAT.get('sequence_max_length', 6)}}}")
+    return {
+        'simplifie': separator.join([domain, sous_famille, sequence]),
+        'historique': separator.join([domain, code, code, code, sequence]),
+    }
+
+@dataclass
+class ValidationIssue:
+    """Anomalie détectée par validate_odoo_data (rows: index des lignes concernées)"""
+    code: str
+    message: str
+    column: Optional[str] = None
+    rows: List = field(default_factory=list)
+
+    def __str__(self):
+        return f"{self.message} ({len(self.rows)} ligne(s))" if self.rows else self.message
+
+def _json_default(value):
+    """Convertir les scalaires NumPy/pandas restants en types JSON natifs"""
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f"Type non sérialisable en JSON: {type(value).__name__}")
 
 class ODOOIntegration:
     """Gestionnaire d'intégration avec ODOO"""
@@ -15,57 +86,179 @@ class ODOOIntegration:
     def __init__(self):
         self.config = ODOOExportConfig()
 
+    def prepare_products(self, results: dict) -> pd.DataFrame:
+        """Combiner tous les domaines en un seul DataFrame de produits ODOO"""
+        with instrumentation.span('odoo.preparation') as span:
+            frames = [prepare_odoo_frame(df) for df in results.values() if not df.empty]
+            if not frames:
+                return pd.DataFrame()
+            odoo_df = pd.concat(frames, ignore_index=True)
+            span.add_rows(len(odoo_df))
+        return odoo_df
+
     def export_to_odoo_csv(self, results: dict, output_file: str = "odoo_import.csv"):
         """Exporter les résultats vers un CSV compatible ODOO"""
 
-        all_products = []
-
-        # Combiner tous les domaines
-        for domain, df in results.items():
-            if not df.empty:
-                # Préparer les données pour ODOO
-                odoo_products = prepare_odoo_export(df)
-                all_products.extend(odoo_products)
-
-        if all_products:
-            # Créer le DataFrame ODOO
-            odoo_df = pd.DataFrame(all_products)
+        odoo_df = self.prepare_products(results)
 
+        if not odoo_df.empty:
             # Exporter vers CSV avec séparateur ODOO
-            odoo_df.to_csv(output_file, index=False, sep=';', encoding='utf-8')
+            with instrumentation.span('odoo.export_csv', len(odoo_df)):
+                odoo_df.to_csv(output_file, index=False, sep=';', encoding='utf-8')
 
-            return len(all_products), output_file
+            return len(odoo_df), output_file
 
         return 0, None
 
-    def export_to_odoo_json(self, results: dict, output_file: str = "odoo_import.json"):
-        """Exporter vers JSON pour API ODOO"""
-
-        all_products = []
-
-        for domain, df in results.items():
-            if not df.empty:
-                odoo_products = prepare_odoo_export(df)
-                all_products.extend(odoo_products)
-
-        if all_products:
-            # Structure pour API ODOO
-            odoo_data = {
-                'model': 'product.product',
-                'method': 'create',
-                'data': all_products,
-                'context': {
-                    'lang': 'fr_FR',
-                    'tz': 'America/Toronto'
-                }
-            }
-
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(odoo_data, f, indent=2, ensure_ascii=False)
-
-            return len(all_products), output_file
-
-        return 0, None
+    def export_to_odoo_json(self, results: dict, output_file: str = "odoo_import.json",
+                            compact: bool = False, ndjson: bool = False, chunk_size: int = 5000):
+        """
+        Exporter vers JSON pour API ODOO, en flux.
+        Les produits sont sérialisés par blocs de `chunk_size` et écrits au fur et à
+        mesure (jamais de liste complète ni de document entier en mémoire).
+        compact: sans indentation (sérialiseur C de pandas, beaucoup plus rapide);
+        ndjson: un produit par ligne, sans enveloppe, pour une consommation au fil de l'eau.
+        """
+
+        odoo_df = self.prepare_products(results)
+
+        if odoo_df.empty:
+            return 0, None
+
+        with instrumentation.span('odoo.export_json', len(odoo_df)), open(output_file, 'w', encoding='utf-8') as f:
+            if ndjson:
+                for start in range(0, len(odoo_df), chunk_size):
+                    chunk = odoo_df.iloc[start:start + chunk_size]
+                    f.write(chunk.to_json(orient='records', lines=True, force_ascii=False).rstrip('\n') + '\n')
+                    f.flush()
+            else:
+                self._write_json_envelope(f, odoo_df, compact, chunk_size)
+
+        return len(odoo_df), output_file
+
+    def _write_json_envelope(self, f, odoo_df: pd.DataFrame, compact: bool, chunk_size: int):
+        """Écrire l'enveloppe {model, method, data, context} avec data produit en flux"""
+        context = {
+            'lang': 'fr_FR',
+            'tz': 'America/Toronto'
+        }
+
+        if compact:
+            f.write('{"model":"product.product","method":"create","data":[')
+        else:
+            f.write('{\n  "model": "product.product",\n  "method": "create",\n  "data": [\n')
+
+        separator = ',' if compact else ',\n'
+        for start in range(0, len(odoo_df), chunk_size):
+            if start:
+                f.write(separator)
+            chunk = odoo_df.iloc[start:start + chunk_size]
+            if compact:
+                # "[{...},{...}]" -> contenu du bloc sans les crochets
+                f.write(chunk.to_json(orient='records', force_ascii=False)[1:-1])
+            else:
+                # Même mise en forme que json.dump(indent=2) sur le document complet
+                records = chunk.astype(object).where(chunk.notna(), None).to_dict('records')
+                text = json.dumps(records, indent=2, ensure_ascii=False, default=_json_default)
+                f.write('  ' + text[2:-2].replace('\n', '\n  '))
+
+        if compact:
+            f.write('],"context":' + json.dumps(context, ensure_ascii=False, separators=(',', ':')) + '}')
+        else:
+            f.write('\n  ],\n  "context": '
+                    + json.dumps(context, indent=2, ensure_ascii=False).replace('\n', '\n  ') + '\n}')
+
+    def push_to_odoo(self, results: dict, client: Optional['ODOOPushClient'] = None, **client_settings) -> dict:
+        """Envoyer les résultats directement à ODOO par JSON-RPC (création ou mise à jour)"""
+        odoo_df = self.prepare_products(results)
+        if odoo_df.empty:
+            return {'created': 0, 'updated': 0, 'failed': 0, 'errors': [], 'batches': 0, 'seconds': 0.0}
+        if client is not None:
+            return client.push_products(odoo_df)
+        with ODOOPushClient(**client_settings) as own_client:
+            return own_client.push_products(odoo_df)
+
+    # ---------- Exports différentiels ----------
+    def load_changes(self, db_path: str, target: str):
+        """
+        Composants ajoutés ou modifiés depuis le dernier export réussi vers `target`.
+        Retourne (résultats {'Catalogue': DataFrame}, filigrane à valider après l'export).
+
+        Le filigrane est l'instant de lecture (horloge SQLite) et non le plus grand
+        updated_date exporté: une modification faite pendant la même seconde que
+        l'export est renvoyée la fois suivante (au moins une fois, jamais perdue);
+        les imports ODOO sont idempotents par default_code.
+        """
+        with instrumentation.span('odoo.delta_lecture') as span:
+            conn = instrumentation.connect(db_path)
+            cursor = conn.cursor()
+            try:
+                cursor.execute("BEGIN")
+                try:
+                    cursor.execute("SELECT last_id, last_updated FROM export_watermarks WHERE target = ?", (target,))
+                    row = cursor.fetchone()
+                except sqlite3.OperationalError:
+                    row = None  # Base antérieure au suivi des modifications
+                last_id, last_updated = row if row else (0, None)
+
+                cursor.execute("SELECT datetime('now'), COALESCE(MAX(id), 0) FROM components")
+                snapshot_time, max_id = cursor.fetchone()
+
+                columns = ", ".join(CATALOG_COLUMNS)
+                if last_updated is None:
+                    changes = pd.read_sql_query(f"SELECT {columns} FROM components ORDER BY id", conn)
+                else:
+                    changes = pd.read_sql_query(
+                        f"SELECT {columns} FROM components WHERE id > ? OR updated_date >= ? ORDER BY id",
+                        conn, params=(last_id, last_updated)
+                    )
+            finally:
+                conn.close()
+            span.add_rows(len(changes))
+
+        changes = changes.rename(columns=CATALOG_COLUMNS)
+        watermark = {
+            'target': target,
+            'last_id': max_id,
+            'last_updated': snapshot_time,
+            'exported_count': len(changes)
+        }
+        return {'Catalogue': changes}, watermark
+
+    def commit_watermark(self, db_path: str, watermark: dict):
+        """Enregistrer un export réussi: le prochain delta part de ce point"""
+        conn = instrumentation.connect(db_path)
+        conn.execute('''
+            INSERT OR REPLACE INTO export_watermarks (target, last_id, last_updated, exported_count, exported_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ''', (watermark['target'], watermark['last_id'], watermark['last_updated'], watermark['exported_count']))
+        conn.commit()
+        conn.close()
+
+    def reset_watermark(self, db_path: str, target: str):
+        """Oublier le dernier export: le prochain delta contiendra tout le catalogue"""
+        conn = instrumentation.connect(db_path)
+        conn.execute("DELETE FROM export_watermarks WHERE target = ?", (target,))
+        conn.commit()
+        conn.close()
+
+    def export_delta_to_odoo_csv(self, db_path: str, output_file: str = "odoo_delta.csv",
+                                 target: str = "odoo_csv"):
+        """Exporter vers CSV uniquement les composants ajoutés/modifiés depuis le dernier export"""
+        results, watermark = self.load_changes(db_path, target)
+        count, file_path = self.export_to_odoo_csv(results, output_file)
+        # Filigrane avancé seulement après l'écriture complète du fichier
+        self.commit_watermark(db_path, watermark)
+        return count, file_path
+
+    def push_delta_to_odoo(self, db_path: str, client: Optional['ODOOPushClient'] = None,
+                           target: str = "odoo_push", **client_settings) -> dict:
+        """Envoyer à ODOO uniquement les changements; filigrane avancé si aucun lot n'a échoué"""
+        results, watermark = self.load_changes(db_path, target)
+        summary = self.push_to_odoo(results, client=client, **client_settings)
+        if summary['failed'] == 0:
+            self.commit_watermark(db_path, watermark)
+        return summary
 
     def create_import_template(self, output_file: str = "template_import_odoo.xlsx"):
         """Créer un template Excel pour import ODOO"""
@@ -124,75 +317,403 @@ class ODOOIntegration:
         # Créer le DataFrame
         template_df = pd.DataFrame(example_data)
 
-        # Exporter vers Excel
-        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-            # Feuille avec exemples
-            template_df.to_excel(writer, sheet_name='Exemples', index=False)
-
-            # Feuille vide pour import
-            empty_df = pd.DataFrame(columns=columns)
-            empty_df.to_excel(writer, sheet_name='Import_ODOO', index=False)
-
-            # Feuille documentation
-            doc_data = {
-                'Colonne': columns,
-                'Description': [
-                    'Code article unique (SKU)',
-                    'Nom du produit',
-                    'Description détaillée',
-                    'Catégorie produit',
-                    'Type: product, consu, service',
-                    'Unité de mesure',
-                    'Prix de revient',
-                    'Prix de vente',
-                    'Nom du fabricant',
-                    'Référence fabricant',
-                    'Produit actif (True/False)',
-                    'Peut être vendu (True/False)',
-                    'Peut être acheté (True/False)'
-                ],
-                'Obligatoire': [
-                    'Oui', 'Oui', 'Non', 'Oui', 'Oui', 'Oui',
-                    'Non', 'Non', 'Non', 'Non', 'Oui', 'Non', 'Non'
-                ]
-            }
-            doc_df = pd.DataFrame(doc_data)
-            doc_df.to_excel(writer, sheet_name='Documentation', index=False)
+        # Feuille documentation
+        doc_data = {
+            'Colonne': columns,
+            'Description': [
+                'Code article unique (SKU)',
+                'Nom du produit',
+                'Description détaillée',
+                'Catégorie produit',
+                'Type: product, consu, service',
+                'Unité de mesure',
+                'Prix de revient',
+                'Prix de vente',
+                'Nom du fabricant',
+                'Référence fabricant',
+                'Produit actif (True/False)',
+                'Peut être vendu (True/False)',
+                'Peut être acheté (True/False)'
+            ],
+            'Obligatoire': [
+                'Oui', 'Oui', 'Non', 'Oui', 'Oui', 'Oui',
+                'Non', 'Non', 'Non', 'Non', 'Oui', 'Non', 'Non'
+            ]
+        }
+
+        # Exporter vers Excel: exemples, feuille vide pour import, documentation
+        write_excel(output_file, {
+            'Exemples': template_df,
+            'Import_ODOO': pd.DataFrame(columns=columns),
+            'Documentation': pd.DataFrame(doc_data)
+        })
 
         return output_file
 
-    def validate_odoo_data(self, df: pd.DataFrame) -> List[str]:
-        """Valider les données pour ODOO"""
+    def validate_odoo_data(self, df: pd.DataFrame, max_examples: int = 5) -> List[ValidationIssue]:
+        """
+        Valider les données pour ODOO (contrôles par colonne, sans boucle par ligne).
+        Retourne une liste de ValidationIssue; liste vide si les données sont valides.
+        """
+        with instrumentation.span('odoo.validation', len(df)):
+            return self._validate_odoo_data(df, max_examples)
 
-        errors = []
+    def _validate_odoo_data(self, df: pd.DataFrame, max_examples: int) -> List[ValidationIssue]:
+        issues = []
 
         # Vérifier les colonnes obligatoires
         required_cols = ['default_code', 'name', 'categ_id', 'type', 'uom_id']
 
         for col in required_cols:
             if col not in df.columns:
-                errors.append(f"Colonne obligatoire manquante: {col}")
-            elif df[col].isnull().any():
-                errors.append(f"Valeurs vides dans la colonne obligatoire: {col}")
-
-        # Vérifier l'unicité des SKU
-        if 'default_code' in df.columns:
-            duplicates = df['default_code'].duplicated()
-            if duplicates.any():
-                dup_skus = df[duplicates]['default_code'].tolist()
-                errors.append(f"SKU dupliqués: {dup_skus}")
-
-        # Vérifier le format des SKU
-        if 'default_code' in df.columns:
-            invalid_skus = []
-            for sku in df['default_code']:
-                if not isinstance(sku, str) or len(sku.split('-')) != 5:
-                    invalid_skus.append(sku)
-
-            if invalid_skus:
-                errors.append(f"Format SKU invalide: {invalid_skus}")
-
-        return errors
+                issues.append(ValidationIssue('missing_column', f"Colonne obligatoire manquante: {col}", col))
+                continue
+            empty = df[col].isnull()
+            if empty.any():
+                issues.append(ValidationIssue(
+                    'empty_value', f"Valeurs vides dans la colonne obligatoire: {col}",
+                    col, df.index[empty].tolist()
+                ))
+
+        if 'default_code' not in df.columns:
+            return issues
+
+        codes = df['default_code']
+
+        # Unicité des SKU: un passage dans une table de hachage (pas de tri, pas de boucle Python)
+        duplicates = codes.duplicated(keep='first') & codes.notna()
+        if duplicates.any():
+            examples = codes[duplicates].drop_duplicates().head(max_examples).tolist()
+            issues.append(ValidationIssue(
+                'duplicate_sku', f"SKU dupliqués (ex: {examples})",
+                'default_code', df.index[duplicates].tolist()
+            ))
+
+        # Format des SKU: un seul motif combinant les formats connus
+        if pd.api.types.is_object_dtype(codes):
+            text = codes.where(codes.map(type) == str)
+        else:
+            text = codes.astype(str).where(codes.notna())
+        combined = "|".join(f"(?:{pattern})" for pattern in sku_format_patterns().values())
+        invalid = codes.notna() & ~text.str.fullmatch(combined).fillna(False).astype(bool)
+
+        if invalid.any():
+            # Diagnostic (nombre de parties) seulement sur les lignes rejetées
+            separator = re.escape(SKU_FORMAT.get("separator", "-"))
+            part_count = text[invalid].str.count(separator) + 1
+            wrong_parts = invalid.copy()
+            wrong_parts[invalid] = ~part_count.isin([3, 5])
+            bad_format = invalid & ~wrong_parts
+
+            for code, mask, message in (
+                ('sku_part_count', wrong_parts, "SKU sans 3 ni 5 parties"),
+                ('invalid_sku_format', bad_format, "Format SKU invalide"),
+            ):
+                if mask.any():
+                    examples = codes[mask].head(max_examples).tolist()
+                    issues.append(ValidationIssue(
+                        code, f"{message} (ex: {examples})", 'default_code', df.index[mask].tolist()
+                    ))
+
+        return issues
+
+class ODOOPushError(Exception):
+    """Erreur renvoyée par ODOO ou échec réseau définitif lors d'un envoi"""
+
+class ODOOTransportError(ODOOPushError):
+    """Réponse perdue (réseau, délai, passerelle): l'appel a pu être appliqué ou non"""
+
+class ODOOPushClient:
+    """
+    Client JSON-RPC pour créer/mettre à jour les produits directement dans ODOO.
+    Chaque thread garde sa propre connexion HTTP persistante (keep-alive); les
+    lots sont envoyés en parallèle avec une concurrence bornée, et les produits
+    sont rapprochés par default_code (création si absent, écriture sinon).
+    """
+
+    MODEL = 'product.product'
+
+    # Méthodes ORM rejouables telles quelles après une réponse perdue; un create
+    # rejoué créerait un doublon (default_code n'est pas unique dans ODOO)
+    IDEMPOTENT_METHODS = frozenset({'search_read', 'search', 'read', 'search_count', 'fields_get', 'write'})
+
+    def __init__(self, url: Optional[str] = None, database: Optional[str] = None,
+                 username: Optional[str] = None, password: Optional[str] = None, **settings):
+        defaults = ODOOExportConfig.PUSH_SETTINGS
+        self.url = url or defaults['url']
+        self.database = database or defaults['database']
+        self.username = username or defaults['username']
+        self.password = password if password is not None else os.environ.get('ODOO_PASSWORD', '')
+        self.batch_size = settings.get('batch_size', defaults['batch_size'])
+        self.max_workers = settings.get('max_workers', defaults['max_workers'])
+        self.max_retries = settings.get('max_retries', defaults['max_retries'])
+        self.backoff = settings.get('backoff', defaults['backoff'])
+        self.timeout = settings.get('timeout', defaults['timeout'])
+
+        parts = urlsplit(self.url)
+        self._scheme = parts.scheme or 'http'
+        self._host = parts.hostname or 'localhost'
+        self._port = parts.port
+        self._path = (parts.path.rstrip('/') or '') + '/jsonrpc'
+
+        self._local = threading.local()
+        self._connections: List[http.client.HTTPConnection] = []
+        self._connections_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._request_id = 0
+        self._id_lock = threading.Lock()
+        self.uid: Optional[int] = None
+
+    # ---------- Transport ----------
+    def _connection(self) -> http.client.HTTPConnection:
+        """Connexion persistante propre au thread courant"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn_class = http.client.HTTPSConnection if self._scheme == 'https' else http.client.HTTPConnection
+            conn = conn_class(self._host, self._port, timeout=self.timeout)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _reset_connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+            with self._connections_lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        """Pool de threads conservé entre les envois (leurs connexions restent ouvertes)"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix='odoo-push')
+        return self._executor
+
+    def close(self):
+        """Arrêter le pool d'envoi et fermer les connexions de tous ses threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    @property
+    def open_connections(self) -> int:
+        """Connexions persistantes ouvertes (une par thread ayant appelé ODOO)"""
+        with self._connections_lock:
+            return sum(1 for conn in self._connections if conn.sock is not None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _next_id(self) -> int:
+        with self._id_lock:
+            self._request_id += 1
+            return self._request_id
+
+    def call(self, service: str, method: str, *args, retry: bool = True):
+        """
+        Appel JSON-RPC avec nouvelles tentatives (backoff exponentiel) sur erreurs transitoires.
+        retry=False pour un appel non rejouable: une réponse perdue lève ODOOTransportError.
+        """
+        payload = json.dumps({
+            'jsonrpc': '2.0',
+            'method': 'call',
+            'params': {'service': service, 'method': method, 'args': list(args)},
+            'id': self._next_id()
+        }, default=_json_default).encode('utf-8')
+
+        last_error = None
+        attempts = self.max_retries + 1 if retry else 1
+        for attempt in range(attempts):
+            if attempt:
+                time.sleep(self.backoff * (2 ** (attempt - 1)))
+            try:
+                instrumentation.count('odoo.appels_rpc')
+                conn = self._connection()
+                conn.request('POST', self._path, body=payload,
+                             headers={'Content-Type': 'application/json', 'Connection': 'keep-alive'})
+                response = conn.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, ConnectionError, socket.timeout, OSError) as e:
+                last_error = e
+                self._reset_connection()
+                continue
+
+            if response.status in (429, 502, 503, 504):
+                last_error = ODOOPushError(f"HTTP {response.status}")
+                continue
+            if response.status != 200:
+                raise ODOOPushError(f"HTTP {response.status}: {body[:200]!r}")
+
+            result = json.loads(body)
+            if result.get('error'):
+                error = result['error']
+                message = error.get('data', {}).get('message') or error.get('message')
+                raise ODOOPushError(f"Erreur ODOO: {message}")
+            return result.get('result')
+
+        raise ODOOTransportError(f"Échec après {attempts} tentative(s): {last_error}")
+
+    def login(self) -> int:
+        """Authentification (service common) et mémorisation de l'uid"""
+        uid = self.call('common', 'login', self.database, self.username, self.password)
+        if not uid:
+            raise ODOOPushError(f"Authentification refusée pour {self.username}@{self.database}")
+        self.uid = uid
+        return uid
+
+    def execute_kw(self, model: str, method: str, args: list, kwargs: Optional[dict] = None):
+        """Appel d'une méthode ORM (service object); seules les méthodes idempotentes sont rejouées"""
+        if self.uid is None:
+            self.login()
+        return self.call('object', 'execute_kw', self.database, self.uid, self.password,
+                         model, method, args, kwargs or {}, retry=method in self.IDEMPOTENT_METHODS)
+
+    # ---------- Produits ----------
+    def _resolve_categories(self, names: List[str]) -> Dict[str, int]:
+        """Noms de catégories -> identifiants product.category (les absentes sont ignorées)"""
+        if not names:
+            return {}
+        records = self.execute_kw('product.category', 'search_read',
+                                  [[['name', 'in', names]]], {'fields': ['id', 'name']})
+        mapping = {record['name']: record['id'] for record in records}
+        missing = sorted(set(names) - set(mapping))
+        if missing:
+            logger.warning(f"Catégories ODOO introuvables (catégorie par défaut utilisée): {missing}")
+        return mapping
+
+    def _search_existing(self, products: List[dict]) -> Dict[str, dict]:
+        """Produits ODOO déjà présents pour ces default_code, avec les champs envoyés"""
+        fields = sorted({'id', 'default_code'}.union(*(product.keys() for product in products)))
+        records = self.execute_kw(self.MODEL, 'search_read',
+                                  [[['default_code', 'in', [product['default_code'] for product in products]]]],
+                                  {'fields': fields})
+        return {record['default_code']: record for record in records}
+
+    def _create_missing(self, products: List[dict]) -> int:
+        """
+        Créer les produits absents. Un create n'est jamais rejoué à l'aveugle: si
+        la réponse est perdue, les codes sont recherchés à nouveau et seuls ceux
+        toujours absents sont recréés.
+        """
+        pending = products
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.backoff * (2 ** (attempt - 1)))
+                found = self._search_existing(pending)
+                pending = [product for product in pending if product['default_code'] not in found]
+                if not pending:
+                    break
+            try:
+                self.execute_kw(self.MODEL, 'create', [pending])
+                break
+            except ODOOTransportError as e:
+                last_error = e
+        else:
+            raise ODOOPushError(f"Création non confirmée après {self.max_retries + 1} tentatives: {last_error}")
+        return len(products)
+
+    @staticmethod
+    def _same_value(current, value) -> bool:
+        # Many2one lu comme [id, nom]
+        if isinstance(current, list) and current:
+            current = current[0]
+        if isinstance(current, float) or isinstance(value, float):
+            try:
+                return abs(float(current) - float(value)) < 1e-9
+            except (TypeError, ValueError):
+                return False
+        return current == value
+
+    def _push_batch(self, products: List[dict]) -> dict:
+        """Créer ou mettre à jour un lot de produits, rapprochés par default_code"""
+        existing = self._search_existing(products)
+
+        to_create = [product for product in products if product['default_code'] not in existing]
+        created = self._create_missing(to_create) if to_create else 0
+
+        # Un write par jeu de valeurs identique, produits déjà à jour ignorés
+        groups: Dict[tuple, List[int]] = {}
+        unchanged = 0
+        for product in products:
+            record = existing.get(product['default_code'])
+            if record is None:
+                continue
+            values = {field: value for field, value in product.items() if field != 'default_code'}
+            if all(self._same_value(record.get(field), value) for field, value in values.items()):
+                unchanged += 1
+                continue
+            groups.setdefault(tuple(sorted(values.items())), []).append(record['id'])
+        for values, ids in groups.items():
+            self.execute_kw(self.MODEL, 'write', [ids, dict(values)])
+
+        updated = sum(len(ids) for ids in groups.values())
+        return {'created': created, 'updated': updated, 'unchanged': unchanged}
+
+    def push_products(self, odoo_df: pd.DataFrame, fields: Optional[List[str]] = None,
+                      progress=None) -> dict:
+        """
+        Envoyer un DataFrame de produits ODOO (voir ODOOIntegration.prepare_products).
+        Retourne {'created', 'updated', 'unchanged', 'failed', 'errors', 'batches', 'seconds'}.
+        """
+        start = time.perf_counter()
+        fields = [field for field in (fields or ODOOExportConfig.PUSH_FIELDS) if field in odoo_df.columns]
+
+        # Un seul enregistrement par code: le dernier l'emporte (idempotence)
+        products_df = odoo_df[fields].drop_duplicates(subset='default_code', keep='last')
+
+        if 'categ_id' in products_df.columns:
+            categories = self._resolve_categories(sorted(products_df['categ_id'].dropna().unique().tolist()))
+            products_df = products_df.assign(categ_id=products_df['categ_id'].map(categories))
+
+        # Valeurs manquantes -> False (convention ODOO pour un champ vide)
+        products_df = products_df.astype(object).where(products_df.notna(), False)
+        products = products_df.to_dict('records')
+        if 'categ_id' in fields:
+            for product in products:
+                if product['categ_id'] is False:
+                    del product['categ_id']
+
+        batches = [products[i:i + self.batch_size] for i in range(0, len(products), self.batch_size)]
+        summary = {'created': 0, 'updated': 0, 'unchanged': 0, 'failed': 0, 'errors': [],
+                   'batches': len(batches)}
+
+        if self.uid is None:
+            self.login()
+
+        executor = self._pool()
+        futures = {executor.submit(self._push_batch, batch): batch for batch in batches}
+        for done, future in enumerate(as_completed(futures), start=1):
+            batch = futures[future]
+            try:
+                counts = future.result()
+                summary['created'] += counts['created']
+                summary['updated'] += counts['updated']
+                summary['unchanged'] += counts['unchanged']
+            except ODOOPushError as e:
+                summary['failed'] += len(batch)
+                summary['errors'].append({
+                    'first_code': batch[0]['default_code'],
+                    'size': len(batch),
+                    'error': str(e)
+                })
+                logger.error(f"Lot ODOO en échec ({batch[0]['default_code']}...): {e}")
+            if progress is not None:
+                progress(done, len(batches))
+
+        summary['seconds'] = time.perf_counter() - start
+        instrumentation.record('odoo.push', summary['seconds'], len(products))
+        return summary
 
 def demo_odoo_integration():
     """Démonstration de l'intégration ODOO"""
@@ -248,5 +769,73 @@ def demo_odoo_integration():
     print(f"📄 Import CSV: {file_csv}")
     print(f"📄 API JSON: {file_json}")
 
+def load_results_file(file_path: str) -> dict:
+    """Relire un fichier de résultats SKU (SKU_*.xlsx) ou un CSV ODOO exporté"""
+    if Path(file_path).suffix.lower() == '.csv':
+        odoo_df = pd.read_csv(file_path, sep=';', encoding='utf-8')
+        return {'ODOO': odoo_df}
+    sheets = pd.read_excel(file_path, sheet_name=None)
+    return {name.replace('SKU_', '', 1): df for name, df in sheets.items() if name.startswith('SKU_')}
+
+def main():
+    """Point d'entrée: démonstration (sans argument) ou envoi direct vers ODOO"""
+    parser = argparse.ArgumentParser(description="Intégration ODOO du générateur de SKU")
+    subparsers = parser.add_subparsers(dest='command')
+
+    settings = ODOOExportConfig.PUSH_SETTINGS
+    push = subparsers.add_parser('push', help="Envoyer des produits à ODOO par JSON-RPC")
+    push.add_argument('file', help="Fichier de résultats SKU_*.xlsx ou CSV ODOO")
+    push.add_argument('--url', default=settings['url'])
+    push.add_argument('--db', default=settings['database'])
+    push.add_argument('--user', default=settings['username'])
+    push.add_argument('--batch-size', type=int, default=settings['batch_size'])
+    push.add_argument('--workers', type=int, default=settings['max_workers'])
+    push.add_argument('--retries', type=int, default=settings['max_retries'])
+
+    delta = subparsers.add_parser('delta', help="Exporter les composants ajoutés/modifiés depuis le dernier export")
+    delta.add_argument('--db', dest='db_path', default='sku_database.db', help="Base de données SKU")
+    delta.add_argument('--output', default='odoo_delta.csv', help="Fichier CSV produit")
+    delta.add_argument('--target', default='odoo_csv', help="Nom du filigrane (une destination = un filigrane)")
+    delta.add_argument('--full', action='store_true', help="Réinitialiser le filigrane et tout exporter")
+
+    args = parser.parse_args()
+    if args.command is None:
+        demo_odoo_integration()
+        return 0
+
+    setup_logging()
+
+    if args.command == 'delta':
+        from sku_generator import SKUGenerator
+        SKUGenerator(args.db_path)  # Crée les tables de suivi sur une base existante
+        odoo = ODOOIntegration()
+        if args.full:
+            odoo.reset_watermark(args.db_path, args.target)
+        count, file_path = odoo.export_delta_to_odoo_csv(args.db_path, args.output, args.target)
+        if count:
+            print(f"✅ {count} produits modifiés exportés → {file_path}")
+        else:
+            print("✅ Aucun changement depuis le dernier export")
+        return 0
+
+    results = load_results_file(args.file)
+    if 'ODOO' in results:
+        odoo_df = results['ODOO']
+    else:
+        odoo_df = ODOOIntegration().prepare_products(results)
+
+    def progress(done, total):
+        print(f"\r📤 Lots envoyés: {done}/{total}", end='', flush=True)
+
+    with ODOOPushClient(args.url, args.db, args.user, batch_size=args.batch_size,
+                        max_workers=args.workers, max_retries=args.retries) as client:
+        summary = client.push_products(odoo_df, progress=progress)
+    print()
+    print(f"✅ Créés: {summary['created']} | Mis à jour: {summary['updated']} | "
+          f"Inchangés: {summary['unchanged']} | Échecs: {summary['failed']} | {summary['seconds']:.1f} s")
+    for error in summary['errors']:
+        print(f"❌ Lot {error['first_code']} ({error['size']} produits): {error['error']}")
+    return 1 if summary['failed'] else 0
+
 if __name__ == "__main__":
-    demo_odoo_integration()
+    raise SystemExit(main())
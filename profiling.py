@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Mode profilage: artefact à analyser hors ligne pour un traitement lent
+
+Chaque tâche profilée produit un dossier horodaté (et son archive .zip à joindre
+à un rapport de bogue) dans PROFILING_CONFIG['output_dir']:
+
+    profile.prof        cProfile du thread de la tâche (pstats, snakeviz, ...)
+    profile.txt         fonctions les plus coûteuses (temps cumulé)
+    sql_trace.log       requêtes SQLite exécutées: instant relatif, thread, requête
+    instrumentation.json  durées par étape (voir instrumentation.py)
+    meta.json           tâche, durée, ligne de commande, environnement, erreur éventuelle
+
+    with ProfileSession("process_bom") as session:
+        processor.process_bom_file(file_path)
+    print(session.archive_path)
+"""
+
+import cProfile
+import io
+import json
+import logging
+import os
+import platform
+import pstats
+import re
+import shutil
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Optional
+
+import instrumentation
+from config import PROFILING_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Sessions en cours (plusieurs tâches profilées en parallèle, ex: watch_folder --profile)
+_sessions_lock = threading.Lock()
+_active_sessions = 0
+_enabled_before = False
+
+
+def _slug(text: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', text).strip('_')[:60] or 'tache'
+
+
+class ProfileSession:
+    """Profilage d'une tâche (le thread qui entre dans le bloc with)"""
+
+    def __init__(self, job_name: str, output_dir: Optional[str] = None,
+                 top_functions: Optional[int] = None, archive: Optional[bool] = None):
+        self.job_name = job_name
+        self.output_root = output_dir or PROFILING_CONFIG.get("output_dir", "profiles")
+        self.top_functions = top_functions or PROFILING_CONFIG.get("top_functions", 40)
+        self.archive = PROFILING_CONFIG.get("archive", True) if archive is None else archive
+
+        self.directory: Optional[str] = None
+        self.archive_path: Optional[str] = None
+        self.statements = 0
+        self._profiler = cProfile.Profile()
+        self._trace_file = None
+        self._trace_lock = threading.Lock()
+
+    def _create_directory(self) -> str:
+        base = os.path.join(self.output_root, f"{datetime.now():%Y%m%d-%H%M%S}_{_slug(self.job_name)}")
+        directory, suffix = base, 1
+        while os.path.exists(directory):
+            suffix += 1
+            directory = f"{base}-{suffix}"
+        os.makedirs(directory)
+        return directory
+
+    def _trace_statement(self, statement: str):
+        # Une ligne par requête (les requêtes du code sont écrites sur plusieurs lignes)
+        sql = ' '.join(statement.split())
+        line = f"{time.perf_counter() - self._start:.6f}\t{threading.current_thread().name}\t{sql}\n"
+        with self._trace_lock:
+            if self._trace_file is not None:
+                self._trace_file.write(line)
+                self.statements += 1
+
+    def __enter__(self):
+        self.directory = self._create_directory()
+        self._started_at = datetime.now()
+        self._start = time.perf_counter()
+
+        global _active_sessions, _enabled_before
+        with _sessions_lock:
+            if _active_sessions == 0:
+                _enabled_before = instrumentation.is_enabled()
+            _active_sessions += 1
+            instrumentation.enable()
+        self._trace_file = open(os.path.join(self.directory, "sql_trace.log"), 'w', encoding='utf-8')
+        instrumentation.recorder.add_statement_listener(self._trace_statement)
+
+        self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._profiler.disable()
+        duration = time.perf_counter() - self._start
+
+        instrumentation.recorder.remove_statement_listener(self._trace_statement)
+        with self._trace_lock:
+            self._trace_file.close()
+            self._trace_file = None
+        summary = instrumentation.summary()
+        global _active_sessions
+        with _sessions_lock:
+            _active_sessions -= 1
+            # Instrumentation rendue dans l'état d'avant la première session
+            if _active_sessions == 0 and not _enabled_before:
+                instrumentation.disable()
+
+        self._profiler.dump_stats(os.path.join(self.directory, "profile.prof"))
+        report = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=report)
+        stats.sort_stats('cumulative').print_stats(self.top_functions)
+        with open(os.path.join(self.directory, "profile.txt"), 'w', encoding='utf-8') as f:
+            f.write(report.getvalue())
+
+        with open(os.path.join(self.directory, "instrumentation.json"), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
+        meta = {
+            'tache': self.job_name,
+            'debut': self._started_at.isoformat(timespec='seconds'),
+            'duree': round(duration, 6),
+            'requetes_sql': self.statements,
+            'thread': threading.current_thread().name,
+            'commande': sys.argv,
+            'python': platform.python_version(),
+            'plateforme': platform.platform(),
+            'erreur': None if exc_type is None else f"{exc_type.__name__}: {exc_value}",
+        }
+        with open(os.path.join(self.directory, "meta.json"), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+
+        if self.archive:
+            self.archive_path = shutil.make_archive(self.directory, 'zip', self.directory)
+        logger.info(f"Profil de '{self.job_name}' enregistré: {self.archive_path or self.directory}")
+        return False
+
+
+def profiled(job_name: str, enabled: bool):
+    """ProfileSession si `enabled`, sinon un contexte sans effet"""
+    return ProfileSession(job_name) if enabled else nullcontext()
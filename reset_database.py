@@ -74,9 +74,33 @@ def reset_database(db_path: str = "sku_database.db"):
         except Exception as e:
             print(f"⚠️ Erreur lors de la lecture des statistiques: {e}")
 
+        # Sauvegarder avant suppression (conservée hors rotation)
+        try:
+            from db_backup import create_snapshot
+            snapshot = create_snapshot(db_path, reason='avant_reinitialisation')
+            print(f"💾 Sauvegarde avant réinitialisation: {snapshot}")
+            print(f"   Restauration: python db_backup.py restore \"{snapshot}\"")
+        except Exception as e:
+            print(f"❌ Erreur lors de la sauvegarde: {e}")
+            return False
+
+        # Archiver le journal des allocations: il décrit l'ancien catalogue
+        try:
+            from sku_journal import archive_journal
+            archived = archive_journal(db_path)
+            if archived:
+                print(f"📓 Journal archivé: {archived}")
+        except Exception as e:
+            print(f"❌ Erreur lors de l'archivage du journal: {e}")
+            return False
+
         # Supprimer la base de données
         try:
             os.remove(db_path)
+            # Fichiers du mode WAL: ne doivent pas être rejoués dans la nouvelle base
+            for suffix in ('-wal', '-shm'):
+                if os.path.exists(db_path + suffix):
+                    os.remove(db_path + suffix)
             print(f"✅ Base de données supprimée: {db_path}")
         except Exception as e:
             print(f"❌ Erreur lors de la suppression: {e}")
@@ -86,9 +110,11 @@ def reset_database(db_path: str = "sku_database.db"):
 
     # Créer une nouvelle base vide
     try:
-        from sku_generator import SKUGenerator
+        from sku_generator import SKUGenerator, forget_schema
 
         print(f"🔄 Création d'une nouvelle base de données...")
+        # Le nouveau fichier peut réutiliser l'inode de l'ancien: schéma à recréer
+        forget_schema(db_path)
         generator = SKUGenerator(db_path)
 
         # Vérifier que les tables sont créées
@@ -113,7 +139,7 @@ def reset_database(db_path: str = "sku_database.db"):
 def confirm_reset():
     """Demande confirmation avant réinitialisation"""
     print("⚠️ ATTENTION: Cette opération va supprimer TOUS les SKU existants!")
-    print("Cette action est IRRÉVERSIBLE.")
+    print("Une sauvegarde est prise avant la suppression (python db_backup.py list).")
     print()
 
     while True:
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Interface en ligne de commande du générateur de SKU (serveur sans écran, scripts)
+
+    python sku_cli.py analyze BOM.xlsx [BOM2.xlsx ...]
+    python sku_cli.py generate BOM.xlsx --only-new --format excel --format odoo_delta_csv
+    python sku_cli.py search CAP --limit 20
+    python sku_cli.py decode ELEC-CAP-AAAB MECA-VIS-AAAC    (ou '-' pour lire stdin)
+    python sku_cli.py export-odoo SKU_BOM.xlsx --format json
+    python sku_cli.py export-odoo --delta --target erp_csv
+    python sku_cli.py stats [--reconcile]
+    python sku_cli.py bench --rows 5000 --compare reference.json
+
+Mêmes moteurs que l'interface (BOMProcessor, BOMComparator, SKUSearchIndex,
+étape d'export parallèle). Le résultat est un document JSON unique sur stdout;
+la progression est écrite au fil de l'eau sur stderr (texte, ou une ligne JSON
+par événement avec --progress json). Les journaux vont dans sku_generator.log,
+et aussi sur stderr avec --verbose.
+
+Codes de sortie: 0 succès, 1 échec partiel (export en échec, régression du
+banc d'essai), 2 erreur d'utilisation ou fichier introuvable.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import db_backup
+import instrumentation
+import sku_journal
+from config import INSTRUMENTATION_CONFIG
+from lazy_imports import lazy_import
+from logging_setup import setup_logging
+from profiling import profiled
+
+pd = lazy_import('pandas')
+
+logger = logging.getLogger(__name__)
+
+# Composants par lot de génération (un événement de progression par lot)
+GENERATE_CHUNK_SIZE = 500
+
+DOMAIN_SHEETS = {'ELEC': 'Électrique', 'MECA': 'Mécanique'}
+
+
+class CLIError(Exception):
+    """Erreur d'utilisation (fichier introuvable, option incohérente): code de sortie 2"""
+
+
+class Progress:
+    """Événements de progression sur stderr (stdout reste réservé au résultat JSON)"""
+
+    def __init__(self, mode: str = 'text', stream=None):
+        self.mode = mode
+        self.stream = stream or sys.stderr
+        self._start = time.perf_counter()
+
+    def __call__(self, event: str, **values):
+        if self.mode == 'none':
+            return
+        elapsed = round(time.perf_counter() - self._start, 3)
+        if self.mode == 'json':
+            line = json.dumps({'evenement': event, 'secondes': elapsed, **values},
+                              ensure_ascii=False, default=_json_default)
+        else:
+            detail = " ".join(f"{key}={value}" for key, value in values.items())
+            line = f"[{elapsed:8.2f} s] {event} {detail}".rstrip()
+        self.stream.write(line + "\n")
+        self.stream.flush()
+
+
+def _json_default(value):
+    """Scalaires NumPy/pandas et dates vers des types JSON natifs"""
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f"Type non sérialisable en JSON: {type(value).__name__}")
+
+
+def _records(df) -> List[dict]:
+    """Lignes d'un DataFrame, cellules vides -> null (NaN n'est pas du JSON valide)"""
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def _existing_files(paths: List[str]) -> List[str]:
+    missing = [path for path in paths if not Path(path).is_file()]
+    if missing:
+        raise CLIError(f"Fichier(s) introuvable(s): {', '.join(missing)}")
+    return paths
+
+
+def _generator(args):
+    from sku_generator import SKUGenerator
+    return SKUGenerator(args.db_path)
+
+
+# ---------- Commandes ----------
+def cmd_analyze(args, progress: Progress) -> dict:
+    """Nouveaux et existants de chaque BOM, sans rien écrire en base"""
+    from bom_analyzer import BOMComparator
+
+    comparator = BOMComparator(_generator(args))
+    files = []
+    for index, file_path in enumerate(_existing_files(args.files), 1):
+        progress('analyse', fichier=file_path, index=index, total=len(args.files))
+        analysis = comparator.analyze_new_bom(file_path)
+        entry = {'fichier': file_path, 'nouveau': analysis['nouveau'], 'existant': analysis['existant'],
+                 'par_domaine': {}}
+        for domain, details in analysis['details'].items():
+            if not details:
+                continue
+            entry['par_domaine'][domain] = {'nouveau': details['nouveau'], 'existant': details['existant']}
+            if args.details:
+                entry['par_domaine'][domain]['composants_nouveaux'] = details['composants_nouveaux']
+                entry['par_domaine'][domain]['composants_existants'] = details['composants_existants']
+        files.append(entry)
+        progress('analyse_terminee', fichier=file_path, nouveau=entry['nouveau'], existant=entry['existant'])
+
+    return {
+        'fichiers': files,
+        'nouveau': sum(entry['nouveau'] for entry in files),
+        'existant': sum(entry['existant'] for entry in files),
+    }
+
+
+def select_components(components_by_domain: Dict[str, list], generator, domains: Optional[List[str]] = None,
+                      only_new: bool = False) -> Dict[str, list]:
+    """Sélection de la fenêtre de validation, en options: domaines retenus, composants sans SKU seulement"""
+    selected = {}
+    for domain, components in components_by_domain.items():
+        if domains and domain not in domains:
+            continue
+        if only_new:
+            components = [component for component in components
+                          if generator.get_existing_sku(component) is None]
+        if components:
+            selected[domain] = components
+    return selected
+
+
+def cmd_generate(args, progress: Progress) -> dict:
+    """Extraction, sélection, génération par lots puis export parallèle (comme l'interface)"""
+    from export_stage import ExportJob, run_export_stage
+    from main import BOMProcessor
+
+    generator = _generator(args)
+    processor = BOMProcessor(generator)
+    output_dir = Path(args.output_dir) if args.output_dir else None
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    files = []
+    failed = False
+    for file_path in _existing_files(args.files):
+        progress('extraction', fichier=file_path)
+        extracted = processor.extract_components_from_bom(file_path)
+        selected = select_components(extracted, generator, args.domain, args.only_new)
+        total = sum(len(components) for components in selected.values())
+        progress('selection', fichier=file_path, composants=total,
+                 extraits=sum(len(components) for components in extracted.values()))
+
+        frames: Dict[str, list] = {}
+        done = 0
+        for domain, components in selected.items():
+            for start in range(0, len(components), GENERATE_CHUNK_SIZE):
+                chunk = components[start:start + GENERATE_CHUNK_SIZE]
+                partial = processor.generate_skus_for_selected_components({domain: chunk})
+                for sheet, df in partial.items():
+                    frames.setdefault(sheet, []).append(df)
+                done += len(chunk)
+                progress('generation', fichier=file_path, domaine=domain, faits=done, total=total)
+        results = {sheet: pd.concat(parts, ignore_index=True) for sheet, parts in frames.items()}
+
+        stem = Path(file_path).stem
+        folder = output_dir or Path(file_path).parent
+        outputs = {
+            'excel': (f"SKU_{stem}.xlsx", {}),
+            'odoo_csv': (f"ODOO_{stem}.csv", {}),
+            'odoo_json': (f"ODOO_{stem}.json", {}),
+            'odoo_delta_csv': (f"ODOO_delta_{stem}.csv", {'db_path': args.db_path, 'target': args.target}),
+        }
+        jobs = [ExportJob(name, str(folder / outputs[name][0]), outputs[name][1]) for name in args.format]
+        report = run_export_stage(results, jobs) if results and jobs else {'formats': {}, 'secondes': 0.0}
+        for name, entry in report['formats'].items():
+            progress('export', fichier=entry['fichier'], format=name, lignes=entry['lignes'],
+                     erreur=entry['erreur'])
+        failed = failed or any(entry['erreur'] for entry in report['formats'].values())
+
+        files.append({
+            'fichier': file_path,
+            'composants': sum(len(df) for df in results.values()),
+            'par_domaine': {sheet: len(df) for sheet, df in results.items()},
+            'sorties': report['formats'],
+            'skus': {sheet: _records(df) for sheet, df in results.items()} if args.include_skus else None,
+        })
+
+    return {'fichiers': files, 'composants': sum(entry['composants'] for entry in files),
+            'nouveaux_sku': generator.generation_counts.get('nouveaux', 0),
+            'sku_existants': generator.generation_counts.get('existants', 0),
+            'rejetes': generator.generation_counts.get('rejetes', 0),
+            '_echec': failed}
+
+
+def cmd_search(args, progress: Progress) -> dict:
+    from sku_search import SKUSearchIndex
+
+    index = SKUSearchIndex(args.db_path)
+    progress('chargement_index')
+    results = index.search(args.text, args.limit)
+    return {'recherche': args.text, 'index': len(index), 'resultats': results}
+
+
+def cmd_decode(args, progress: Progress) -> dict:
+    skus = args.skus
+    if skus == ['-']:
+        skus = [line.strip() for line in sys.stdin if line.strip()]
+    if not skus:
+        raise CLIError("Aucun SKU à décoder")
+
+    generator = _generator(args)
+    progress('decodage', skus=len(skus))
+    decoded = generator.decode_many(skus)
+    # Colonnes non applicables au format du SKU omises
+    rows = [{key: value for key, value in row.items() if value is not None} for row in _records(decoded)]
+    return {'skus': rows, 'invalides': int((decoded['format'] == 'invalide').sum())}
+
+
+def cmd_export_odoo(args, progress: Progress) -> dict:
+    from odoo_integration import ODOOIntegration, load_results_file
+
+    odoo = ODOOIntegration()
+    if args.delta:
+        _generator(args)  # Tables de suivi créées sur une base existante
+        if args.full:
+            odoo.reset_watermark(args.db_path, args.target)
+        output = args.output or "odoo_delta.csv"
+        progress('export_delta', cible=args.target, fichier=output)
+        count, file_path = odoo.export_delta_to_odoo_csv(args.db_path, output, args.target)
+        return {'format': 'delta', 'cible': args.target, 'produits': count, 'fichier': file_path}
+
+    if not args.results:
+        raise CLIError("Fichier de résultats requis (ou --delta)")
+    _existing_files([args.results])
+    progress('lecture', fichier=args.results)
+    results = load_results_file(args.results)
+    if 'ODOO' in results:
+        raise CLIError("Le fichier est déjà un CSV ODOO: fournir un classeur SKU_*.xlsx")
+
+    if args.format == 'json':
+        output = args.output or "odoo_import.json"
+        count, file_path = odoo.export_to_odoo_json(results, output, compact=args.compact, ndjson=args.ndjson)
+    else:
+        output = args.output or "odoo_import.csv"
+        count, file_path = odoo.export_to_odoo_csv(results, output)
+    progress('export', format=args.format, produits=count, fichier=file_path)
+
+    issues = [str(issue) for issue in odoo.validate_odoo_data(odoo.prepare_products(results))] \
+        if args.validate else None
+    return {'format': args.format, 'produits': count, 'fichier': file_path, 'problemes': issues}
+
+
+def cmd_stats(args, progress: Progress) -> dict:
+    from bom_analyzer import BOMComparator
+
+    comparator = BOMComparator(_generator(args))
+    if args.reconcile:
+        progress('reconciliation')
+        return comparator.reconcile_database_stats()
+    return comparator.get_database_stats()
+
+
+def cmd_bench(args, progress: Progress) -> dict:
+    from benchmarks import SyntheticBOMSpec, compare_results, run_benchmarks
+    from benchmarks.scenarios import load_results
+
+    spec = SyntheticBOMSpec(rows=args.rows, electrical_ratio=args.electrical_ratio,
+                            duplicate_ratio=args.duplicate_ratio, seed=args.seed)
+    names = args.scenario or None
+    progress('banc_essai', lignes=spec.rows, repetitions=args.repeat)
+    results = run_benchmarks(spec, names, args.repeat, args.output)
+    for name, measure in results['scenarios'].items():
+        progress('scenario', nom=name, min=measure['min'])
+
+    if args.compare:
+        results['comparaison'] = compare_results(load_results(args.compare), results, args.threshold)
+        results['_echec'] = any(row['regression'] for row in results['comparaison'])
+    return results
+
+
+COMMANDS = {
+    'analyze': cmd_analyze,
+    'generate': cmd_generate,
+    'search': cmd_search,
+    'decode': cmd_decode,
+    'export-odoo': cmd_export_odoo,
+    'stats': cmd_stats,
+    'bench': cmd_bench,
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="sku_cli.py", description="Générateur de SKU en ligne de commande")
+    parser.add_argument("--db", dest="db_path", default="sku_database.db", help="Base de données SKU")
+    parser.add_argument("--progress", choices=['text', 'json', 'none'], default='text',
+                        help="Progression sur stderr (défaut: text)")
+    parser.add_argument("--indent", type=int, default=None, help="Indentation du JSON produit")
+    parser.add_argument("--timings", action="store_true", help="Ajouter la durée des étapes au résultat")
+    parser.add_argument("--profile", action="store_true",
+                        help="Enregistrer un profil (cProfile + requêtes SQL) dans profiles/")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Journaux aussi sur stderr")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    analyze = subparsers.add_parser('analyze', help="Composants nouveaux/existants de BOM")
+    analyze.add_argument('files', nargs='+', help="Fichiers BOM (gabarit unifié)")
+    analyze.add_argument('--details', action='store_true', help="Lister les composants")
+
+    generate = subparsers.add_parser('generate', help="Générer les SKU de BOM et exporter")
+    generate.add_argument('files', nargs='+', help="Fichiers BOM (gabarit unifié)")
+    generate.add_argument('--domain', action='append', choices=list(DOMAIN_SHEETS),
+                          help="Domaine retenu (répétable; défaut: tous)")
+    generate.add_argument('--only-new', action='store_true', help="Ignorer les composants ayant déjà un SKU")
+    generate.add_argument('--format', action='append',
+                          choices=['excel', 'odoo_csv', 'odoo_json', 'odoo_delta_csv'],
+                          help="Sorties à écrire (répétable; défaut: excel)")
+    generate.add_argument('--output-dir', help="Dossier des sorties (défaut: celui du BOM)")
+    generate.add_argument('--target', default='cli_csv', help="Filigrane de odoo_delta_csv")
+    generate.add_argument('--include-skus', action='store_true', help="Inclure les SKU générés dans le JSON")
+
+    search = subparsers.add_parser('search', help="Rechercher des SKU (préfixe puis sous-chaîne)")
+    search.add_argument('text', help="Début ou fragment de SKU")
+    search.add_argument('--limit', type=int, default=15)
+
+    decode = subparsers.add_parser('decode', help="Décoder des SKU")
+    decode.add_argument('skus', nargs='+', help="SKU à décoder ('-' pour lire stdin, un par ligne)")
+
+    export = subparsers.add_parser('export-odoo', help="Exporter des résultats SKU pour ODOO")
+    export.add_argument('results', nargs='?', help="Classeur de résultats SKU_*.xlsx")
+    export.add_argument('--format', choices=['csv', 'json'], default='csv')
+    export.add_argument('--output', help="Fichier produit")
+    export.add_argument('--compact', action='store_true', help="JSON sans indentation")
+    export.add_argument('--ndjson', action='store_true', help="JSON: un produit par ligne")
+    export.add_argument('--validate', action='store_true', help="Contrôler les données avant import")
+    export.add_argument('--delta', action='store_true',
+                        help="Composants ajoutés/modifiés depuis le dernier export (lit la base)")
+    export.add_argument('--target', default='odoo_csv', help="Filigrane de l'export différentiel")
+    export.add_argument('--full', action='store_true', help="Réinitialiser le filigrane et tout exporter")
+
+    stats = subparsers.add_parser('stats', help="Statistiques de la base")
+    stats.add_argument('--reconcile', action='store_true', help="Reconstruire les statistiques")
+
+    bench = subparsers.add_parser('bench', help="Banc d'essai des performances")
+    bench.add_argument('--rows', type=int, default=1000, help="Lignes du BOM synthétique")
+    bench.add_argument('--electrical-ratio', type=float, default=0.4)
+    bench.add_argument('--duplicate-ratio', type=float, default=0.1)
+    bench.add_argument('--seed', type=int, default=42)
+    bench.add_argument('--repeat', type=int, default=3)
+    bench.add_argument('--scenario', action='append', help="Scénario à exécuter (répétable; défaut: tous)")
+    bench.add_argument('--output', help="Fichier JSON des résultats")
+    bench.add_argument('--compare', help="Résultats JSON de référence à comparer")
+    bench.add_argument('--threshold', type=float, default=0.10, help="Écart toléré avant régression")
+
+    return parser
+
+
+def run(argv: Optional[List[str]] = None, stdout=None) -> int:
+    """
+    Exécuter une commande; écrit le JSON sur `stdout` et retourne le code de sortie.
+    La journalisation n'est pas configurée ici (voir main): un appel depuis un
+    autre programme ou un test garde la sienne.
+    """
+    return _execute(build_parser().parse_args(argv), stdout or sys.stdout)
+
+
+def _execute(args: argparse.Namespace, stdout) -> int:
+    if args.command == 'generate' and not args.format:
+        args.format = ['excel']
+    progress = Progress(args.progress)
+
+    instrumentation_was_enabled = instrumentation.is_enabled()
+    if args.timings or INSTRUMENTATION_CONFIG.get("enabled", False):
+        instrumentation.enable()
+    instrumentation.reset()
+    if args.command == 'generate':
+        db_backup.enable_auto_backup(args.db_path)
+        sku_journal.enable_journal(args.db_path)
+
+    status = 0
+    try:
+        with profiled(f"cli_{args.command}", args.profile) as session:
+            result = COMMANDS[args.command](args, progress)
+        if result.pop('_echec', False):
+            status = 1
+        if args.timings:
+            result['instrumentation'] = instrumentation.summary()
+        if session is not None:
+            result['profil'] = session.archive_path or session.directory
+    except CLIError as e:
+        result, status = {'erreur': str(e)}, 2
+    except Exception as e:
+        logger.exception(f"Échec de la commande {args.command}")
+        result, status = {'erreur': f"{type(e).__name__}: {e}"}, 1
+    finally:
+        # Sauvegarde en cours terminée avant de rendre la main
+        db_backup.disable_auto_backup(args.db_path)
+        sku_journal.disable_journal(args.db_path)
+        if not instrumentation_was_enabled:
+            instrumentation.disable()
+
+    json.dump({'commande': args.command, 'code': status, **result}, stdout,
+              indent=args.indent, ensure_ascii=False, default=_json_default)
+    stdout.write("\n")
+    stdout.flush()
+    return status
+
+
+def main():
+    args = build_parser().parse_args()
+    setup_logging(console=args.verbose)
+    return _execute(args, sys.stdout)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
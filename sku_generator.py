@@ -4,18 +4,98 @@ Générateur de SKU industriel avec logique de route et routing
 Développé pour Noovelia par GitHub Copilot
 """
 
-import pandas as pd
+from __future__ import annotations
+
 import sqlite3
 import hashlib
+import os
 import re
-from typing import Dict, List, Tuple, Optional
+import threading
+import uuid
+from typing import Dict, List, Mapping, Tuple, Optional
 from dataclasses import dataclass
+from collections import Counter
 from datetime import datetime
 import logging
 
-# Configuration du logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+import db_backup
+import instrumentation
+import mapping_registry
+import sku_journal
+from config import DATABASE_CONFIG, SKU_FORMAT
+from logging_setup import SampledLogger
+from mapping_registry import CompiledMappings, clean_type_name, compile_mappings
+from sku_sequence import SKU_ALPHABET, capacity, decode_sequence, encode_sequence
+from lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
+
+# Journalisation configurée par les points d'entrée (logging_setup.setup_logging)
 logger = logging.getLogger(__name__)
+# Un message par SKU: DEBUG échantillonné, les lots résument en INFO
+sku_logger = SampledLogger(logger)
+
+# Noms des familles (domaines) pour le décodage
+FAMILLE_NAMES = {
+    'ELEC': 'Électrique',
+    'MECA': 'Mécanique'
+}
+
+# Colonnes produites par decode_many (union des clés de decode_sku_parts)
+DECODE_COLUMNS = [
+    'format',
+    'famille_code', 'famille_nom', 'sous_famille_code', 'sous_famille_nom',
+    'domaine_code', 'domaine_nom', 'route_code', 'route_nom',
+    'routing_code', 'routing_nom', 'type_code', 'type_nom',
+    'sequence', 'description', 'erreur'
+]
+
+# Version du schéma enregistrée dans PRAGMA user_version. À incrémenter à chaque
+# ajout de table, d'index ou de trigger dans _create_schema: les bases d'une version
+# antérieure sont mises à jour une fois, les autres ne voient plus aucun DDL.
+SCHEMA_VERSION = 3
+
+# Bases dont le schéma est à jour pour ce processus: chemin absolu -> (st_dev, st_ino).
+# L'identité du fichier détecte une base supprimée puis recréée (reset_database.py).
+_schema_registry: Dict[str, Tuple[int, int]] = {}
+_schema_lock = threading.Lock()
+
+
+def _is_memory_db(db_path: str) -> bool:
+    # Chaque connexion à ':memory:' ouvre une base vide: rien à mémoriser
+    return db_path == ':memory:' or db_path.startswith('file::memory:') or 'mode=memory' in db_path
+
+
+def _file_identity(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+def forget_schema(db_path: str):
+    """
+    Oublier qu'une base a été initialisée. À appeler après avoir supprimé ou remplacé
+    le fichier: un fichier recréé peut réutiliser l'inode de l'ancien.
+    """
+    with _schema_lock:
+        _schema_registry.pop(os.path.abspath(db_path), None)
+
+
+# Dimensions de la table component_stats: (dimension, expression de clé, condition).
+# {row} vaut NEW/OLD dans les triggers et components lors d'une reconstruction.
+# La sous-famille n'est comptée que pour les SKU simplifiés (3 parties) et inclut
+# la famille (ex: ELEC-RESIST).
+STATS_DIMENSIONS = (
+    ("total", "''", "1"),
+    ("domain", "IFNULL({row}.domain, '')", "1"),
+    ("route", "IFNULL({row}.route, '')", "1"),
+    ("routing", "IFNULL({row}.routing, '')", "1"),
+    ("sous_famille",
+     "substr({row}.sku, 1, instr({row}.sku, '-') + instr(substr({row}.sku, instr({row}.sku, '-') + 1), '-') - 1)",
+     "length({row}.sku) - length(replace({row}.sku, '-', '')) = 2"),
+)
 
 @dataclass
 class Component:
@@ -38,106 +118,89 @@ class SKUGenerator:
         self.db_path = db_path
         self.init_database()
 
+        # SKU nouveaux/existants/rejetés depuis la création (résumés de lot de BOMProcessor)
+        self.generation_counts = Counter()
+
         # Alphabet SKU industriel (sans caractères ambigus)
         # Supprime: I, L, O, U, V, 0, 1, 9 pour éviter les confusions
-        self.sku_alphabet = "ABCDEFGHJKMNPQRSTWXYZ23456789"
-
-        # Mapping des routes et routings basé sur vos données
-        self.route_mapping = {
-            # Routes électriques
-            "Assemblage": "ASS",
-            "Connecteurs": "CONN",
-            "Borniers": "TERM",
-            "Communication": "COMM",
-            "Contrôleurs": "CTRL",
-            "Alimentation": "POWER",
-            "Moteurs": "MOTOR",
-
-            # Routes mécaniques
-            "ASSEMBLAGE MÉCANIQUE": "ASS",
-            "ASSEMBLAGE SOUDÉ": "WELD",
-            "PIÈCES USINÉES": "MACH",
-            "PIÈCES PLIÉES": "BEND",
-            "PIÈCES DÉCOUPÉES LASER": "LASER",
-            "BOULONNERIE": "BOLT",
-            "PLASTIQUE": "PLAST"
-        }
-
-        self.routing_mapping = {
-            # Routings électriques
-            "Assemblage": "ASM",
-            "Cosses, oeillets, fourchettes": "TERM",
-            "Boitiers": "ENCL",
-            "Fusibles": "FUSE",
-            "Broches": "PIN",
-            "Fil": "WIRE",
-
-            # Routings mécaniques
-            "BOULONNERIE": "BOLT",
-            "PIÈCES PLIÉES": "BEND",
-            "ASSEMBLAGE MÉCANIQUE": "MECH",
-            "COMPOSANTES MECANIQUES": "COMP",
-            "PIÈCES DÉCOUPÉES LASER": "CUT",
-            "PIÈCES USINÉES": "MILL",
-            "PLASTIQUE (UHMW, LEXAN, ...)": "POLY"
-        }
-
-        # Mapping des types de composants pour le décodage (en français lisible étendu)
-        # Format optimisé pour éviter la redondance et clarifier l'action
-        self.type_mapping = {
-            # Types électriques (lisibles en français - 5-6 lettres)
-            "Résistances": "RESIST",
-            "Condensateurs": "CONDEN",
-            "Inductances": "INDUCT",
-            "Diodes": "DIODES",
-            "Transistors": "TRANSI",
-            "Circuits intégrés": "CIRCUI",
-            "Connecteurs": "CONNEC",
-            "Relais": "RELAIS",
-            "Fusibles": "FUSIBL",
-            "Accessoires de borniers": "BORNIE",
-            "Cosses, oeillets, fourchettes": "COSSES",
-            "Broches": "BROCHE",
-            "Fil": "FILAGE",
-            "Boitiers": "BOITIE",
-
-            # Types mécaniques optimisés (action + matériau/finition optionnels)
-            "Pièces Pliées": "PLIAGE",
-            "PIÈCES PLIÉES": "PLIAGE",
-            "Pièces Usinées": "USINER",
-            "PIÈCES USINÉES": "USINER",
-            "Pièces Découpées": "DECOUP",
-            "PIÈCES DÉCOUPÉES LASER": "DECOUP",
-            # Boulonnerie : différencier par taille/matériau
-            "Boulonnerie": "VISSER",
-            "BOULONNERIE": "VISSER",
-            "Vis M3": "VISSM3",  # Exemple avec dimension
-            "Vis M4": "VISSM4",
-            "Vis M5": "VISSM5",
-            "Vis M6": "VISSM6",
-            "Vis M8": "VISSM8",
-            "Boulon M10": "BOULM10",
-            "Boulon M12": "BOULM12",
-            # Assemblages
-            "Assemblage Mécanique": "MONTER",
-            "ASSEMBLAGE MÉCANIQUE": "MONTER",
-            "Assemblage Final": "FINAL",
-            "Sous-assemblage": "SOUSAS",
-            # Matériaux avec finition
-            "Plastique": "PLASTI",
-            "PLASTIQUE": "PLASTI",
-            "Aluminium": "ALUMI",
-            "Acier": "ACIER",
-            "Inox": "INOX",
-            "Composantes Mécaniques": "COMPNT",
-            "COMPOSANTES MECANIQUES": "COMPNT"
-        }
-
-    def init_database(self):
-        """Initialise la base de données SQLite"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
+        self.sku_alphabet = SKU_ALPHABET
+
+        # Largeur du code de séquence: croît d'un caractère quand une sous-famille est pleine
+        self.sequence_length = SKU_FORMAT.get("sequence_length", 4)
+        self.sequence_max_length = SKU_FORMAT.get("sequence_max_length", 6)
+        self.capacity_warning_ratio = SKU_FORMAT.get("capacity_warning_ratio", 0.9)
+        self.sous_famille_length = SKU_FORMAT.get("sous_famille_length", 6)
+
+        # Tables de correspondance: version compilée partagée (mapping_registry), suivie à
+        # chaque rechargement. Une copie modifiée par l'appelant (type_mapping, ...) puis
+        # invalidate_mappings() donne à cette instance sa propre version compilée.
+        self._local_mappings: Optional[CompiledMappings] = None
+        self._editable_mappings: Dict[str, Dict[str, str]] = {}
+
+    @property
+    def mappings(self) -> CompiledMappings:
+        return self._local_mappings or mapping_registry.current()
+
+    @property
+    def mapping_version(self) -> int:
+        return self.mappings.version
+
+    def _editable(self, name: str) -> Dict[str, str]:
+        # Copie modifiable, prise en compte par invalidate_mappings()
+        if name not in self._editable_mappings:
+            self._editable_mappings[name] = dict(getattr(self.mappings, name))
+        return self._editable_mappings[name]
+
+    @property
+    def type_mapping(self) -> Dict[str, str]:
+        return self._editable('type_mapping')
+
+    @property
+    def route_mapping(self) -> Dict[str, str]:
+        return self._editable('route_mapping')
+
+    @property
+    def routing_mapping(self) -> Dict[str, str]:
+        return self._editable('routing_mapping')
+
+    def _connect(self) -> sqlite3.Connection:
+        """Connexion à la base (requêtes comptées par l'instrumentation quand elle est active)"""
+        return instrumentation.connect(self.db_path)
+
+    def init_database(self, force: bool = False):
+        """
+        Initialise la base de données SQLite, une fois par fichier et par processus.
+        Les constructions suivantes ne font qu'un os.stat; une base déjà à la version
+        SCHEMA_VERSION (PRAGMA user_version) n'exécute aucun DDL.
+        """
+        memory = _is_memory_db(self.db_path)
+        path = os.path.abspath(self.db_path)
+        if not force and not memory:
+            identity = _file_identity(path)
+            if identity is not None and _schema_registry.get(path) == identity:
+                return
+
+        with _schema_lock:
+            conn = self._connect()
+            try:
+                cursor = conn.cursor()
+                version = cursor.execute("PRAGMA user_version").fetchone()[0]
+                if force or version < SCHEMA_VERSION:
+                    if not memory:
+                        # WAL (enregistré dans le fichier): lecteurs (sauvegardes, exports)
+                        # et générateur ne se bloquent plus
+                        cursor.execute(f"PRAGMA journal_mode = {DATABASE_CONFIG.get('journal_mode', 'WAL')}")
+                    self._create_schema(cursor)
+                    cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                    conn.commit()
+                    logger.info(f"Base de données initialisée (schéma v{SCHEMA_VERSION})")
+            finally:
+                conn.close()
+            if not memory:
+                _schema_registry[path] = _file_identity(path)
+
+    def _create_schema(self, cursor):
+        """Tables, index et triggers (idempotent: IF NOT EXISTS partout)"""
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS components (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -167,9 +230,126 @@ class SKUGenerator:
             )
         ''')
 
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sku_counters_simplified (
+                famille TEXT,
+                sous_famille TEXT,
+                counter INTEGER DEFAULT 0,
+                PRIMARY KEY (famille, sous_famille)
+            )
+        ''')
+
+        self._init_stats_table(cursor)
+        self._init_change_tracking(cursor)
+
+    def _init_change_tracking(self, cursor):
+        """Suivi des modifications pour les exports différentiels (voir ODOOIntegration)"""
+        # updated_date suit chaque modification, sauf si la requête la fixe elle-même
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_components_touch
+            AFTER UPDATE ON components
+            FOR EACH ROW WHEN NEW.updated_date IS OLD.updated_date
+            BEGIN
+                UPDATE components SET updated_date = CURRENT_TIMESTAMP WHERE id = NEW.id;
+            END
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_components_updated_date ON components (updated_date)")
+
+        # Dernier export réussi par destination (fichier CSV, envoi JSON-RPC, ...)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS export_watermarks (
+                target TEXT PRIMARY KEY,
+                last_id INTEGER NOT NULL DEFAULT 0,
+                last_updated TIMESTAMP,
+                exported_count INTEGER NOT NULL DEFAULT 0,
+                exported_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Identité de la base (époque): change à chaque recréation, jamais à la restauration
+        # d'une sauvegarde. Le journal (sku_journal.py) la recopie dans son en-tête.
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS database_identity (
+                epoch TEXT NOT NULL,
+                created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute("SELECT 1 FROM database_identity")
+        if cursor.fetchone() is None:
+            cursor.execute("INSERT INTO database_identity (epoch) VALUES (?)", (uuid.uuid4().hex,))
+
+    def _init_stats_table(self, cursor):
+        """Crée la table de statistiques maintenue par triggers (lecture O(1))"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'component_stats'")
+        stats_exists = cursor.fetchone() is not None
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS component_stats (
+                dimension TEXT NOT NULL,
+                key TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (dimension, key)
+            )
+        ''')
+
+        # Un trigger par opération: chaque ligne de components ajuste ses compteurs
+        for event, sign_rows in (
+            ("INSERT", (("NEW", "+ 1"),)),
+            ("DELETE", (("OLD", "- 1"),)),
+            ("UPDATE OF sku, domain, route, routing", (("OLD", "- 1"), ("NEW", "+ 1"))),
+        ):
+            trigger_name = f"trg_component_stats_{event.split()[0].lower()}"
+            statements = []
+            for row, delta in sign_rows:
+                initial = "1" if delta == "+ 1" else "-1"
+                for dimension, key_expr, condition in STATS_DIMENSIONS:
+                    key_expr = key_expr.format(row=row)
+                    condition = condition.format(row=row)
+                    statements.append(
+                        f"INSERT INTO component_stats (dimension, key, count) "
+                        f"SELECT '{dimension}', {key_expr}, {initial} WHERE {condition} "
+                        f"ON CONFLICT (dimension, key) DO UPDATE SET count = count {delta};"
+                    )
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {trigger_name}
+                AFTER {event} ON components
+                BEGIN
+                    {" ".join(statements)}
+                END
+            ''')
+
+        if not stats_exists:
+            # Base existante sans table de stats: la construire une fois
+            self._rebuild_stats(cursor)
+
+    def _rebuild_stats(self, cursor):
+        """Recalcule entièrement component_stats à partir de components"""
+        cursor.execute("DELETE FROM component_stats")
+        for dimension, key_expr, condition in STATS_DIMENSIONS:
+            key_expr = key_expr.format(row="components")
+            condition = condition.format(row="components")
+            cursor.execute(f'''
+                INSERT INTO component_stats (dimension, key, count)
+                SELECT '{dimension}', {key_expr}, COUNT(*) FROM components
+                WHERE {condition}
+                GROUP BY 2
+            ''')
+
+    def reconcile_stats(self) -> int:
+        """Reconstruit la table de statistiques (commande de réconciliation)"""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        self._rebuild_stats(cursor)
+        cursor.execute("SELECT count FROM component_stats WHERE dimension = 'total'")
+        result = cursor.fetchone()
+
         conn.commit()
         conn.close()
-        logger.info("Base de données initialisée")
+
+        total = result[0] if result else 0
+        logger.info(f"Statistiques réconciliées: {total} composants")
+        return total
 
     def normalize_text(self, text: str, max_length: int = 6) -> str:
         """Normalise le texte pour le SKU hybride (lisible mais sécurisé) - 5-6 lettres"""
@@ -178,10 +358,9 @@ class SKUGenerator:
         if not text:
             return "UNKN"[:max_length]
 
-        # Pour les types connus, utiliser directement le mapping français
-        text_clean = text.upper().replace(' ', '').replace('È', 'E').replace('É', 'E')
-        for french_name, code in self.type_mapping.items():
-            french_clean = french_name.upper().replace(' ', '').replace('È', 'E').replace('É', 'E')
+        # Pour les types connus, utiliser directement le mapping français (noms nettoyés d'avance)
+        text_clean = clean_type_name(text)
+        for french_clean, code in self.mappings.type_keys:
             if french_clean in text_clean or text_clean in french_clean:
                 return code[:max_length]
 
@@ -227,8 +406,9 @@ class SKUGenerator:
 
     def get_route_code(self, component_type: str, domain: str) -> str:
         """Détermine le code de route basé sur le type de composant"""
-        for key, code in self.route_mapping.items():
-            if key.upper() in component_type.upper():
+        component_type = component_type.upper()
+        for key, code in self.mappings.route_keys:
+            if key in component_type:
                 return code
 
         # Route par défaut selon le domaine
@@ -236,22 +416,24 @@ class SKUGenerator:
 
     def get_routing_code(self, component_type: str) -> str:
         """Détermine le code de routing basé sur le type de composant"""
-        for key, code in self.routing_mapping.items():
-            if key.upper() in component_type.upper():
+        component_type = component_type.upper()
+        for key, code in self.mappings.routing_keys:
+            if key in component_type:
                 return code
 
         return "STD"  # Routing standard par défaut
 
     def create_component_hash(self, component: Component) -> str:
         """Crée un hash unique pour identifier les composants similaires"""
-        hash_string = f"{component.name}_{component.description}_{component.component_type}_{component.manufacturer}_{component.manufacturer_part}"
-        return hashlib.md5(hash_string.encode()).hexdigest()[:8]
+        with instrumentation.span('sku.hash'):
+            hash_string = f"{component.name}_{component.description}_{component.component_type}_{component.manufacturer}_{component.manufacturer_part}"
+            return hashlib.md5(hash_string.encode()).hexdigest()[:8]
 
     def get_existing_sku(self, component: Component) -> Optional[str]:
         """Vérifie si un composant similaire existe déjà"""
         component_hash = self.create_component_hash(component)
 
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -265,7 +447,7 @@ class SKUGenerator:
 
     def get_next_sequence(self, domain: str, route: str, routing: str, type_code: str) -> int:
         """Obtient le prochain numéro de séquence (format ancien)"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -289,6 +471,7 @@ class SKUGenerator:
                 VALUES (?, ?, ?, ?, ?)
             ''', (domain, route, routing, type_code, new_counter))
 
+        sku_journal.record_legacy_allocation(self.db_path, domain, route, routing, type_code, new_counter)
         conn.commit()
         conn.close()
 
@@ -296,19 +479,10 @@ class SKUGenerator:
 
     def get_next_sequence_simplified(self, famille: str, sous_famille: str) -> int:
         """Obtient le prochain numéro de séquence pour le format simplifié FAMILLE-SOUS_FAMILLE"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
 
-        # Créer la table simplifiée si elle n'existe pas
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sku_counters_simplified (
-                famille TEXT,
-                sous_famille TEXT,
-                counter INTEGER DEFAULT 0,
-                PRIMARY KEY (famille, sous_famille)
-            )
-        ''')
-
+        # Table créée par init_database (schéma vérifié une fois par processus)
         cursor.execute('''
             SELECT counter FROM sku_counters_simplified
             WHERE famille = ? AND sous_famille = ?
@@ -330,33 +504,34 @@ class SKUGenerator:
                 VALUES (?, ?, ?)
             ''', (famille, sous_famille, new_counter))
 
+        # Journalisé avant le commit: au pire une séquence consommée, jamais réattribuée
+        sku_journal.record_allocation(self.db_path, famille, sous_famille, new_counter)
         conn.commit()
         conn.close()
 
         return new_counter
 
     def format_sequence(self, sequence: int) -> str:
-        """Formate la séquence en groupes de 4 avec l'alphabet industriel"""
-        # Convertir en base avec l'alphabet industriel (28 caractères)
-        alphabet = self.sku_alphabet
-        base = len(alphabet)
-
-        if sequence == 0:
-            return "2222"  # Pas de zéro, commence à 2222
-
-        # Ajuster la séquence pour commencer à 1
-        sequence_adjusted = sequence - 1
-
-        # Conversion en base 28 (alphabet industriel)
-        result = ""
-        temp = sequence_adjusted
-
-        # Générer 4 caractères
-        for _ in range(4):
-            result = alphabet[temp % base] + result
-            temp //= base
-
-        return result
+        """Formate la séquence avec l'alphabet industriel (4 caractères, plus au-delà de 29^4)"""
+        return encode_sequence(sequence, self.sequence_length, self.sequence_max_length)
+
+    def parse_sequence(self, code: str) -> int:
+        """Inverse de format_sequence: retrouve le numéro de séquence d'un code"""
+        return decode_sequence(code, self.sequence_length)
+
+    def _check_sequence_capacity(self, famille: str, sous_famille: str, sequence: int):
+        """Avertit quand une sous-famille approche ou dépasse la capacité de sa largeur de code"""
+        base_capacity = capacity(self.sequence_length)
+        if sequence == int(base_capacity * self.capacity_warning_ratio):
+            logger.warning(
+                f"Sous-famille {famille}-{sous_famille}: {sequence}/{base_capacity} séquences "
+                f"utilisées sur {self.sequence_length} caractères"
+            )
+        elif sequence == base_capacity + 1:
+            logger.warning(
+                f"Sous-famille {famille}-{sous_famille}: capacité atteinte, "
+                f"les séquences passent à {self.sequence_length + 1} caractères"
+            )
 
     def optimize_sku_format(self, domain: str, route_code: str, routing_code: str, type_code: str) -> tuple:
         """
@@ -448,13 +623,18 @@ class SKUGenerator:
 
         # Validation des champs obligatoires pour éviter les SKU vides
         if not self._validate_component(component):
+            instrumentation.count('sku.rejetes')
+            self.generation_counts['rejetes'] += 1
             logger.warning(f"Composant invalide ignoré: {component.name} - {component.description}")
             raise ValueError(f"Composant invalide: champs obligatoires manquants")
 
         # Vérifier si le composant existe déjà
-        existing_sku = self.get_existing_sku(component)
+        with instrumentation.span('sqlite.recherche_existant'):
+            existing_sku = self.get_existing_sku(component)
         if existing_sku:
-            logger.info(f"Composant existant trouvé: {existing_sku}")
+            instrumentation.count('sku.existants')
+            self.generation_counts['existants'] += 1
+            sku_logger.debug("Composant existant trouvé: %s", existing_sku)
             return existing_sku
 
         # NOUVELLE LOGIQUE SIMPLIFIÉE : FAMILLE-SOUS_FAMILLE-SEQUENCE
@@ -462,28 +642,33 @@ class SKUGenerator:
         famille = component.domain
 
         # SOUS_FAMILLE = Type de composant simplifié (sans redondance)
-        sous_famille = self.normalize_text(component.component_type, 6)
+        sous_famille = self.normalize_text(component.component_type, self.sous_famille_length)
 
         # Obtenir le numéro de séquence simplifié
-        sequence = self.get_next_sequence_simplified(famille, sous_famille)
+        with instrumentation.span('sqlite.sequence'):
+            sequence = self.get_next_sequence_simplified(famille, sous_famille)
 
         # Formater la séquence avec l'alphabet industriel
+        self._check_sequence_capacity(famille, sous_famille, sequence)
         sequence_code = self.format_sequence(sequence)
 
         # Construire le SKU simplifié : FAMILLE-SOUS_FAMILLE-SEQUENCE
         sku = f"{famille}-{sous_famille}-{sequence_code}"
 
         # Sauvegarder dans la base de données
-        self.save_component(component, sku)
+        with instrumentation.span('sqlite.insertion'):
+            self.save_component(component, sku)
+        instrumentation.count('sku.nouveaux')
+        self.generation_counts['nouveaux'] += 1
 
-        logger.info(f"Nouveau SKU simplifié généré: {sku}")
+        sku_logger.debug("Nouveau SKU simplifié généré: %s", sku)
         return sku
 
     def save_component(self, component: Component, sku: str):
         """Sauvegarde le composant dans la base de données"""
         component_hash = self.create_component_hash(component)
 
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -497,12 +682,20 @@ class SKUGenerator:
             component.manufacturer, component.manufacturer_part, component_hash
         ))
 
+        sku_journal.record_insertion(self.db_path, {
+            'sku': sku, 'name': component.name, 'description': component.description,
+            'domain': component.domain, 'component_type': component.component_type,
+            'route': component.route, 'routing': component.routing,
+            'manufacturer': component.manufacturer, 'manufacturer_part': component.manufacturer_part,
+            'component_hash': component_hash,
+        })
         conn.commit()
         conn.close()
+        db_backup.notify_insert(self.db_path)
 
     def search_component_by_sku(self, sku: str) -> Optional[Dict]:
         """Rechercher un composant par son SKU"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -532,7 +725,7 @@ class SKUGenerator:
 
     def find_similar_components(self, domain: str, component_type: str) -> List[Dict]:
         """Trouver des composants similaires par domaine et type"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -560,7 +753,7 @@ class SKUGenerator:
 
     def search_partial_sku(self, partial_sku: str) -> List[Dict]:
         """Rechercher des SKU qui contiennent une partie du SKU donné"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
 
         # Recherche avec LIKE pour trouver des SKU similaires
@@ -591,7 +784,7 @@ class SKUGenerator:
 
     def get_all_skus(self, limit: int = 100) -> List[Dict]:
         """Récupérer tous les SKU avec pagination"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -615,70 +808,54 @@ class SKUGenerator:
             for result in results
         ]
 
+    def _get_reverse_mappings(self) -> Mapping[str, Mapping[str, str]]:
+        """Mappings inverses code -> nom, précalculés avec chaque version des mappings"""
+        return self.mappings.reverse
+
+    def invalidate_mappings(self):
+        """À appeler après modification de type_mapping, route_mapping ou routing_mapping"""
+        self._local_mappings = compile_mappings(
+            self.type_mapping, self.route_mapping, self.routing_mapping,
+            version=self.mappings.version + 1, source="instance",
+        )
+        self._editable_mappings = {}
+
     def decode_sku_parts(self, sku: str) -> Dict[str, str]:
         """Décoder les parties d'un SKU avec leurs significations - Support format simplifié et ancien"""
         parts = sku.split('-')
+        reverse = self._get_reverse_mappings()
 
         # Nouveau format simplifié : FAMILLE-SOUS_FAMILLE-SEQUENCE (3 parties)
         if len(parts) == 3:
             famille_code, sous_famille_code, sequence = parts
 
-            # Mapping inverse pour les domaines/familles
-            famille_meaning = {
-                'ELEC': 'Électrique',
-                'MECA': 'Mécanique'
-            }.get(famille_code, famille_code)
-
-            # Mapping inverse pour les types/sous-familles
-            sous_famille_meaning = {}
-            for full_name, code in self.type_mapping.items():
-                sous_famille_meaning[code] = full_name
+            famille_meaning = FAMILLE_NAMES.get(famille_code, famille_code)
+            sous_famille_nom = reverse['type'].get(sous_famille_code, sous_famille_code)
 
             return {
                 'format': 'simplifie',
                 'famille_code': famille_code,
                 'famille_nom': famille_meaning,
                 'sous_famille_code': sous_famille_code,
-                'sous_famille_nom': sous_famille_meaning.get(sous_famille_code, sous_famille_code),
+                'sous_famille_nom': sous_famille_nom,
                 'sequence': sequence,
-                'description': f"Composant {famille_meaning.lower()} de type {sous_famille_meaning.get(sous_famille_code, sous_famille_code)}"
+                'description': f"Composant {famille_meaning.lower()} de type {sous_famille_nom}"
             }
 
         # Ancien format : DOMAINE-ROUTE-ROUTING-TYPE-SEQUENCE (5 parties)
         elif len(parts) == 5:
             domain_code, route_code, routing_code, type_code, sequence = parts
 
-            # Mapping inverse pour les domaines
-            domain_meaning = {
-                'ELEC': 'Électrique',
-                'MECA': 'Mécanique'
-            }.get(domain_code, domain_code)
-
-            # Mapping inverse pour les routes
-            route_meaning = {}
-            for full_name, code in self.route_mapping.items():
-                route_meaning[code] = full_name
-
-            # Mapping inverse pour les routings
-            routing_meaning = {}
-            for full_name, code in self.routing_mapping.items():
-                routing_meaning[code] = full_name
-
-            # Mapping inverse pour les types
-            type_meaning = {}
-            for full_name, code in self.type_mapping.items():
-                type_meaning[code] = full_name
-
             return {
                 'format': 'ancien',
                 'domaine_code': domain_code,
-                'domaine_nom': domain_meaning,
+                'domaine_nom': FAMILLE_NAMES.get(domain_code, domain_code),
                 'route_code': route_code,
-                'route_nom': route_meaning.get(route_code, route_code),
+                'route_nom': reverse['route'].get(route_code, route_code),
                 'routing_code': routing_code,
-                'routing_nom': routing_meaning.get(routing_code, routing_code),
+                'routing_nom': reverse['routing'].get(routing_code, routing_code),
                 'type_code': type_code,
-                'type_nom': type_meaning.get(type_code, type_code),
+                'type_nom': reverse['type'].get(type_code, type_code),
                 'sequence': sequence
             }
 
@@ -689,6 +866,38 @@ class SKUGenerator:
                 'erreur': f"Format SKU non reconnu: {len(parts)} parties au lieu de 3 (simplifié) ou 5 (ancien)"
             }
 
+    def decode_many(self, skus) -> pd.DataFrame:
+        """
+        Décode une colonne entière de SKU (exports, rapports).
+        Chaque préfixe distinct (tout sauf la séquence) n'est décodé qu'une fois,
+        puis les colonnes sont réparties sur toutes les lignes par indexation.
+        Retourne un DataFrame (même index que l'entrée) avec les clés de
+        decode_sku_parts comme colonnes; les colonnes non applicables sont vides.
+        """
+        sku_series = skus if isinstance(skus, pd.Series) else pd.Series(list(skus), dtype=object)
+        values = [str(sku) for sku in sku_series.tolist()]
+
+        # Clé = préfixe avec son séparateur final ('' si le SKU ne contient aucun '-')
+        partitions = [value.rpartition('-') for value in values]
+        keys = [prefix + sep for prefix, sep, _ in partitions]
+        sequences = [sequence for _, _, sequence in partitions]
+
+        codes, unique_keys = pd.factorize(pd.Series(keys, dtype=object))
+        table = pd.DataFrame(
+            [self.decode_sku_parts(key + 'X') for key in unique_keys],
+            columns=DECODE_COLUMNS
+        )
+
+        decoded = table.take(codes) if len(codes) else table.iloc[0:0]
+        decoded.index = sku_series.index
+        decoded.insert(0, 'sku', sku_series)
+
+        # La séquence réelle remplace le marqueur utilisé pour décoder le préfixe
+        is_valid = decoded['format'] != 'invalide'
+        decoded['sequence'] = pd.Series(sequences, index=sku_series.index, dtype=object).where(is_valid)
+
+        return decoded
+
     def get_process_description(self, domain: str, route: str, routing: str) -> str:
         """Obtenir une description du processus basé sur le domaine, route et routing"""
         if domain == "ELEC":
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Analyse d'intégrité des compteurs SKU: lacunes, doublons, dérive et capacité
+
+Les aperçus de la fenêtre de validation et les insertions échouées consomment des
+compteurs: sku_counters_simplified s'éloigne alors du contenu réel de components.
+Ce module décode en lot la séquence de chaque SKU simplifié stocké, en un seul
+passage sur la table, et compare le résultat aux compteurs.
+"""
+
+import argparse
+import logging
+import sqlite3
+import sys
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+import sku_journal
+from logging_setup import setup_logging
+from sku_sequence import DEFAULT_WIDTH, capacity, decode_sequences
+
+logger = logging.getLogger(__name__)
+
+REPORT_COLUMNS = [
+    'famille', 'sous_famille', 'skus', 'sequences_distinctes', 'doublons',
+    'sequence_max', 'lacunes', 'premieres_lacunes', 'compteur', 'derive',
+    'taux_capacite'
+]
+
+
+def _load_counters(cursor) -> Dict[Tuple[str, str], int]:
+    """Compteurs simplifiés actuels (table absente = aucun compteur)"""
+    try:
+        cursor.execute("SELECT famille, sous_famille, counter FROM sku_counters_simplified")
+    except sqlite3.OperationalError:
+        return {}
+    return {(famille, sous_famille): counter for famille, sous_famille, counter in cursor.fetchall()}
+
+
+def _gap_preview(sorted_unique: np.ndarray, limit: int = 3) -> str:
+    """Premières plages manquantes d'une séquence triée sans doublons (ex: '3-5, 9')"""
+    bounds = np.concatenate(([0], sorted_unique))
+    holes = np.flatnonzero(np.diff(bounds) > 1)[:limit]
+    ranges = []
+    for position in holes:
+        start, end = bounds[position] + 1, bounds[position + 1] - 1
+        ranges.append(str(start) if start == end else f"{start}-{end}")
+    return ", ".join(ranges)
+
+
+def analyze_counters(db_path: str = "sku_database.db", width: int = DEFAULT_WIDTH) -> dict:
+    """
+    Analyse toutes les familles en un passage sur components.
+    Retourne {'rapport': DataFrame (une ligne par famille/sous-famille),
+              'skus_analyses': int, 'sequences_invalides': int}
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        return _analyze(conn.cursor(), width)
+    finally:
+        conn.close()
+
+
+def _analyze(cursor, width: int) -> dict:
+    """Analyse sur une connexion ouverte (lecture dans la transaction de l'appelant)"""
+    cursor.execute("SELECT sku FROM components")
+    skus = [row[0] for row in cursor.fetchall()]
+    counters = _load_counters(cursor)
+
+    # Seuls les SKU simplifiés FAMILLE-SOUS_FAMILLE-SEQUENCE portent un compteur simplifié
+    split_rows = [sku.split('-') for sku in skus]
+    simplified = [parts for parts in split_rows if len(parts) == 3]
+
+    group_keys = [f"{parts[0]}-{parts[1]}" for parts in simplified]
+    sequences = decode_sequences([parts[2] for parts in simplified], width)
+
+    invalid_count = int((sequences < 0).sum())
+    valid = sequences > 0
+    group_codes, group_names = pd.factorize(pd.Series(group_keys, dtype=object))
+    group_codes = group_codes[valid]
+    sequences = sequences[valid]
+
+    # Tri par (famille, séquence): doublons adjacents et plages par groupe
+    order = np.lexsort((sequences, group_codes))
+    group_codes = group_codes[order]
+    sequences = sequences[order]
+
+    rows = []
+    seen_groups = set()
+    if group_codes.size:
+        starts = np.flatnonzero(np.diff(group_codes, prepend=-1) != 0)
+        ends = np.append(starts[1:], group_codes.size)
+        duplicate_flags = np.zeros(sequences.size, dtype=bool)
+        duplicate_flags[1:] = (np.diff(sequences) == 0) & (np.diff(group_codes) == 0)
+
+        for start, end in zip(starts, ends):
+            famille, sous_famille = group_names[group_codes[start]].split('-', 1)
+            seen_groups.add((famille, sous_famille))
+            group_sequences = sequences[start:end]
+            duplicates = int(duplicate_flags[start:end].sum())
+            distinct = group_sequences.size - duplicates
+            max_sequence = int(group_sequences[-1])
+            counter = counters.get((famille, sous_famille), 0)
+            gap_count = max_sequence - distinct
+
+            rows.append({
+                'famille': famille,
+                'sous_famille': sous_famille,
+                'skus': int(group_sequences.size),
+                'sequences_distinctes': distinct,
+                'doublons': duplicates,
+                'sequence_max': max_sequence,
+                'lacunes': gap_count,
+                'premieres_lacunes': _gap_preview(np.unique(group_sequences)) if gap_count else "",
+                'compteur': counter,
+                'derive': counter - max_sequence,
+                'taux_capacite': max_sequence / capacity(width)
+            })
+
+    # Compteurs sans aucun SKU stocké (consommés uniquement par des aperçus/échecs)
+    for (famille, sous_famille), counter in counters.items():
+        if (famille, sous_famille) not in seen_groups:
+            rows.append({
+                'famille': famille, 'sous_famille': sous_famille, 'skus': 0,
+                'sequences_distinctes': 0, 'doublons': 0, 'sequence_max': 0,
+                'lacunes': 0, 'premieres_lacunes': "", 'compteur': counter,
+                'derive': counter, 'taux_capacite': 0.0
+            })
+
+    report = pd.DataFrame(rows, columns=REPORT_COLUMNS)
+    if not report.empty:
+        report = report.sort_values('taux_capacite', ascending=False, ignore_index=True)
+
+    return {
+        'rapport': report,
+        'skus_analyses': len(skus),
+        'sequences_invalides': invalid_count
+    }
+
+
+def repair_counters(db_path: str = "sku_database.db", width: int = DEFAULT_WIDTH,
+                    rewind: bool = False) -> int:
+    """
+    Remonte chaque compteur en retard sur la plus grande séquence réellement stockée.
+    Un compteur en retard (dérive négative) provoquerait des collisions de SKU;
+    un compteur en avance ne fait que perdre des séquences et reste tel quel,
+    ces séquences ayant pu être montrées en aperçu. Avec rewind=True, les
+    compteurs en avance sont aussi ramenés au maximum stocké et les compteurs
+    sans SKU supprimés. Les lacunes existantes ne sont pas renumérotées (les SKU
+    déjà publiés ne changent jamais).
+
+    Analyse et écriture se font dans une même transaction BEGIN IMMEDIATE: aucun
+    générateur ne peut allouer entre les deux. Chaque modification est écrite
+    dans le journal des allocations (s'il est actif) avant le commit.
+    Retourne le nombre de compteurs modifiés.
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sku_counters_simplified (
+                famille TEXT,
+                sous_famille TEXT,
+                counter INTEGER DEFAULT 0,
+                PRIMARY KEY (famille, sous_famille)
+            )
+        ''')
+        report = _analyze(cursor, width)['rapport']
+
+        lagging = report[(report['derive'] < 0) & (report['skus'] > 0)]
+        cursor.executemany('''
+            INSERT INTO sku_counters_simplified (famille, sous_famille, counter) VALUES (?, ?, ?)
+            ON CONFLICT (famille, sous_famille) DO UPDATE SET counter = MAX(counter, excluded.counter)
+        ''', [(famille, sous_famille, int(max_sequence)) for famille, sous_famille, max_sequence
+              in zip(lagging['famille'], lagging['sous_famille'], lagging['sequence_max'])])
+        changed = len(lagging)
+
+        orphans = ahead = report.iloc[0:0]
+        if rewind:
+            orphans = report[(report['derive'] > 0) & (report['skus'] == 0)]
+            cursor.executemany(
+                "DELETE FROM sku_counters_simplified WHERE famille = ? AND sous_famille = ?",
+                list(zip(orphans['famille'], orphans['sous_famille']))
+            )
+            ahead = report[(report['derive'] > 0) & (report['skus'] > 0)]
+            cursor.executemany(
+                "UPDATE sku_counters_simplified SET counter = ? WHERE famille = ? AND sous_famille = ?",
+                [(int(max_sequence), famille, sous_famille) for famille, sous_famille, max_sequence
+                 in zip(ahead['famille'], ahead['sous_famille'], ahead['sequence_max'])]
+            )
+            changed += len(orphans) + len(ahead)
+
+        for famille, sous_famille, max_sequence in zip(lagging['famille'], lagging['sous_famille'],
+                                                       lagging['sequence_max']):
+            sku_journal.record_allocation(db_path, famille, sous_famille, int(max_sequence))
+        for famille, sous_famille, max_sequence in zip(ahead['famille'], ahead['sous_famille'],
+                                                       ahead['sequence_max']):
+            sku_journal.record_counter(db_path, famille, sous_famille, int(max_sequence))
+        for famille, sous_famille in zip(orphans['famille'], orphans['sous_famille']):
+            sku_journal.record_counter(db_path, famille, sous_famille, None)
+
+        cursor.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            cursor.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+    if changed:
+        logger.info(f"{len(lagging)} compteur(s) en retard remonté(s)"
+                    + (f", {len(ahead)} ramené(s), {len(orphans)} orphelin(s) supprimé(s)" if rewind else ""))
+    return changed
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Intégrité des compteurs SKU")
+    parser.add_argument("db_path", nargs="?", default="sku_database.db", help="Base de données SKU")
+    parser.add_argument("--repair", action="store_true", help="Remonter les compteurs en retard sur les SKU stockés")
+    parser.add_argument("--rewind", action="store_true",
+                        help="Avec --repair: ramener aussi les compteurs en avance et supprimer les orphelins")
+    parser.add_argument("--top", type=int, default=20, help="Nombre de familles affichées")
+    args = parser.parse_args()
+
+    setup_logging()
+
+    result = analyze_counters(args.db_path)
+    report = result['rapport']
+
+    print("🔎 INTÉGRITÉ DES COMPTEURS SKU")
+    print("=" * 60)
+    print(f"SKU analysés: {result['skus_analyses']}")
+    print(f"Séquences invalides: {result['sequences_invalides']}")
+    print(f"Familles avec dérive: {int((report['derive'] != 0).sum()) if not report.empty else 0}")
+    print(f"Familles avec lacunes: {int((report['lacunes'] > 0).sum()) if not report.empty else 0}")
+    print(f"Doublons: {int(report['doublons'].sum()) if not report.empty else 0}")
+
+    if not report.empty:
+        print(f"\n📊 Familles les plus proches de la limite de {DEFAULT_WIDTH} caractères:")
+        display = report.head(args.top).copy()
+        display['taux_capacite'] = (display['taux_capacite'] * 100).map("{:.3f}%".format)
+        print(display.to_string(index=False))
+
+    if args.repair:
+        sku_journal.enable_journal(args.db_path)
+        changed = repair_counters(args.db_path, rewind=args.rewind)
+        print(f"\n🛠️ Réparation: {changed} compteur(s) réaligné(s)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,788 @@
+#!/usr/bin/env python3
+"""
+Journal des allocations SKU (JSON lines, ajout seul)
+
+Chaque incrément de compteur et chaque insertion de composant est écrit dans
+<dossier de la base>/journal/<base>.jsonl avant le commit SQLite:
+
+    {"op":"epoch","ts":"2025-01-01 12:00:00","epoch":"3f2a...","base":"sku_database"}
+    {"op":"alloc","ts":"2025-01-01 12:00:00","famille":"ELEC","sous_famille":"RESIST","counter":12}
+    {"op":"insert","ts":"2025-01-01 12:00:00","component":{"sku":"ELEC-RESIST-BBBN",...}}
+
+La première ligne porte l'époque de la base (table database_identity, nouvelle
+à chaque recréation). Un journal neuf commence par un instantané de la base
+(composants et compteurs), il se suffit donc à lui-même. À l'ouverture, un
+journal d'une autre époque (base réinitialisée ou restaurée d'une autre lignée)
+est archivé et un nouveau commence: deux catalogues ne se mélangent jamais.
+
+Sont journalisés: allocations simplifiées ('alloc') et anciennes ('alloc_legacy'),
+insertions ('insert') et réécritures de compteurs par sku_integrity.repair_counters
+('counter', compteur imposé ou supprimé).
+
+L'écriture est immédiate (une ligne, un write en mode ajout); fsync est groupé
+toutes les JOURNAL_CONFIG['fsync_every'] lignes ou fsync_interval secondes.
+Une allocation journalisée mais non validée (arrêt avant le commit) ne fait
+que consommer une séquence: un SKU n'est jamais réattribué.
+
+Le rejeu est idempotent (compteur = maximum sauf réécriture explicite,
+composant ignoré s'il existe déjà), ce qui sert à la fois:
+- à la reprise: sauvegarde restaurée (db_backup.py) puis journal rejoué;
+- à la réplication: ReplicaTailer suit le journal et tient à jour une base en
+  lecture seule, consultable sur un autre poste (partage réseau); un changement
+  d'époque ou de fichier la reconstruit entièrement.
+
+Après chaque sauvegarde automatique, ou au-delà de JOURNAL_CONFIG['max_bytes'],
+le journal est archivé et recommencé (en-tête et instantané). La lecture se
+fait ligne à ligne, sans charger le fichier en mémoire.
+
+    python sku_journal.py replay                  # rejouer dans sku_database.db
+    python sku_journal.py check                   # allocations sans composant
+    python sku_journal.py tail replica.db         # suivre le journal
+"""
+
+import argparse
+import atexit
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import instrumentation
+from config import JOURNAL_CONFIG, SKU_FORMAT
+from sku_sequence import decode_sequence
+
+logger = logging.getLogger(__name__)
+
+COMPONENT_FIELDS = ('sku', 'name', 'description', 'domain', 'component_type', 'route', 'routing',
+                    'manufacturer', 'manufacturer_part', 'component_hash')
+
+OPERATIONS = ('epoch', 'alloc', 'alloc_legacy', 'counter', 'insert')
+
+# Composants insérés par requête au rejeu (lecture du journal en flux)
+APPLY_BATCH = 1000
+
+_OPEN_FLAGS = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+
+
+def _is_memory_db(db_path: str) -> bool:
+    return db_path == ':memory:' or db_path.startswith('file::memory:') or 'mode=memory' in db_path
+
+
+def _timestamp() -> str:
+    # Même forme que CURRENT_TIMESTAMP (UTC), réutilisée comme created_date au rejeu
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def journal_path(db_path: str, journal_dir: Optional[str] = None) -> str:
+    """Fichier journal d'une base (dossier relatif au dossier de la base s'il n'est pas absolu)"""
+    journal_dir = journal_dir or JOURNAL_CONFIG.get("dir", "journal")
+    if not os.path.isabs(journal_dir):
+        journal_dir = os.path.join(os.path.dirname(os.path.abspath(db_path)), journal_dir)
+    return os.path.join(journal_dir, f"{Path(db_path).stem}.jsonl")
+
+
+class SKUJournal:
+    """Écriture du journal (thread-safe, fsync groupé)"""
+
+    def __init__(self, path: str, fsync_every: Optional[int] = None, fsync_interval: Optional[float] = None):
+        self.path = path
+        self.fsync_every = max(1, fsync_every or JOURNAL_CONFIG.get("fsync_every", 64))
+        self.fsync_interval = (JOURNAL_CONFIG.get("fsync_interval", 1.0)
+                               if fsync_interval is None else fsync_interval)
+        self.records_written = 0
+        self.syncs = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._fd: Optional[int] = os.open(path, _OPEN_FLAGS, 0o644)
+        # Ligne tronquée par un arrêt brutal: la terminer pour ne pas corrompre la suivante
+        self.size = os.fstat(self._fd).st_size
+        self.created = self.size == 0
+        if self.size:
+            with open(path, 'rb') as f:
+                f.seek(self.size - 1)
+                if f.read(1) != b'\n':
+                    self.size += os.write(self._fd, b'\n')
+
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._stop = threading.Event()
+        self._flusher = None
+        if self.fsync_interval:
+            self._flusher = threading.Thread(target=self._flush_periodically, name="journal-fsync", daemon=True)
+            self._flusher.start()
+
+    def append(self, record: Dict):
+        data = (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+        with self._lock:
+            if self._fd is None:
+                raise ValueError(f"Journal fermé: {self.path}")
+            self.size += os.write(self._fd, data)
+            self.records_written += 1
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every:
+                self._sync_locked()
+
+    def header(self, epoch: str, base: str):
+        # id: propre à chaque fichier, une réplique repère ainsi une rotation
+        self.append({'op': 'epoch', 'ts': _timestamp(), 'epoch': epoch, 'base': base, 'id': uuid.uuid4().hex})
+
+    def allocation(self, famille: str, sous_famille: str, counter: int):
+        self.append({'op': 'alloc', 'ts': _timestamp(), 'famille': famille,
+                     'sous_famille': sous_famille, 'counter': counter})
+
+    def legacy_allocation(self, domain: str, route: str, routing: str, type_code: str, counter: int):
+        self.append({'op': 'alloc_legacy', 'ts': _timestamp(), 'domain': domain, 'route': route,
+                     'routing': routing, 'type_code': type_code, 'counter': counter})
+
+    def counter(self, famille: str, sous_famille: str, counter: Optional[int]):
+        """Compteur imposé (None: supprimé), y compris à la baisse"""
+        self.append({'op': 'counter', 'ts': _timestamp(), 'famille': famille,
+                     'sous_famille': sous_famille, 'counter': counter})
+
+    def insertion(self, component: Dict):
+        self.append({'op': 'insert', 'ts': _timestamp(),
+                     'component': {field: component.get(field) for field in COMPONENT_FIELDS}})
+
+    def archive(self) -> str:
+        """
+        Archiver le fichier et continuer dans un fichier neuf (à recommencer par
+        l'appelant). Retourne le chemin de l'archive.
+        """
+        with self._lock:
+            if self._fd is None:
+                raise ValueError(f"Journal fermé: {self.path}")
+            if self._unsynced:
+                self._sync_locked()
+            # Fermé avant le renommage (impossible sous Windows sur un fichier ouvert)
+            os.close(self._fd)
+            try:
+                archived = archive_journal_file(self.path)
+            finally:
+                # Renommage refusé (fichier ouvert par une réplique sous Windows): on continue dans l'ancien
+                self._fd = os.open(self.path, _OPEN_FLAGS, 0o644)
+            self.size = 0
+            self.created = True
+        return archived
+
+    def _sync_locked(self):
+        with instrumentation.span('journal.fsync'):
+            os.fsync(self._fd)
+        self._unsynced = 0
+        self.syncs += 1
+
+    def sync(self):
+        """Forcer l'écriture sur disque des lignes en attente"""
+        with self._lock:
+            if self._fd is not None and self._unsynced:
+                self._sync_locked()
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.fsync_interval):
+            self.sync()
+
+    def close(self):
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._lock:
+            if self._fd is None:
+                return
+            if self._unsynced:
+                self._sync_locked()
+            os.close(self._fd)
+            self._fd = None
+
+
+def read_epoch(conn: sqlite3.Connection) -> Optional[str]:
+    """Époque d'une base (None avant le schéma v2)"""
+    try:
+        row = conn.execute("SELECT epoch FROM database_identity LIMIT 1").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+
+def read_header(path: str) -> Optional[Dict]:
+    """En-tête d'un journal: None si absent ou vide, {} s'il n'a pas d'en-tête d'époque"""
+    try:
+        with open(path, 'rb') as f:
+            return _parse_header(f.readline())
+    except FileNotFoundError:
+        return None
+
+
+def _parse_header(first_line: bytes) -> Optional[Dict]:
+    if not first_line.endswith(b'\n'):
+        return None
+    try:
+        record = json.loads(first_line)
+    except ValueError:
+        return {}
+    return record if isinstance(record, dict) and record.get('op') == 'epoch' else {}
+
+
+def archive_journal_file(path: str) -> Optional[str]:
+    """Renommer un journal en <base>.<date>.jsonl à côté de lui. Retourne le nouveau chemin."""
+    if not os.path.exists(path):
+        return None
+    root, extension = os.path.splitext(path)
+    archived = f"{root}.{datetime.now():%Y%m%d-%H%M%S-%f}{extension}"
+    os.replace(path, archived)
+    return archived
+
+
+def _snapshot_records(conn: sqlite3.Connection) -> Iterator[Dict]:
+    """Contenu actuel de la base sous forme d'enregistrements (début d'un journal neuf)"""
+    for row in conn.execute(f"SELECT {', '.join(COMPONENT_FIELDS)}, created_date FROM components ORDER BY id"):
+        yield {'op': 'insert', 'ts': row[-1], 'component': dict(zip(COMPONENT_FIELDS, row[:-1]))}
+    for famille, sous_famille, counter in conn.execute(
+            "SELECT famille, sous_famille, counter FROM sku_counters_simplified"):
+        yield {'op': 'alloc', 'ts': _timestamp(), 'famille': famille,
+               'sous_famille': sous_famille, 'counter': counter}
+    for domain, route, routing, type_code, counter in conn.execute(
+            "SELECT domain, route, routing, type_code, counter FROM sku_counters"):
+        yield {'op': 'alloc_legacy', 'ts': _timestamp(), 'domain': domain, 'route': route,
+               'routing': routing, 'type_code': type_code, 'counter': counter}
+
+
+def _open_journal(db_path: str, path: str, **options) -> SKUJournal:
+    """
+    Ouvrir le journal d'une base: archivé s'il décrit une autre époque, commencé
+    par l'en-tête et un instantané s'il est neuf. La base reste verrouillée en
+    écriture pendant l'ouverture: aucune allocation ne passe entre l'instantané
+    et le journal.
+    """
+    _prepare_database(db_path)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        epoch = read_epoch(conn)
+        header = read_header(path)
+        if os.path.exists(path) and os.path.getsize(path) and (header or {}).get('epoch') != epoch:
+            archived = archive_journal_file(path)
+            logger.warning(f"Journal d'une autre époque de {db_path} archivé: {archived}")
+
+        journal = SKUJournal(path, **options)
+        if journal.created:
+            _start_journal(journal, conn, db_path)
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    return journal
+
+
+def _start_journal(journal: SKUJournal, conn: sqlite3.Connection, db_path: str):
+    """En-tête d'époque puis instantané de la base (base verrouillée en écriture par l'appelant)"""
+    journal.header(read_epoch(conn), Path(db_path).stem)
+    for record in _snapshot_records(conn):
+        journal.append(record)
+    journal.sync()
+
+
+def rotate_journal(db_path: str) -> Optional[str]:
+    """
+    Archiver le journal actif d'une base et en recommencer un (en-tête et
+    instantané): appelé après chaque sauvegarde (db_backup) et quand le fichier
+    dépasse JOURNAL_CONFIG['max_bytes']. Le nouveau journal suffit à lui seul
+    à reprendre depuis la dernière sauvegarde; seules les JOURNAL_CONFIG['archive_keep']
+    archives les plus récentes sont conservées. Retourne le chemin de l'archive.
+    """
+    journal = get_journal(db_path)
+    if journal is None:
+        return None
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        # Les allocations sont journalisées avant leur commit: aucune n'est en cours ici
+        conn.execute("BEGIN IMMEDIATE")
+        archived = journal.archive()
+        _start_journal(journal, conn, db_path)
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    removed = prune_archives(journal.path)
+    logger.info(f"Journal {journal.path} archivé ({archived}), "
+                f"{len(removed)} ancienne(s) archive(s) supprimée(s)")
+    return archived
+
+
+def prune_archives(path: str, keep: Optional[int] = None) -> List[str]:
+    """Supprimer les archives d'un journal au-delà des `keep` plus récentes. Retourne les fichiers supprimés."""
+    keep = JOURNAL_CONFIG.get("archive_keep", 10) if keep is None else keep
+    root, extension = os.path.splitext(os.path.basename(path))
+    pattern = re.compile(rf'^{re.escape(root)}\.\d{{8}}-\d{{6}}-\d{{6}}{re.escape(extension)}$')
+    directory = os.path.dirname(os.path.abspath(path))
+    # Horodatage dans le nom: l'ordre alphabétique est l'ordre chronologique
+    archives = sorted((name for name in os.listdir(directory) if pattern.match(name)), reverse=True)
+    removed = []
+    for name in archives[max(keep, 0):]:
+        try:
+            os.remove(os.path.join(directory, name))
+            removed.append(os.path.join(directory, name))
+        except OSError as e:
+            logger.warning(f"Archive de journal non supprimée {name}: {e}")
+    return removed
+
+
+# Rotations en cours (taille dépassée): chemin absolu de la base
+_rotations = set()
+
+
+def _rotate_in_background(db_path: str):
+    # Appelé pendant la transaction d'un écrivain: la rotation attend son commit dans un autre thread
+    key = os.path.abspath(db_path)
+    with _journals_lock:
+        if key in _rotations:
+            return
+        _rotations.add(key)
+
+    def rotate():
+        try:
+            rotate_journal(db_path)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            logger.warning(f"Rotation du journal de {db_path} reportée: {e}")
+        finally:
+            with _journals_lock:
+                _rotations.discard(key)
+
+    threading.Thread(target=rotate, name="journal-rotation", daemon=True).start()
+
+
+# Journaux actifs: chemin absolu de la base -> journal
+_journals: Dict[str, SKUJournal] = {}
+_journals_lock = threading.Lock()
+
+
+def enable_journal(db_path: str, journal_dir: Optional[str] = None, **options) -> Optional[SKUJournal]:
+    """Journaliser les allocations d'une base (sans effet si JOURNAL_CONFIG['enabled'] est faux)"""
+    if not JOURNAL_CONFIG.get("enabled", False) or _is_memory_db(db_path):
+        return None
+    key = os.path.abspath(db_path)
+    with _journals_lock:
+        journal = _journals.get(key)
+        if journal is None:
+            journal = _journals[key] = _open_journal(db_path, journal_path(db_path, journal_dir), **options)
+        return journal
+
+
+def get_journal(db_path: str) -> Optional[SKUJournal]:
+    return _journals.get(os.path.abspath(db_path))
+
+
+def _record(db_path: str, method: str, *args):
+    # Rien à faire si aucun journal n'est actif (cas de la plupart des scripts et des tests)
+    if not _journals:
+        return
+    journal = _journals.get(os.path.abspath(db_path))
+    if journal is not None:
+        getattr(journal, method)(*args)
+        max_bytes = JOURNAL_CONFIG.get("max_bytes", 0)
+        if max_bytes and journal.size > max_bytes:
+            _rotate_in_background(db_path)
+
+
+def record_allocation(db_path: str, famille: str, sous_famille: str, counter: int):
+    """Appelé par SKUGenerator avant le commit d'un compteur"""
+    _record(db_path, 'allocation', famille, sous_famille, counter)
+
+
+def record_legacy_allocation(db_path: str, domain: str, route: str, routing: str, type_code: str, counter: int):
+    """Appelé par SKUGenerator.get_next_sequence (ancien format) avant le commit"""
+    _record(db_path, 'legacy_allocation', domain, route, routing, type_code, counter)
+
+
+def record_counter(db_path: str, famille: str, sous_famille: str, counter: Optional[int]):
+    """Appelé par sku_integrity.repair_counters pour un compteur ramené (ou supprimé: None)"""
+    _record(db_path, 'counter', famille, sous_famille, counter)
+
+
+def record_insertion(db_path: str, component: Dict):
+    """Appelé par SKUGenerator avant le commit d'une insertion"""
+    _record(db_path, 'insertion', component)
+
+
+def disable_journal(db_path: str):
+    with _journals_lock:
+        journal = _journals.pop(os.path.abspath(db_path), None)
+    if journal is not None:
+        journal.close()
+
+
+def archive_journal(db_path: str, journal_dir: Optional[str] = None) -> Optional[str]:
+    """Fermer et archiver le journal d'une base sur le point d'être recréée (reset_database.py)"""
+    disable_journal(db_path)
+    return archive_journal_file(journal_path(db_path, journal_dir))
+
+
+def shutdown():
+    """Écrire les lignes en attente et fermer les journaux (appelé à la sortie)"""
+    with _journals_lock:
+        journals = list(_journals.values())
+        _journals.clear()
+    for journal in journals:
+        journal.close()
+
+
+atexit.register(shutdown)
+
+
+# ---------- Lecture et rejeu ----------
+
+def iter_records(path: str, position: int = 0, source=None) -> Iterator[Tuple[Optional[Dict], int]]:
+    """
+    Lire le journal ligne à ligne à partir de `position` (octets), sans le
+    charger en mémoire: (enregistrement, position après la ligne), None pour
+    une ligne illisible. Une dernière ligne sans fin de ligne (écriture en
+    cours) est laissée pour plus tard. `source`: fichier déjà ouvert sur `path`.
+    """
+    if source is None:
+        with open(path, 'rb') as f:
+            yield from iter_records(path, position, f)
+        return
+    source.seek(position)
+    for line in source:
+        if not line.endswith(b'\n'):
+            return
+        position += len(line)
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        if not isinstance(record, dict) or record.get('op') not in OPERATIONS:
+            record = None
+        yield record, position
+
+
+class _RecordStream:
+    """Enregistrements valides d'un journal, en flux; position et lignes invalides relevées au passage"""
+
+    def __init__(self, path: str, position: int = 0, source=None):
+        self.path = path
+        self.source = source
+        self.position = position
+        self.invalid = 0
+        self.count = 0
+
+    def __iter__(self) -> Iterator[Dict]:
+        for record, self.position in iter_records(self.path, self.position, self.source):
+            if record is None:
+                self.invalid += 1
+                continue
+            self.count += 1
+            yield record
+        if self.invalid:
+            logger.warning(f"Journal {self.path}: {self.invalid} ligne(s) illisible(s) ignorée(s)")
+
+
+def read_records(path: str, position: int = 0) -> Tuple[List[Dict], int, int]:
+    """
+    Lignes complètes à partir de `position` (octets), en liste.
+    Retourne (enregistrements, nouvelle position, lignes invalides).
+    """
+    stream = _RecordStream(path, position)
+    records = list(stream)
+    return records, stream.position, stream.invalid
+
+
+def apply_records(conn: sqlite3.Connection, records: Iterable[Dict]) -> Dict[str, int]:
+    """
+    Appliquer des enregistrements dans l'ordre du journal (idempotent, en flux:
+    composants insérés par lots de APPLY_BATCH); la transaction est laissée à
+    l'appelant. Les allocations ne font que monter un compteur; une réécriture
+    ('counter') l'impose, y compris à la baisse.
+    """
+    cursor = conn.cursor()
+    stats = {'allocations': 0, 'composants_ajoutes': 0, 'composants_existants': 0}
+
+    def insert(rows: List[Tuple]):
+        cursor.executemany(f'''
+            INSERT OR IGNORE INTO components ({', '.join(COMPONENT_FIELDS)}, created_date, updated_date)
+            VALUES ({', '.join('?' * (len(COMPONENT_FIELDS) + 2))})
+        ''', rows)
+        # rowcount ignore les lignes écrites par les triggers (component_stats)
+        inserted = max(cursor.rowcount, 0)
+        stats['composants_ajoutes'] += inserted
+        stats['composants_existants'] += len(rows) - inserted
+
+    # (famille, sous_famille) -> ('max', valeur) ou ('set', valeur | None)
+    counters: Dict[Tuple[str, str], Tuple[str, Optional[int]]] = {}
+    legacy: Dict[Tuple[str, str, str, str], int] = {}
+    rows = []
+    for record in records:
+        op = record['op']
+        if op == 'alloc':
+            key = (record['famille'], record['sous_famille'])
+            mode, value = counters.get(key, ('max', 0))
+            counters[key] = (mode, max(value or 0, int(record['counter'])))
+        elif op == 'counter':
+            counter = record['counter']
+            counters[(record['famille'], record['sous_famille'])] = ('set', None if counter is None else int(counter))
+        elif op == 'alloc_legacy':
+            key = (record['domain'], record['route'], record['routing'], record['type_code'])
+            legacy[key] = max(legacy.get(key, 0), int(record['counter']))
+        elif op == 'insert':
+            component = record['component']
+            rows.append(tuple(component.get(field) for field in COMPONENT_FIELDS)
+                        + (record.get('ts'), record.get('ts')))
+            if len(rows) >= APPLY_BATCH:
+                insert(rows)
+                rows = []
+            continue
+        else:
+            continue
+        stats['allocations'] += 1
+    if rows:
+        insert(rows)
+
+    cursor.executemany('''
+        INSERT INTO sku_counters_simplified (famille, sous_famille, counter) VALUES (?, ?, ?)
+        ON CONFLICT (famille, sous_famille) DO UPDATE SET counter = MAX(counter, excluded.counter)
+    ''', [(*key, value) for key, (mode, value) in counters.items() if mode == 'max'])
+    cursor.executemany(
+        "INSERT OR REPLACE INTO sku_counters_simplified (famille, sous_famille, counter) VALUES (?, ?, ?)",
+        [(*key, value) for key, (mode, value) in counters.items() if mode == 'set' and value is not None])
+    cursor.executemany(
+        "DELETE FROM sku_counters_simplified WHERE famille = ? AND sous_famille = ?",
+        [key for key, (mode, value) in counters.items() if mode == 'set' and value is None])
+    cursor.executemany('''
+        INSERT INTO sku_counters (domain, route, routing, type_code, counter) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (domain, route, routing, type_code) DO UPDATE SET counter = MAX(counter, excluded.counter)
+    ''', [(*key, value) for key, value in legacy.items()])
+    return stats
+
+
+def _prepare_database(db_path: str):
+    # Schéma créé/mis à jour comme pour toute base SKU
+    from sku_generator import SKUGenerator
+    SKUGenerator(db_path)
+
+
+def replay(path: str, db_path: str, force: bool = False) -> Dict[str, int]:
+    """
+    Rejouer tout le journal dans une base (après restauration d'une sauvegarde).
+    Le journal doit décrire la même époque que la base; une base vide adopte
+    celle du journal (reconstruction complète). force=True passe outre.
+    """
+    _prepare_database(db_path)
+    header = read_header(path) or {}
+    records = _RecordStream(path)
+    conn = sqlite3.connect(db_path)
+    try:
+        with instrumentation.span('journal.rejeu') as span:
+            with conn:
+                journal_epoch, db_epoch = header.get('epoch'), read_epoch(conn)
+                if journal_epoch and journal_epoch != db_epoch:
+                    empty = conn.execute("SELECT 1 FROM components LIMIT 1").fetchone() is None
+                    if not (empty or force):
+                        raise ValueError(f"Journal {path} d'une autre base (époque {journal_epoch}, "
+                                         f"base {db_epoch}): rejeu refusé")
+                    conn.execute("UPDATE database_identity SET epoch = ?", (journal_epoch,))
+                stats = apply_records(conn, records)
+            span.add_rows(records.count)
+    finally:
+        conn.close()
+    stats['lignes_invalides'] = records.invalid
+    logger.info(f"Journal {path} rejoué dans {db_path}: {stats}")
+    return stats
+
+
+def _sku_key(sku: str) -> Optional[Tuple[str, str, int]]:
+    separator = SKU_FORMAT.get("separator", "-")
+    parts = sku.rsplit(separator, 2)
+    if len(parts) != 3:
+        return None
+    try:
+        return parts[0], parts[1], decode_sequence(parts[2], SKU_FORMAT.get("sequence_length", 4))
+    except ValueError:
+        return None
+
+
+def unused_allocations(path: str) -> List[Dict]:
+    """Allocations sans composant inséré (aperçus, insertions échouées ou interrompues)"""
+    # Deux lectures en flux: seules les clés des SKU insérés restent en mémoire
+    inserted = {_sku_key(record['component']['sku']) for record in _RecordStream(path) if record['op'] == 'insert'}
+    return [record for record in _RecordStream(path)
+            if record['op'] == 'alloc'
+            and (record['famille'], record['sous_famille'], int(record['counter'])) not in inserted]
+
+
+# ---------- Réplique ----------
+
+class ReplicaTailer:
+    """
+    Tenir une base réplique à jour en suivant le journal (position, époque et
+    identifiant du fichier mémorisés dans la réplique). Un journal d'une autre
+    époque (base réinitialisée), recommencé (rotation) ou tronqué vide la
+    réplique et la reconstruit depuis le début.
+    """
+
+    def __init__(self, path: str, replica_path: str, poll_interval: float = 1.0):
+        self.path = path
+        self.replica_path = replica_path
+        self.poll_interval = poll_interval
+        self._key = os.path.basename(path)
+        self._stop = threading.Event()
+
+        _prepare_database(replica_path)
+        conn = sqlite3.connect(replica_path)
+        try:
+            with conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS journal_position (
+                        journal TEXT PRIMARY KEY,
+                        position INTEGER NOT NULL,
+                        epoch TEXT,
+                        file_id TEXT,
+                        updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(journal_position)")}
+                for column in ('epoch', 'file_id'):
+                    if column not in columns:
+                        conn.execute(f"ALTER TABLE journal_position ADD COLUMN {column} TEXT")
+        finally:
+            conn.close()
+
+    def _state(self) -> Tuple[int, Optional[str], Optional[str]]:
+        conn = sqlite3.connect(self.replica_path)
+        try:
+            row = conn.execute("SELECT position, epoch, file_id FROM journal_position WHERE journal = ?",
+                               (self._key,)).fetchone()
+        finally:
+            conn.close()
+        return tuple(row) if row else (0, None, None)
+
+    @property
+    def position(self) -> int:
+        return self._state()[0]
+
+    @property
+    def epoch(self) -> Optional[str]:
+        return self._state()[1]
+
+    def catch_up(self) -> Dict[str, int]:
+        """Appliquer les lignes ajoutées depuis le dernier passage"""
+        position, epoch, file_id = self._state()
+        nothing = {'allocations': 0, 'composants_ajoutes': 0, 'composants_existants': 0,
+                   'resynchronisation': 0, 'position': position}
+        try:
+            # En-tête et lignes lus sur le même fichier, même s'il est archivé entre-temps
+            source = open(self.path, 'rb')
+        except FileNotFoundError:
+            return nothing
+        with source:
+            header = _parse_header(source.readline())
+            if header is None:
+                # Pas encore d'en-tête complet
+                return nothing
+            journal_epoch, journal_id = header.get('epoch'), header.get('id')
+            resync = position > 0 and (journal_epoch != epoch or journal_id != file_id
+                                       or os.fstat(source.fileno()).st_size < position)
+            if resync:
+                logger.warning(f"Journal {self.path} remplacé (époque {epoch} -> {journal_epoch}, "
+                               f"fichier {file_id} -> {journal_id}): réplique {self.replica_path} reconstruite")
+                position = 0
+
+            records = _RecordStream(self.path, position, source)
+            conn = sqlite3.connect(self.replica_path)
+            try:
+                # Remise à zéro, enregistrements et position validés ensemble
+                with conn:
+                    if resync:
+                        for table in ('components', 'sku_counters_simplified', 'sku_counters'):
+                            conn.execute(f"DELETE FROM {table}")
+                    if journal_epoch:
+                        conn.execute("UPDATE database_identity SET epoch = ?", (journal_epoch,))
+                    stats = apply_records(conn, records)
+                    conn.execute('''
+                        INSERT INTO journal_position (journal, position, epoch, file_id, updated)
+                        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                        ON CONFLICT (journal) DO UPDATE SET position = excluded.position,
+                            epoch = excluded.epoch, file_id = excluded.file_id, updated = excluded.updated
+                    ''', (self._key, records.position, journal_epoch, journal_id))
+            finally:
+                conn.close()
+        stats['resynchronisation'] = int(resync)
+        stats['position'] = records.position
+        if records.count:
+            logger.debug(f"Réplique {self.replica_path}: {stats}")
+        return stats
+
+    def run(self):
+        """Suivre le journal jusqu'à stop()"""
+        while not self._stop.is_set():
+            try:
+                self.catch_up()
+            except (OSError, sqlite3.Error) as e:
+                logger.error(f"Réplication interrompue, nouvel essai: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    """Point d'entrée: rejeu, contrôle et réplication"""
+    parser = argparse.ArgumentParser(description="Journal des allocations SKU")
+    parser.add_argument("--db", dest="db_path", default="sku_database.db", help="Base de données SKU")
+    parser.add_argument("--journal", help="Fichier journal (défaut: journal/<base>.jsonl à côté de la base)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    replay_parser = subparsers.add_parser('replay', help="Rejouer le journal dans la base")
+    replay_parser.add_argument('--force', action='store_true',
+                               help="Rejouer même si le journal appartient à une autre époque de la base")
+    subparsers.add_parser('check', help="Lister les allocations sans composant")
+    tail = subparsers.add_parser('tail', help="Tenir une réplique à jour")
+    tail.add_argument('replica', help="Base réplique")
+    tail.add_argument('--poll', type=float, default=1.0, help="Intervalle de lecture (s)")
+    tail.add_argument('--once', action='store_true', help="Rattraper puis quitter")
+    args = parser.parse_args()
+
+    from logging_setup import setup_logging
+    setup_logging()
+
+    path = args.journal or journal_path(args.db_path)
+    if not os.path.exists(path):
+        print(f"❌ Journal introuvable: {path}")
+        return 1
+
+    if args.command == 'replay':
+        try:
+            stats = replay(path, args.db_path, force=args.force)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+        print(f"✅ Journal rejoué: {stats['allocations']} allocation(s), "
+              f"{stats['composants_ajoutes']} composant(s) ajouté(s), "
+              f"{stats['composants_existants']} déjà présent(s)")
+        return 0
+
+    if args.command == 'check':
+        unused = unused_allocations(path)
+        for record in unused:
+            print(f"{record['ts']}  {record['famille']}-{record['sous_famille']}  séquence {record['counter']}")
+        print(f"{len(unused)} allocation(s) sans composant")
+        return 0
+
+    tailer = ReplicaTailer(path, args.replica, args.poll)
+    if args.once:
+        stats = tailer.catch_up()
+        print(f"✅ Réplique à jour (position {stats['position']})")
+        return 0
+    print(f"🔁 Réplication de {path} vers {args.replica} (Ctrl+C pour arrêter)")
+    try:
+        tailer.run()
+    except KeyboardInterrupt:
+        tailer.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Index de recherche SKU en mémoire pour la recherche incrémentale (search-as-you-type)
+"""
+
+import sqlite3
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class SKUSearchIndex:
+    """Tableau trié des SKU servant les recherches par préfixe via bisect"""
+
+    def __init__(self, db_path: str, cache_size: int = 256):
+        self.db_path = db_path
+        self.cache_size = cache_size
+
+        # Tableaux parallèles triés par SKU
+        self._skus: List[str] = []
+        self._names: List[str] = []
+
+        # Cache LRU des résultats: (mode, motif, limite) -> résultats
+        self._cache: "OrderedDict[Tuple[str, str, int], List[Dict]]" = OrderedDict()
+
+        self._loaded = False
+        self._stale = True
+        self._max_id: Optional[int] = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._skus)
+
+    def invalidate(self):
+        """Marquer l'index comme périmé (rechargé à la prochaine recherche)"""
+        self._stale = True
+
+    def refresh(self):
+        """Recharger les SKU depuis la base de données"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.cursor()
+            # L'index UNIQUE sur sku fournit directement l'ordre trié
+            cursor.execute("SELECT sku, name FROM components ORDER BY sku")
+            rows = cursor.fetchall()
+            cursor.execute("SELECT MAX(id) FROM components")
+            max_id = cursor.fetchone()[0]
+        finally:
+            conn.close()
+
+        skus = [row[0] for row in rows]
+        names = [row[1] for row in rows]
+
+        with self._lock:
+            self._skus = skus
+            self._names = names
+            self._max_id = max_id
+            self._cache.clear()
+            self._loaded = True
+            self._stale = False
+
+    def ensure_loaded(self):
+        """Charger l'index si nécessaire (premier appel ou index périmé)"""
+        with self._refresh_lock:
+            if not self._loaded or self._stale or self._has_new_rows():
+                self.refresh()
+
+    def _has_new_rows(self) -> bool:
+        """Détecter les insertions faites par un autre composant (MAX(id) est O(log n))"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                max_id = conn.execute("SELECT MAX(id) FROM components").fetchone()[0]
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return False
+        return max_id != self._max_id
+
+    def _cached(self, key: Tuple[str, str, int]) -> Optional[List[Dict]]:
+        with self._lock:
+            results = self._cache.get(key)
+            if results is not None:
+                self._cache.move_to_end(key)
+            return results
+
+    def _store(self, key: Tuple[str, str, int], results: List[Dict]):
+        with self._lock:
+            self._cache[key] = results
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def search_prefix(self, prefix: str, limit: int = 15) -> List[Dict]:
+        """Rechercher les SKU commençant par le préfixe donné"""
+        prefix = prefix.strip().upper()
+        key = ("prefix", prefix, limit)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            skus, names = self._skus, self._names
+        start = bisect_left(skus, prefix)
+        results = []
+        for i in range(start, min(start + limit, len(skus))):
+            if not skus[i].startswith(prefix):
+                break
+            results.append({'sku': skus[i], 'nom': names[i]})
+
+        self._store(key, results)
+        return results
+
+    def search_substring(self, pattern: str, limit: int = 15,
+                         is_cancelled: Optional[Callable[[], bool]] = None,
+                         chunk_size: int = 20000) -> Optional[List[Dict]]:
+        """
+        Rechercher les SKU contenant le motif (balayage par blocs annulable).
+        Retourne None si la recherche a été annulée en cours de route.
+        """
+        pattern = pattern.strip().upper()
+        key = ("substring", pattern, limit)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            skus, names = self._skus, self._names
+        results = []
+        for start in range(0, len(skus), chunk_size):
+            if is_cancelled is not None and is_cancelled():
+                return None
+            for i in range(start, min(start + chunk_size, len(skus))):
+                if pattern in skus[i]:
+                    results.append({'sku': skus[i], 'nom': names[i]})
+                    if len(results) >= limit:
+                        break
+            if len(results) >= limit:
+                break
+
+        self._store(key, results)
+        return results
+
+    def search(self, text: str, limit: int = 15,
+               is_cancelled: Optional[Callable[[], bool]] = None) -> Optional[List[Dict]]:
+        """Recherche incrémentale: préfixe d'abord, puis sous-chaîne si aucun résultat"""
+        self.ensure_loaded()
+
+        results = self.search_prefix(text, limit)
+        if results or len(text.strip()) < 3:
+            return results
+
+        return self.search_substring(text, limit, is_cancelled=is_cancelled)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Encodage des séquences SKU en base 29 (alphabet industriel sans caractères ambigus)
+
+La séquence N (N >= 1) est écrite en base 29 sur `sequence_length` caractères
+(N=1 -> AAAA). Quand une sous-famille dépasse la capacité de cette largeur, le
+code grandit d'un caractère (jusqu'à `sequence_max_length`) au lieu de boucler:
+les codes de longueurs différentes ne peuvent pas entrer en collision.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+
+from config import SKU_FORMAT
+from lazy_imports import lazy_import
+
+np = lazy_import('numpy')
+
+# Alphabet SKU industriel (sans I, L, O, U, V, 0, 1)
+SKU_ALPHABET = "ABCDEFGHJKMNPQRSTWXYZ23456789"
+BASE = len(SKU_ALPHABET)
+
+DEFAULT_WIDTH = SKU_FORMAT.get("sequence_length", 4)
+DEFAULT_MAX_WIDTH = SKU_FORMAT.get("sequence_max_length", 6)
+
+# Au-delà, 29^n ne tient plus dans un entier 64 bits
+MAX_DECODABLE_WIDTH = 12
+
+# Code historique de la séquence 0 (jamais allouée: les compteurs commencent à 1)
+ZERO_CODE = "2222"
+
+
+@lru_cache(maxsize=None)
+def _tables() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (caractères de l'alphabet, table code point -> chiffre) pour les versions
+    vectorisées; construites au premier appel pour ne pas importer NumPy avec le module
+    """
+    alphabet_chars = np.array(list(SKU_ALPHABET))
+    # -1 pour les caractères hors alphabet
+    digit_lookup = np.full(128, -1, dtype=np.int64)
+    for digit, char in enumerate(SKU_ALPHABET):
+        digit_lookup[ord(char)] = digit
+    return alphabet_chars, digit_lookup
+
+
+def capacity(width: int = DEFAULT_WIDTH) -> int:
+    """Nombre de séquences représentables sur `width` caractères"""
+    return BASE ** width
+
+
+def required_width(sequence: int, width: int = DEFAULT_WIDTH) -> int:
+    """Largeur nécessaire pour encoder la séquence (au moins `width`)"""
+    value = max(sequence - 1, 0)
+    while value >= BASE ** width:
+        width += 1
+    return width
+
+
+def encode_sequence(sequence: int, width: int = DEFAULT_WIDTH,
+                    max_width: Optional[int] = DEFAULT_MAX_WIDTH) -> str:
+    """Encode une séquence en code alphabétique (inverse: decode_sequence)"""
+    if sequence == 0:
+        return ZERO_CODE
+    if sequence < 0:
+        raise ValueError(f"Séquence négative: {sequence}")
+
+    code_width = required_width(sequence, width)
+    if max_width is not None and code_width > max_width:
+        raise ValueError(
+            f"Séquence {sequence} hors capacité ({capacity(max_width)} séquences sur {max_width} caractères)"
+        )
+
+    value = sequence - 1
+    chars = []
+    for _ in range(code_width):
+        value, digit = divmod(value, BASE)
+        chars.append(SKU_ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+def decode_sequence(code: str, width: int = DEFAULT_WIDTH) -> int:
+    """
+    Retrouve le numéro de séquence d'un code (ValueError si le code est invalide).
+    Un code plus court que `width`, ou plus long mais commençant par le chiffre zéro
+    ('A'), n'est jamais produit par encode_sequence et est rejeté.
+    """
+    if not code:
+        raise ValueError("Code de séquence vide")
+    if len(code) < width or (len(code) > width and code[0] == SKU_ALPHABET[0]):
+        raise ValueError(f"Code de séquence non canonique: '{code}'")
+
+    value = 0
+    for char in code:
+        digit = SKU_ALPHABET.find(char)
+        if digit < 0:
+            raise ValueError(f"Caractère '{char}' hors de l'alphabet SKU dans '{code}'")
+        value = value * BASE + digit
+    return value + 1
+
+
+def encode_sequences(sequences: Iterable[int], width: int = DEFAULT_WIDTH,
+                     max_width: Optional[int] = DEFAULT_MAX_WIDTH) -> np.ndarray:
+    """Encode un tableau de séquences (vectorisé, un passage par largeur de code)"""
+    values = np.asarray(sequences, dtype=np.int64).ravel()
+    if values.size and values.min() < 0:
+        raise ValueError(f"Séquence négative: {int(values.min())}")
+
+    adjusted = values - 1
+    widths = np.full(values.shape, width, dtype=np.int64)
+    limit = BASE ** width
+    while values.size and (adjusted >= limit).any():
+        widths[adjusted >= limit] += 1
+        limit *= BASE
+
+    if max_width is not None and values.size and widths.max() > max_width:
+        worst = int(values[widths.argmax()])
+        raise ValueError(
+            f"Séquence {worst} hors capacité ({capacity(max_width)} séquences sur {max_width} caractères)"
+        )
+
+    alphabet_chars, _ = _tables()
+    codes = np.empty(values.shape, dtype=object)
+    for code_width in np.unique(widths):
+        mask = widths == code_width
+        remaining = adjusted[mask]
+        digits = np.empty((remaining.size, code_width), dtype=np.int64)
+        for position in range(code_width - 1, -1, -1):
+            remaining, digits[:, position] = np.divmod(remaining, BASE)
+        # Tableau (n, largeur) de caractères U1 vu comme n chaînes de largeur fixe
+        chars = np.ascontiguousarray(alphabet_chars[digits])
+        codes[mask] = chars.view(f'<U{code_width}').ravel()
+
+    codes[values == 0] = ZERO_CODE
+    return codes
+
+
+def decode_sequences(codes: Iterable[str], width: int = DEFAULT_WIDTH) -> np.ndarray:
+    """Décode un tableau de codes en séquences (-1 pour un code invalide ou non canonique)"""
+    code_list = [code if isinstance(code, str) else '' for code in codes]
+    lengths = np.fromiter((len(code) for code in code_list), dtype=np.int64, count=len(code_list))
+    sequences = np.full(len(code_list), -1, dtype=np.int64)
+    _, digit_lookup = _tables()
+
+    for length in np.unique(lengths):
+        if length < width or length > MAX_DECODABLE_WIDTH:
+            continue
+        indices = np.flatnonzero(lengths == length)
+        fixed = np.array([code_list[i] for i in indices], dtype=f'<U{length}')
+        points = fixed.view(np.uint32).reshape(-1, length).astype(np.int64)
+
+        in_table = points < digit_lookup.size
+        digits = np.where(in_table, digit_lookup[np.where(in_table, points, 0)], -1)
+        valid = (digits >= 0).all(axis=1)
+        if length > width:
+            valid &= digits[:, 0] > 0
+
+        powers = BASE ** np.arange(length - 1, -1, -1, dtype=np.int64)
+        sequences[indices[valid]] = digits[valid] @ powers + 1
+
+    return sequences
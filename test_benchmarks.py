@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test du banc d'essai: BOM synthétique et résultats JSON
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks import SCENARIOS, SyntheticBOMSpec, compare_results, generate_bom, run_benchmarks
+
+
+def test_synthetic_bom():
+    """Génération déterministe, répartition ELEC/MECA et taux de doublons"""
+    print("⏱️ Test du banc d'essai")
+    print("=" * 50)
+
+    spec = SyntheticBOMSpec(rows=200, electrical_ratio=0.25, duplicate_ratio=0.2, seed=7)
+    sheets = generate_bom(spec)
+    elec, meca = sheets['BOM Électrique'], sheets['BOM Mécanique']
+    assert (len(elec), len(meca)) == (50, 150)
+    assert elec.equals(generate_bom(spec)['BOM Électrique'])
+    assert not elec.equals(generate_bom(SyntheticBOMSpec(rows=200, electrical_ratio=0.25, seed=8))['BOM Électrique'])
+
+    # 20 % des lignes répètent un composant déjà présent
+    assert elec['Name'].nunique() == 40
+    assert meca['No. de pièce'].nunique() == 120
+
+    only_fuses = generate_bom(SyntheticBOMSpec(rows=20, electrical_ratio=1.0, electrical_types={"Fusibles": 1}))
+    assert set(only_fuses['BOM Électrique']['ComponentType']) == {"Fusibles"}
+
+    try:
+        SyntheticBOMSpec(duplicate_ratio=1.5)
+        assert False, "ratio invalide accepté"
+    except ValueError:
+        pass
+    print("   ✅ BOM synthétique reproductible")
+
+
+def test_run_benchmarks():
+    """Tous les scénarios sur un petit BOM, résultats JSON comparables"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, "resultats", "bench.json")
+        results = run_benchmarks(SyntheticBOMSpec(rows=40), repeat=1, output_file=output_file)
+
+        assert set(results['scenarios']) == set(SCENARIOS)
+        assert results['scenarios']['generate_sku']['elements'] == 40
+        assert results['scenarios']['analyze_new_bom']['elements'] == 40
+        with open(output_file, encoding='utf-8') as f:
+            assert json.load(f)['bom']['rows'] == 40
+
+        slower = json.loads(json.dumps(results))
+        slower['scenarios']['odoo_export']['min'] *= 2
+        rows = {row['scenario']: row for row in compare_results(results, slower)}
+        assert rows['odoo_export']['regression']
+        assert not rows['normalize_text']['regression']
+        print("   ✅ Scénarios exécutés et régression détectée")
+
+
+if __name__ == "__main__":
+    test_synthetic_bom()
+    test_run_benchmarks()
+    print("\n🎉 Tests terminés avec succès!")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test du cache de lecture des BOM et du préchargement
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bom_cache import BOMParseCache, BOMPrefetcher
+
+
+def _write_bom(file_path, rows):
+    pd.DataFrame({'Name': [f"R{i}" for i in range(rows)]}).to_excel(
+        file_path, sheet_name='BOM Électrique', index=False)
+
+
+def test_parse_cache():
+    """Réutilisation, invalidation sur modification, borne LRU"""
+    print("🗂️ Test du cache de lecture des BOM")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = BOMParseCache(max_entries=2)
+        paths = [os.path.join(tmp, f"BOM_{i}.xlsx") for i in range(3)]
+        for path in paths:
+            _write_bom(path, 3)
+
+        first = cache.read(paths[0])
+        assert cache.read(paths[0]) is first
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        # Fichier réécrit: nouvelle lecture
+        _write_bom(paths[0], 5)
+        os.utime(paths[0], ns=(time.time_ns(), time.time_ns() + 10**9))
+        assert len(cache.read(paths[0])['BOM Électrique']) == 5
+
+        # Au plus deux classeurs en mémoire
+        cache.read(paths[1])
+        cache.read(paths[2])
+        assert not cache.contains(paths[0])
+        assert cache.contains(paths[1]) and cache.contains(paths[2])
+        print("   ✅ Cache LRU invalidé par la date de modification")
+
+
+def test_prefetcher():
+    """Seuls les BOM récents, hors fichiers verrous, sont préchargés"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = BOMParseCache()
+        recent = os.path.join(tmp, "BOM_V2.2.xlsx")
+        old = os.path.join(tmp, "BOM_V1.0.xlsx")
+        _write_bom(recent, 3)
+        _write_bom(old, 3)
+        _write_bom(os.path.join(tmp, "~$BOM_V2.2.xlsx"), 1)
+        two_weeks_ago = time.time() - 14 * 86400
+        os.utime(old, (two_weeks_ago, two_weeks_ago))
+
+        prefetcher = BOMPrefetcher(cache, tmp, max_files=3, max_age_days=7)
+        assert prefetcher.candidates() == [recent]
+        assert prefetcher.run_once() == 1
+        assert prefetcher.run_once() == 0
+
+        # La lecture demandée ensuite par l'utilisateur est servie par le cache
+        cache.read(recent)
+        assert cache.hits == 1 and cache.misses == 0
+
+        # Thread d'arrière-plan: démarrage, changement de dossier, arrêt
+        cache.clear()
+        prefetcher.start()
+        deadline = time.time() + 10
+        while not cache.contains(recent) and time.time() < deadline:
+            time.sleep(0.05)
+        prefetcher.stop(timeout=5)
+        assert cache.contains(recent)
+        assert not prefetcher._thread.is_alive()
+        print("   ✅ Préchargement borné et interruptible")
+
+
+if __name__ == "__main__":
+    test_parse_cache()
+    test_prefetcher()
+    print("\n🎉 Tests terminés avec succès!")
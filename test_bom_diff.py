@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test de la comparaison de révisions de BOM
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bom_diff import components_to_generate, diff_bom_files, diff_summary
+from sku_generator import SKUGenerator
+
+
+def _write_bom(file_path, elec_rows, meca_rows):
+    with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
+        pd.DataFrame(elec_rows).to_excel(writer, sheet_name='BOM Électrique', index=False)
+        pd.DataFrame(meca_rows).to_excel(writer, sheet_name='BOM Mécanique', index=False)
+
+
+def _elec(name, quantity, designator, description="Résistance"):
+    return {'Name': name, 'Description': description, 'ComponentType': 'Résistances',
+            'Manufacturer': 'Vishay', 'Manufacturer PN': f"PN-{name}",
+            'Quantity': quantity, 'Designator': designator}
+
+
+def _meca(name, quantity):
+    return {'No. de pièce': name, 'Description Française': 'Vis', 'Type': 'BOULONNERIE',
+            'Manufacturier': 'Unbrako', 'QTE TOTALE': quantity}
+
+
+def test_bom_diff():
+    """Ajouts, suppressions, quantités et désignateurs entre V2.1 et V2.2"""
+    print("🔀 Test de comparaison de révisions")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_file = os.path.join(tmp, "BOM_V2.1.xlsx")
+        new_file = os.path.join(tmp, "BOM_V2.2.xlsx")
+
+        _write_bom(old_file,
+                   [_elec("R1", 2, "R1, R2"), _elec("R2", 1, "R3"), _elec("R3", 1, "R4"),
+                    _elec("R4", 1, "R5")],
+                   [_meca("VIS-M6", 10), _meca("VIS-M8", 4)])
+        _write_bom(new_file,
+                   # R1 réparti sur deux lignes, désignateurs dans un autre ordre: inchangé
+                   [_elec("R1", 1, "R2"), _elec("R1", 1, "R1"), _elec("R2", 5, "R3"),
+                    _elec("R3", 1, "R4 R6"), _elec("R9", 1, "R9"),
+                    # Description modifiée: autre composant, donc nouveau SKU
+                    _elec("R4", 1, "R5", description="Résistance 1%")],
+                   [_meca("VIS-M6", 10), _meca("VIS-M10", 2)])
+
+        diff = diff_bom_files(old_file, new_file)
+        summary = diff_summary(diff)
+        print(f"   {summary}")
+
+        assert summary == {'ajoutes': 3, 'supprimes': 2, 'quantite_modifiee': 1,
+                           'designateur_modifie': 1, 'inchanges': 2}
+        assert sorted(diff['ajoutes']['name']) == ['R4', 'R9', 'VIS-M10']
+        assert sorted(diff['supprimes']['name']) == ['R4', 'VIS-M8']
+        quantity = diff['quantite_modifiee'].iloc[0]
+        assert (quantity['name'], quantity['quantity_avant'], quantity['quantity_apres']) == ('R2', 1, 5)
+        designator = diff['designateur_modifie'].iloc[0]
+        assert (designator['designator_avant'], designator['designator_apres']) == ('R4', 'R4,R6')
+
+        # Seuls les ajouts partent en génération de SKU
+        generator = SKUGenerator(os.path.join(tmp, "diff.db"))
+        components = components_to_generate(diff, generator)
+        assert {domain: len(items) for domain, items in components.items()} == {'ELEC': 2, 'MECA': 1}
+        assert {c.name: c.quantity for c in components['ELEC']} == {'R4': 1, 'R9': 1}
+        print("   ✅ Composants à générer: seulement les ajouts")
+
+        # Ligne de commande
+        output = subprocess.run(
+            [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "bom_diff.py"),
+             old_file, new_file, "--json"],
+            capture_output=True, text=True, check=True, cwd=tmp
+        ).stdout
+        assert '"ajoutes": 3' in output
+
+
+if __name__ == "__main__":
+    test_bom_diff()
+    print("\n🎉 Test terminé avec succès!")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test des statistiques incrémentales maintenues par triggers
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sku_generator import SKUGenerator, Component
+from bom_analyzer import BOMComparator
+
+
+def _full_scan_stats(db_path: str) -> dict:
+    """Statistiques calculées par GROUP BY complet (référence)"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    total = cursor.execute("SELECT COUNT(*) FROM components").fetchone()[0]
+    by_domain = dict(cursor.execute("SELECT domain, COUNT(*) FROM components GROUP BY domain").fetchall())
+    by_route = dict(cursor.execute("SELECT route, COUNT(*) FROM components GROUP BY route").fetchall())
+    conn.close()
+    return {'total': total, 'par_domaine': by_domain, 'par_route': by_route}
+
+
+def test_incremental_stats():
+    """Les triggers gardent component_stats identique à un GROUP BY complet"""
+    print("📊 Test des statistiques incrémentales")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "stats.db")
+        generator = SKUGenerator(db_path)
+        comparator = BOMComparator(generator)
+
+        components = [
+            Component(name="R1", description="Résistance", domain="ELEC",
+                      component_type="Résistances", route="", routing=""),
+            Component(name="C1", description="Condensateur", domain="ELEC",
+                      component_type="Condensateurs", route="", routing=""),
+            Component(name="V1", description="Vis", domain="MECA",
+                      component_type="BOULONNERIE", route="BOLT", routing=""),
+        ]
+        for component in components:
+            generator.generate_sku(component)
+
+        stats = comparator.get_database_stats()
+        reference = _full_scan_stats(db_path)
+        print(f"   Stats: {stats['total']} composants, {stats['par_domaine']}")
+        assert stats['total'] == reference['total'] == 3
+        assert stats['par_domaine'] == reference['par_domaine']
+        assert stats['par_route'] == reference['par_route']
+        assert stats['par_sous_famille'] == {'ELEC-RESIST': 1, 'ELEC-CONDEN': 1, 'MECA-VISSER': 1}
+
+        # Suppression et modification directes en SQL
+        conn = sqlite3.connect(db_path)
+        conn.execute("DELETE FROM components WHERE name = 'C1'")
+        conn.execute("UPDATE components SET domain = 'MECA' WHERE name = 'R1'")
+        conn.commit()
+        conn.close()
+
+        stats = comparator.get_database_stats()
+        assert stats['total'] == 2
+        assert stats['par_domaine'] == {'MECA': 2}
+        assert 'ELEC-CONDEN' not in stats['par_sous_famille']
+
+        # Réconciliation après désynchronisation volontaire
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE component_stats SET count = 999 WHERE dimension = 'total'")
+        conn.commit()
+        conn.close()
+        assert comparator.get_database_stats()['total'] == 999
+        assert comparator.reconcile_database_stats()['total'] == 2
+        print("   ✅ Réconciliation correcte")
+
+
+if __name__ == "__main__":
+    test_incremental_stats()
+    print("\n🎉 Test terminé avec succès!")
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Test des sauvegardes à chaud (intervalle d'insertions, rotation, planification, restauration)
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import db_backup
+from db_backup import BackupManager, create_snapshot, list_snapshots, restore_snapshot, rotate_snapshots
+from sku_generator import Component, SKUGenerator
+
+
+def _component(i: int) -> Component:
+    return Component(f"R{i}", f"Résistance {i}k 0603", "ELEC", "Résistances", "Yageo", f"RC0603-{i}")
+
+
+def _count(db_path: str) -> int:
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM components").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_backup_every_n_inserts():
+    """Une sauvegarde toutes les N insertions, rotation des plus anciennes"""
+    print("💾 Test des sauvegardes automatiques")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "sku.db")
+        generator = SKUGenerator(db_path)
+        manager = BackupManager(db_path, interval=5, keep=2, schedule_minutes=0)
+        db_backup._managers[os.path.abspath(db_path)] = manager
+        try:
+            for i in range(5):
+                generator.generate_sku(_component(i))
+                # Déjà connu: pas d'insertion, pas de sauvegarde
+                generator.generate_sku(_component(i))
+            assert manager.wait(10)
+            assert manager.snapshots_taken == 1, manager.snapshots_taken
+            assert _count(manager.last_snapshot) == 5
+
+            for i in range(5, 20):
+                generator.generate_sku(_component(i))
+                manager.wait(10)
+            assert manager.snapshots_taken == 4, manager.snapshots_taken
+        finally:
+            db_backup.disable_auto_backup(db_path)
+
+        snapshots = list_snapshots(db_path)
+        assert [s['raison'] for s in snapshots] == ['auto', 'auto'], snapshots
+        assert snapshots[0]['fichier'] == manager.last_snapshot
+        assert _count(snapshots[0]['fichier']) == 20
+        assert not [f for f in os.listdir(os.path.join(tmp, "backups")) if f.endswith('.tmp')]
+    print("✅ 4 sauvegardes pour 20 insertions, 2 conservées")
+
+
+def test_rotation_keeps_manual_snapshots():
+    """La rotation ne touche qu'aux sauvegardes automatiques"""
+    print("\n♻️ Test de la rotation")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "sku.db")
+        SKUGenerator(db_path).generate_sku(_component(1))
+
+        manual = create_snapshot(db_path)
+        automatic = [create_snapshot(db_path, reason='auto') for _ in range(3)]
+        removed = rotate_snapshots(db_path, keep=1)
+        assert sorted(removed) == sorted(automatic[:2])
+        remaining = {s['fichier'] for s in list_snapshots(db_path)}
+        assert remaining == {manual, automatic[2]}
+
+        try:
+            create_snapshot(db_path, reason='../hors')
+            raise AssertionError("Une raison invalide doit être refusée")
+        except ValueError:
+            pass
+    print("✅ Sauvegarde manuelle conservée, automatiques renouvelées")
+
+
+def test_scheduled_backup_only_after_changes():
+    """Sauvegarde planifiée seulement s'il y a eu des insertions"""
+    print("\n⏰ Test de la sauvegarde planifiée")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "sku.db")
+        generator = SKUGenerator(db_path)
+        manager = BackupManager(db_path, interval=0, schedule_minutes=0.1 / 60)
+        db_backup._managers[os.path.abspath(db_path)] = manager
+        try:
+            time.sleep(0.5)
+            assert manager.snapshots_taken == 0
+
+            generator.generate_sku(_component(1))
+            deadline = time.time() + 5
+            while manager.snapshots_taken == 0 and time.time() < deadline:
+                time.sleep(0.05)
+            assert manager.snapshots_taken == 1
+
+            time.sleep(0.5)
+            assert manager.snapshots_taken == 1
+        finally:
+            db_backup.disable_auto_backup(db_path)
+        assert list_snapshots(db_path)[0]['raison'] == 'planifie'
+    print("✅ Aucune sauvegarde sans modification")
+
+
+def test_generation_during_backup():
+    """La sauvegarde se termine pendant une génération continue, sans la bloquer"""
+    print("\n🔀 Test de la génération pendant la sauvegarde")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "sku.db")
+        generator = SKUGenerator(db_path)
+        for i in range(300):
+            generator.generate_sku(_component(i))
+        # Base de plusieurs milliers de pages: la copie dure assez pour croiser des écritures
+        conn = sqlite3.connect(db_path)
+        with conn:
+            conn.execute("CREATE TABLE remplissage (data BLOB)")
+            conn.executemany("INSERT INTO remplissage VALUES (randomblob(4000))", [()] * 5000)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        conn.close()
+
+        result = {}
+
+        def backup():
+            result['fichier'] = create_snapshot(db_path)
+
+        thread = threading.Thread(target=backup)
+        thread.start()
+        # L'écrivain continue jusqu'au retour de la sauvegarde
+        generated = 0
+        deadline = time.time() + 30
+        while thread.is_alive() and time.time() < deadline:
+            generator.generate_sku(_component(1000 + generated))
+            generated += 1
+        thread.join(timeout=max(deadline - time.time(), 0))
+        assert not thread.is_alive(), f"Sauvegarde non terminée après {generated} écritures"
+
+        assert generated > 0
+        conn = sqlite3.connect(result['fichier'])
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == 'ok'
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'delete'
+        conn.close()
+        assert 300 <= _count(result['fichier']) <= 300 + generated
+        assert not os.path.exists(result['fichier'] + '-wal')
+    print(f"✅ {generated} SKU générés pendant la copie, sauvegarde cohérente")
+
+
+def test_restore_round_trip():
+    """Restauration: contenu de la sauvegarde, état écrasé sauvegardé, allocation reprise"""
+    print("\n⏪ Test de la restauration")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "sku.db")
+        generator = SKUGenerator(db_path)
+        skus = [generator.generate_sku(_component(i)) for i in range(3)]
+        snapshot = create_snapshot(db_path)
+        later = generator.generate_sku(_component(3))
+
+        safety = restore_snapshot(snapshot, db_path)
+        assert _count(db_path) == 3
+        assert _count(safety) == 4
+        assert generator.search_component_by_sku(later) is None
+        assert generator.search_component_by_sku(skus[0]) is not None
+        # Le compteur est restauré avec les composants: la séquence est réattribuée
+        assert SKUGenerator(db_path).generate_sku(_component(3)) == later
+
+        corrupted = os.path.join(tmp, "corrompue.db")
+        with open(corrupted, 'wb') as f:
+            f.write(b"pas une base sqlite" * 100)
+        try:
+            restore_snapshot(corrupted, db_path)
+            raise AssertionError("Une sauvegarde illisible doit être refusée")
+        except sqlite3.DatabaseError:
+            pass
+        assert _count(db_path) == 4
+    print("✅ Restauration vérifiée, base courante intacte si la sauvegarde est invalide")
+
+
+if __name__ == "__main__":
+    test_backup_every_n_inserts()
+    test_rotation_keeps_manual_snapshots()
+    test_scheduled_backup_only_after_changes()
+    test_generation_during_backup()
+    test_restore_round_trip()
+    print("\n🎉 Tous les tests des sauvegardes sont passés")
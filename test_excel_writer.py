@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test des moteurs d'écriture Excel: mêmes feuilles et mêmes valeurs
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import excel_writer
+from excel_writer import HAS_XLSXWRITER, choose_backend, write_excel
+
+
+def _sheet_values(file_path):
+    """Contenu de chaque feuille: {nom: [tuple de valeurs par ligne]}"""
+    workbook = openpyxl.load_workbook(file_path, read_only=True)
+    values = {ws.title: list(ws.iter_rows(values_only=True)) for ws in workbook.worksheets}
+    workbook.close()
+    return values
+
+
+def test_backends_equivalent():
+    """Chaque moteur produit les mêmes cellules que pd.ExcelWriter"""
+    print("📊 Test des moteurs d'écriture Excel")
+    print("=" * 50)
+
+    sheets = {
+        'SKU_Électrique': pd.DataFrame({
+            'SKU': ['ELEC-RESIST-AAAA', 'ELEC-CONDEN-AAAA', 'ELEC-CONDEN-AAAB'],
+            'Name': ['R100', 'C1u', 'C2u'],
+            'Description': ['Résistance 100Ω', None, ''],
+            'Quantity': np.array([10, 2, 3], dtype=np.int64),
+            'Value': [0.5, np.nan, np.inf],
+            'Active': [True, False, True],
+        }),
+        'Vide': pd.DataFrame(columns=['default_code', 'name']),
+    }
+
+    backends = ['openpyxl'] + (['xlsxwriter'] if HAS_XLSXWRITER else [])
+    with tempfile.TemporaryDirectory() as tmp:
+        reference_file = os.path.join(tmp, "pandas.xlsx")
+        assert write_excel(reference_file, sheets, 'pandas') == 'pandas'
+        reference = _sheet_values(reference_file)
+
+        for backend in backends:
+            output_file = os.path.join(tmp, f"{backend}.xlsx")
+            assert write_excel(output_file, sheets, backend) == backend
+            assert _sheet_values(output_file) == reference, backend
+            print(f"   ✅ {backend}: cellules identiques")
+
+    # Choix automatique selon le volume
+    assert choose_backend(10, 'auto') == 'pandas'
+    assert choose_backend(excel_writer.STREAMING_THRESHOLD, 'auto') in ('openpyxl', 'xlsxwriter')
+    try:
+        choose_backend(10, 'csv')
+        assert False, "Moteur inconnu accepté"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    test_backends_equivalent()
+    print("\n🎉 Test terminé avec succès!")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test de l'étape d'export parallèle
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import export_stage
+import instrumentation
+from export_stage import ExportJob, run_export_stage
+from test_odoo_export import _example_results
+
+
+def test_export_stage():
+    """Excel, CSV et JSON produits ensemble; durées et erreurs par format"""
+    print("📦 Test de l'étape d'export parallèle")
+    print("=" * 50)
+
+    results = _example_results()
+    with tempfile.TemporaryDirectory() as tmp:
+        jobs = [
+            ExportJob('excel', os.path.join(tmp, "SKU_test.xlsx")),
+            ExportJob('odoo_csv', os.path.join(tmp, "ODOO_test.csv")),
+            ExportJob('odoo_json', os.path.join(tmp, "ODOO_test.json"), {'compact': True}),
+        ]
+
+        # Seuil à zéro et deux processeurs: l'encodage XLSX passe par un processus séparé
+        original_threshold, original_cpus = export_stage.PROCESS_MIN_ROWS, export_stage._available_cpus
+        export_stage.PROCESS_MIN_ROWS = 0
+        export_stage._available_cpus = lambda: 2
+        try:
+            report = run_export_stage(results, jobs)
+        finally:
+            export_stage.PROCESS_MIN_ROWS, export_stage._available_cpus = original_threshold, original_cpus
+
+        for name, entry in report['formats'].items():
+            assert entry['erreur'] is None, entry
+            assert entry['lignes'] == 3
+            print(f"   {name}: {entry['secondes']:.3f} s")
+
+        sheets = pd.read_excel(jobs[0].output_file, sheet_name=None)
+        assert sorted(sheets) == ['SKU_Mécanique', 'SKU_Électrique']
+        assert list(pd.read_csv(jobs[1].output_file, sep=';')['default_code'])[-1] == 'MECA-VISSER-AAAA'
+        with open(jobs[2].output_file, encoding='utf-8') as f:
+            assert len(json.load(f)['data']) == 3
+
+        # Les résultats d'origine ne sont pas modifiés par les exports
+        assert list(results['Électrique'].columns)[0] == 'SKU'
+
+        # Un format en échec est rapporté sans bloquer les autres
+        report = run_export_stage(results, [
+            ExportJob('odoo_csv', os.path.join(tmp, "absent", "ODOO.csv")),
+            ExportJob('excel', os.path.join(tmp, "SKU_ok.xlsx")),
+        ])
+        assert report['formats']['odoo_csv']['erreur']
+        assert report['formats']['excel']['erreur'] is None
+        print("   ✅ Erreur isolée au format concerné")
+
+    try:
+        run_export_stage(results, [ExportJob('pdf', 'out.pdf')])
+        assert False, "Format inconnu accepté"
+    except ValueError:
+        pass
+
+
+def _instrumented_writer(results, output_file: str) -> int:
+    """Format de test: prend le verrou de l'instrumentation dans le processus d'export"""
+    instrumentation.enable()
+    with instrumentation.span('export.test'):
+        pass
+    return sum(len(df) for df in results.values())
+
+
+def test_process_export_with_held_lock():
+    """Processus d'export lancé pendant qu'un autre thread tient le verrou de l'instrumentation"""
+    print("\n🔒 Test du processus d'export avec un verrou tenu")
+    print("=" * 50)
+
+    held, release = threading.Event(), threading.Event()
+
+    def hold_lock():
+        with instrumentation.recorder._lock:
+            held.set()
+            release.wait(120)
+
+    holder = threading.Thread(target=hold_lock, daemon=True)
+    holder.start()
+    held.wait()
+
+    report = {}
+    original_threshold, original_cpus = export_stage.PROCESS_MIN_ROWS, export_stage._available_cpus
+    export_stage.EXPORT_FORMATS['verrou'] = (_instrumented_writer, True)
+    export_stage.PROCESS_MIN_ROWS = 0
+    export_stage._available_cpus = lambda: 2
+    try:
+        stage = threading.Thread(target=lambda: report.update(
+            run_export_stage(_example_results(), [ExportJob('verrou', 'inutilise')])), daemon=True)
+        stage.start()
+        stage.join(60)
+        # Un processus issu d'un fork hériterait du verrou tenu et resterait bloqué
+        assert not stage.is_alive(), "Processus d'export bloqué sur un verrou hérité"
+    finally:
+        release.set()
+        holder.join()
+        del export_stage.EXPORT_FORMATS['verrou']
+        export_stage.PROCESS_MIN_ROWS, export_stage._available_cpus = original_threshold, original_cpus
+
+    entry = report['formats']['verrou']
+    assert entry['erreur'] is None and entry['lignes'] == 3, entry
+    print(f"   ✅ Export terminé en {entry['secondes']:.3f} s ({export_stage.PROCESS_START_METHOD})")
+
+
+if __name__ == "__main__":
+    test_export_stage()
+    test_process_export_with_held_lock()
+    print("\n🎉 Test terminé avec succès!")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test de l'instrumentation (étapes, compteurs, requêtes SQL)
+"""
+
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import instrumentation
+from instrumentation import Recorder
+from main import BOMProcessor
+from sku_generator import SKUGenerator
+
+
+def test_recorder():
+    """Désactivé: rien n'est enregistré; activé: étapes, compteurs et requêtes"""
+    print("⏱️ Test de l'instrumentation")
+    print("=" * 50)
+
+    recorder = Recorder()
+    with recorder.span('lecture') as span:
+        span.add_rows(10)
+    recorder.count('nouveaux')
+    assert recorder.span('a') is recorder.span('b')
+    assert recorder.summary()['etapes'] == {} and recorder.summary()['compteurs'] == {}
+
+    recorder.enabled = True
+    for _ in range(2):
+        with recorder.span('lecture') as span:
+            span.add_rows(10)
+    recorder.count('nouveaux', 3)
+    recorder.record('export.excel', 0.5, 7)
+    summary = recorder.summary()
+    assert summary['etapes']['lecture']['appels'] == 2
+    assert summary['etapes']['lecture']['lignes'] == 20
+    assert list(summary['etapes'])[0] == 'export.excel'
+    assert summary['compteurs'] == {'nouveaux': 3}
+
+    # Une requête qui déclenche un trigger compte une fois
+    conn = recorder.connect(':memory:')
+    conn.execute("CREATE TABLE a (x)")
+    conn.execute("CREATE TABLE b (x)")
+    conn.execute("CREATE TRIGGER t AFTER INSERT ON a BEGIN INSERT INTO b VALUES (NEW.x); END")
+    conn.execute("INSERT INTO a VALUES (1)")
+    conn.execute("SELECT * FROM b").fetchall()
+    conn.close()
+    sql = recorder.summary()['requetes_sql']
+    assert sql['par_type']['INSERT'] == 1 and sql['par_type']['SELECT'] == 1
+    print("   ✅ Étapes, compteurs et requêtes agrégés")
+
+
+def test_pipeline_summary():
+    """Traitement d'un BOM: lecture, génération, SQLite et compteurs de SKU"""
+    with tempfile.TemporaryDirectory() as tmp:
+        bom_file = os.path.join(tmp, "BOM.xlsx")
+        with pd.ExcelWriter(bom_file, engine='openpyxl') as writer:
+            pd.DataFrame({'Name': ['R1', 'R2', 'R1'], 'Description': ['Résistance'] * 3,
+                          'ComponentType': ['Résistances'] * 3, 'Manufacturer': ['Vishay'] * 3,
+                          'Manufacturer PN': ['PN1', 'PN2', 'PN1'], 'Quantity': [1, 2, 1]}
+                         ).to_excel(writer, sheet_name='BOM Électrique', index=False)
+
+        processor = BOMProcessor(SKUGenerator(os.path.join(tmp, "instr.db")))
+        instrumentation.enable()
+        instrumentation.reset()
+        try:
+            processor.process_bom_file(bom_file)
+            summary = instrumentation.summary()
+        finally:
+            instrumentation.disable()
+            instrumentation.reset()
+
+        assert summary['etapes']['bom.lecture']['lignes'] == 3
+        assert summary['etapes']['generation.elec']['lignes'] == 3
+        assert summary['etapes']['sqlite.insertion']['appels'] == 2
+        assert summary['compteurs'] == {'sku.existants': 1, 'sku.nouveaux': 2}
+        assert summary['requetes_sql']['par_type']['INSERT'] >= 2
+        for line in instrumentation.format_summary(summary):
+            print(f"   {line}")
+        print("   ✅ Résumé du traitement")
+
+
+if __name__ == "__main__":
+    test_recorder()
+    test_pipeline_summary()
+    print("\n🎉 Tests terminés avec succès!")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test de l'import différé de pandas/NumPy (démarrage de l'interface et des scripts)
+"""
+
+import os
+import subprocess
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from lazy_imports import LazyModule, is_loaded, lazy_import
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _loaded_after_import(modules):
+    """Modules lourds chargés par un interpréteur neuf après l'import de `modules`"""
+    code = (f"import sys; import {', '.join(modules)}; "
+            "print(','.join(m for m in ('pandas', 'numpy', 'xlsxwriter') if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_DIR,
+                            capture_output=True, text=True, check=True)
+    return [m for m in result.stdout.strip().split(',') if m]
+
+
+def test_entry_points_do_not_load_pandas():
+    """Importer l'interface et les points d'entrée ne charge ni pandas ni NumPy"""
+    print("🐢 Test du démarrage sans pandas")
+    print("=" * 50)
+
+    loaded = _loaded_after_import(['gui', 'main', 'bom_analyzer', 'sku_search', 'watch_folder'])
+    print(f"Modules lourds chargés: {loaded or 'aucun'}")
+    assert loaded == [], loaded
+    print("✅ pandas, NumPy et xlsxwriter restent différés")
+
+
+def test_lazy_module_loads_on_access():
+    """Le module est importé au premier accès à un attribut"""
+    print("\n📦 Test du chargement au premier accès")
+    print("=" * 50)
+
+    module = LazyModule('json')
+    assert 'différé' in repr(module)
+    assert module.dumps({'a': 1}) == '{"a": 1}'
+    assert 'chargé' in repr(module)
+    # Attributs recopiés: les accès suivants ne passent plus par __getattr__
+    assert 'dumps' in vars(module)
+
+    # Module déjà importé: retourné tel quel
+    assert lazy_import('os') is os
+    assert is_loaded('os')
+    print("✅ Chargement différé puis direct")
+
+
+def test_pipeline_still_works():
+    """Le premier traitement charge pandas normalement"""
+    print("\n⚙️ Test du traitement après import différé")
+    print("=" * 50)
+
+    code = ("import sys; from sku_sequence import encode_sequences, decode_sequences; "
+            "assert 'numpy' not in sys.modules; "
+            "codes = encode_sequences([1, 2, 30]); "
+            "assert list(codes) == ['AAAA', 'AAAB', 'AABA'], list(codes); "
+            "assert list(decode_sequences(codes)) == [1, 2, 30]; "
+            "import main; df = main.pd.DataFrame({'a': [1]}); assert len(df) == 1; "
+            "assert 'pandas' in sys.modules")
+    subprocess.run([sys.executable, "-c", code], cwd=REPO_DIR, check=True)
+    print("✅ NumPy et pandas chargés à la demande")
+
+
+if __name__ == "__main__":
+    test_entry_points_do_not_load_pandas()
+    test_lazy_module_loads_on_access()
+    test_pipeline_still_works()
+    print("\n🎉 Tous les tests d'import différé sont passés")
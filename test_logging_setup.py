@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test de la journalisation asynchrone (file, rotation, échantillonnage)
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from logging_setup import SampledLogger, setup_logging, shutdown_logging
+from main import BOMProcessor
+from sku_generator import Component, SKUGenerator
+
+
+def test_async_logging():
+    """Écriture dans le thread du listener, rotation par taille, résumés de lot"""
+    print("📝 Test de la journalisation asynchrone")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = os.path.join(tmp, "sku_generator.log")
+        listener = setup_logging(level="INFO", log_file=log_file, console=False)
+        try:
+            writer_threads = set()
+            file_handler = listener.handlers[0]
+            emit = file_handler.emit
+
+            def spy(record):
+                writer_threads.add(threading.current_thread().name)
+                emit(record)
+            file_handler.emit = spy
+
+            logger = logging.getLogger("test_logging_setup")
+            logger.info("Lot %s: %d lignes", "ELEC", 3)
+            logger.debug("Message non retenu")
+
+            generator = SKUGenerator(os.path.join(tmp, "log.db"))
+            components = [Component(name=f"R{i}", description="Résistance", domain="ELEC",
+                                    component_type="Résistances", route="", routing="",
+                                    manufacturer="Vishay", manufacturer_part=f"PN{i}") for i in range(3)]
+            BOMProcessor(generator).generate_skus_for_selected_components({'ELEC': components + components[:1]})
+            assert generator.generation_counts == {'nouveaux': 3, 'existants': 1}
+        finally:
+            shutdown_logging()
+
+        with open(log_file, encoding='utf-8') as f:
+            content = f.read()
+        assert "INFO - Lot ELEC: 3 lignes" in content
+        assert "Lot ELEC: 4 lignes -> 3 nouveaux SKU, 1 existants, 0 rejetés" in content
+        # Messages par SKU: DEBUG, absents au niveau INFO
+        assert "Nouveau SKU simplifié généré" not in content
+        assert "Message non retenu" not in content
+        assert threading.current_thread().name not in writer_threads
+        print("   ✅ Messages écrits par le listener, résumé de lot en INFO")
+
+        # Rotation par taille
+        from config import LOGGING_CONFIG
+        previous = dict(LOGGING_CONFIG)
+        LOGGING_CONFIG.update(max_bytes=2000, backup_count=2)
+        try:
+            setup_logging(level="INFO", log_file=log_file, console=False)
+            for i in range(200):
+                logging.getLogger("test_logging_setup").info("Ligne de remplissage %05d", i)
+        finally:
+            shutdown_logging()
+            LOGGING_CONFIG.clear()
+            LOGGING_CONFIG.update(previous)
+        assert sorted(os.listdir(tmp)) == ['log.db', 'sku_generator.log', 'sku_generator.log.1',
+                                           'sku_generator.log.2']
+        print("   ✅ Rotation par taille")
+
+
+def test_sampled_logger():
+    """Un message DEBUG sur N quand DEBUG est actif, aucun sinon"""
+    records = []
+
+    class Collect(logging.Handler):
+        def emit(self, record):
+            records.append(record.getMessage())
+
+    logger = logging.getLogger("test_sampled")
+    logger.propagate = False
+    logger.addHandler(Collect())
+    sampled = SampledLogger(logger, every=10)
+
+    logger.setLevel(logging.INFO)
+    for i in range(25):
+        sampled.debug("SKU %d", i)
+    assert records == []
+
+    logger.setLevel(logging.DEBUG)
+    for i in range(25):
+        sampled.debug("SKU %d", i)
+    assert records == ["SKU 0", "SKU 10", "SKU 20"]
+    print("   ✅ Échantillonnage des messages par SKU")
+
+
+if __name__ == "__main__":
+    test_async_logging()
+    test_sampled_logger()
+    print("\n🎉 Tests terminés avec succès!")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test du registre des tables de correspondance (compilation, partage, rechargement)
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import SKU_TYPE_MAPPING, get_route_mapping
+from mapping_registry import MappingRegistry, compile_mappings, registry
+from sku_generator import SKUGenerator
+
+
+def test_compiled_tables():
+    """Tables de config.py compilées une fois, immuables et partagées"""
+    print("🗂️ Test des tables compilées")
+    print("=" * 50)
+
+    mappings = registry.current()
+    assert dict(mappings.type_mapping) == SKU_TYPE_MAPPING
+    assert dict(mappings.route_mapping) == get_route_mapping()
+    assert mappings.reverse['type']['RESIST'] == "Résistances"
+    assert ('PIECESPLIEES', 'PLIAGE') in mappings.type_keys
+
+    try:
+        mappings.type_mapping["Nouveau"] = "NOUVEA"
+        raise AssertionError("La table compilée ne doit pas être modifiable")
+    except TypeError:
+        pass
+
+    with tempfile.TemporaryDirectory() as tmp:
+        first = SKUGenerator(os.path.join(tmp, "a.db"))
+        second = SKUGenerator(os.path.join(tmp, "b.db"))
+        assert first.mappings is second.mappings is mappings
+        assert first.normalize_text("Pièces Pliées") == "PLIAGE"
+
+        # Copie modifiée par une instance: les autres gardent la version partagée
+        first.type_mapping["Capteurs"] = "CAPTER"
+        first.invalidate_mappings()
+        assert first.normalize_text("Capteurs") == "CAPTER"
+        assert second.normalize_text("Capteurs") != "CAPTER"
+        assert second.mappings is registry.current()
+
+    try:
+        compile_mappings({"Vide": ""}, {}, {})
+        raise AssertionError("Un code vide doit être refusé")
+    except ValueError:
+        pass
+    print(f"✅ Version {mappings.version}: {len(mappings.type_keys)} types, partagée par les générateurs")
+
+
+def test_reload_from_file():
+    """Fichier externe: nouvelle version au rechargement, l'ancienne reste intacte"""
+    print("\n🔄 Test du rechargement à chaud")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        table_file = os.path.join(tmp, "tables.json")
+        with open(table_file, 'w', encoding='utf-8') as f:
+            json.dump({'types': {"Capteurs": "CAPTER"}}, f)
+
+        local = MappingRegistry(table_file)
+        first = local.current()
+        assert dict(first.type_mapping) == {"Capteurs": "CAPTER"}
+        # Sections absentes: celles de config.py
+        assert dict(first.route_mapping) == get_route_mapping()
+        assert local.reload_if_changed() is False
+
+        with open(table_file, 'w', encoding='utf-8') as f:
+            json.dump({'types': {"Capteurs": "SENSOR"}}, f)
+        os.utime(table_file, ns=(0, 10 ** 9))
+        assert local.reload_if_changed() is True
+        second = local.current()
+        assert second.version == first.version + 1
+        assert second.type_mapping["Capteurs"] == "SENSOR"
+        assert first.type_mapping["Capteurs"] == "CAPTER"
+
+        # Fichier invalide: la version courante reste en place
+        with open(table_file, 'w', encoding='utf-8') as f:
+            json.dump({'inconnu': {}}, f)
+        os.utime(table_file, ns=(0, 2 * 10 ** 9))
+        assert local.reload_if_changed() is False
+        assert local.current() is second
+    print("✅ Versions successives, source invalide ignorée")
+
+
+if __name__ == "__main__":
+    test_compiled_tables()
+    test_reload_from_file()
+    print("\n🎉 Tous les tests du registre sont passés")
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Test de la préparation vectorisée des exports ODOO
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from odoo_export_config import (
+    ODOOExportConfig, _normalize_domain, _normalize_domain_series, prepare_odoo_frame
+)
+from odoo_integration import ODOOIntegration
+from sku_generator import SKUGenerator, Component
+
+
+def _example_results():
+    """Résultats de traitement tels que produits par BOMProcessor"""
+    return {
+        'Électrique': pd.DataFrame([
+            {'SKU': 'ELEC-RESIST-AAAA', 'Name': 'R100', 'Description': 'Résistance 100Ω',
+             'ComponentType': 'Résistances', 'Manufacturer': 'Vishay', 'Manufacturer_PN': 'CFR25',
+             'Quantity': 10, 'Designator': 'R1', 'Domain': 'ÉLECTRIQUE'},
+            {'SKU': 'ELEC-CONDEN-AAAA', 'Name': 'C1u', 'Description': '',
+             'ComponentType': 'Condensateurs', 'Manufacturer': 'Murata', 'Manufacturer_PN': 'GRM',
+             'Quantity': 2, 'Designator': 'C1', 'Domain': ' elec '},
+        ]),
+        'Mécanique': pd.DataFrame([
+            {'SKU': 'MECA-VISSER-AAAA', 'Name': 'Vis M6', 'Description': 'Vis CHC',
+             'ComponentType': 'Boulonnerie', 'Manufacturer': 'Unbrako', 'Manufacturer_PN': 'M6',
+             'Quantity': 20, 'Domain': 'MÉCANIQUE'},
+        ]),
+    }
+
+
+def test_prepare_odoo_frame():
+    """Mapping par colonnes: domaines, catégories, valeurs par défaut"""
+    print("📤 Test de la préparation ODOO vectorisée")
+    print("=" * 50)
+
+    values = pd.Series(['ÉLECTRIQUE', ' meca ', 'Mechanical', 'autre', None, 3], dtype=object)
+    assert list(_normalize_domain_series(values)) == [_normalize_domain(v) for v in values]
+
+    results = _example_results()
+    elec = prepare_odoo_frame(results['Électrique'])
+    assert list(elec['categ_id']) == ['Composants Électroniques'] * 2
+    assert list(elec['description']) == ['Résistance 100Ω', 'C1u']
+    for column, value in ODOOExportConfig.ODOO_DEFAULTS.items():
+        assert (elec[column] == value).all()
+
+    meca = prepare_odoo_frame(results['Mécanique'])
+    assert list(meca['x_domain']) == ['MECA']
+    assert list(meca['x_designator']) == ['']
+    print("   ✅ Colonnes ODOO conformes")
+
+
+def test_export_to_odoo_csv():
+    """Export CSV de tous les domaines en une seule passe"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, "odoo_import.csv")
+        count, file_path = ODOOIntegration().export_to_odoo_csv(_example_results(), output_file)
+        assert count == 3 and file_path == output_file
+
+        exported = pd.read_csv(output_file, sep=';')
+        assert list(exported['default_code']) == ['ELEC-RESIST-AAAA', 'ELEC-CONDEN-AAAA', 'MECA-VISSER-AAAA']
+        print(f"   ✅ Export CSV: {count} produits")
+
+
+def test_export_to_odoo_json_streaming():
+    """Export JSON en flux: identique à json.dump(indent=2), modes compact et NDJSON"""
+    odoo = ODOOIntegration()
+    results = _example_results()
+    expected = {
+        'model': 'product.product',
+        'method': 'create',
+        'data': odoo.prepare_products(results).to_dict('records'),
+        'context': {'lang': 'fr_FR', 'tz': 'America/Toronto'}
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        reference_file = os.path.join(tmp, "reference.json")
+        with open(reference_file, 'w', encoding='utf-8') as f:
+            json.dump(expected, f, indent=2, ensure_ascii=False)
+        with open(reference_file, encoding='utf-8') as f:
+            reference_text = f.read()
+
+        # Blocs plus petits que le nombre de produits pour couvrir les jointures
+        output_file = os.path.join(tmp, "odoo_import.json")
+        count, _ = odoo.export_to_odoo_json(results, output_file, chunk_size=2)
+        assert count == 3
+        with open(output_file, encoding='utf-8') as f:
+            assert f.read() == reference_text
+
+        odoo.export_to_odoo_json(results, output_file, compact=True, chunk_size=2)
+        with open(output_file, encoding='utf-8') as f:
+            text = f.read()
+        assert '\n' not in text and json.loads(text) == expected
+
+        odoo.export_to_odoo_json(results, output_file, ndjson=True, chunk_size=2)
+        with open(output_file, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        assert [json.loads(line) for line in lines] == expected['data']
+        print(f"   ✅ Export JSON en flux: {count} produits (indenté, compact, NDJSON)")
+
+
+def test_validate_odoo_data():
+    """Validation par colonne: anomalies structurées, formats simplifié et historique acceptés"""
+    odoo = ODOOIntegration()
+
+    valid = odoo.prepare_products(_example_results())
+    legacy = valid.iloc[[0]].assign(default_code='ELEC-ELEC-STD-RESIST-AAAA')
+    assert odoo.validate_odoo_data(pd.concat([valid, legacy], ignore_index=True)) == []
+
+    invalid = pd.concat([valid, valid.iloc[[0]]], ignore_index=True)
+    invalid.loc[1, 'default_code'] = 'ELEC-CONDEN'          # 2 parties
+    invalid.loc[2, 'default_code'] = 'MECA-VISSER-AIAA'     # I hors alphabet
+    invalid.loc[0, 'name'] = None
+    issues = {issue.code: issue for issue in odoo.validate_odoo_data(invalid.drop(columns=['uom_id']))}
+
+    assert sorted(issues) == ['duplicate_sku', 'empty_value', 'invalid_sku_format',
+                              'missing_column', 'sku_part_count']
+    assert issues['missing_column'].column == 'uom_id'
+    assert issues['empty_value'].rows == [0]
+    assert issues['duplicate_sku'].rows == [3]
+    assert issues['sku_part_count'].rows == [1]
+    assert issues['invalid_sku_format'].rows == [2]
+    print(f"   ✅ Validation ODOO: {len(issues)} anomalies détectées")
+
+
+def test_delta_export():
+    """Export différentiel: seuls les composants ajoutés ou modifiés sont réexportés"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "delta.db")
+        output_file = os.path.join(tmp, "odoo_delta.csv")
+        generator = SKUGenerator(db_path)
+        odoo = ODOOIntegration()
+
+        skus = [generator.generate_sku(Component(
+            name=f"Vis {i}", description="Vis", domain="MECA",
+            component_type="BOULONNERIE", route="", routing=""
+        )) for i in range(4)]
+
+        # Premier export: tout le catalogue
+        count, _ = odoo.export_delta_to_odoo_csv(db_path, output_file)
+        assert count == 4
+
+        # Historique antérieur au filigrane (l'horloge SQLite a une résolution d'une seconde)
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE components SET updated_date = '2000-01-01 00:00:00'")
+        conn.execute("UPDATE export_watermarks SET last_updated = '2000-01-02 00:00:00'")
+        conn.commit()
+        assert odoo.export_delta_to_odoo_csv(db_path, output_file)[0] == 0
+
+        # Modification: updated_date suit via trigger
+        conn.execute("UPDATE components SET name = 'Vis M6 inox' WHERE sku = ?", (skus[2],))
+        conn.commit()
+        conn.close()
+        skus.append(generator.generate_sku(Component(
+            name="Vis 5", description="Vis", domain="MECA",
+            component_type="BOULONNERIE", route="", routing=""
+        )))
+
+        # Un autre filigrane n'est pas affecté par les exports CSV
+        results, watermark = odoo.load_changes(db_path, "odoo_push")
+        assert len(results['Catalogue']) == 5 and watermark['last_id'] == 5
+
+        count, _ = odoo.export_delta_to_odoo_csv(db_path, output_file)
+        exported = pd.read_csv(output_file, sep=';')
+        assert count == 2
+        assert list(exported['default_code']) == [skus[2], skus[4]]
+        assert list(exported['name']) == ['Vis M6 inox', 'Vis 5']
+        print(f"   ✅ Export différentiel: {count} produits sur {len(skus)}")
+
+
+if __name__ == "__main__":
+    test_prepare_odoo_frame()
+    test_export_to_odoo_csv()
+    test_export_to_odoo_json_streaming()
+    test_validate_odoo_data()
+    test_delta_export()
+    print("\n🎉 Tests terminés avec succès!")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test de l'envoi JSON-RPC vers ODOO (serveur ODOO simulé en local)
+"""
+
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from odoo_integration import ODOOIntegration, ODOOPushClient, ODOOPushError
+from test_odoo_export import _example_results
+
+
+class FakeOdoo:
+    """État du serveur simulé: produits, catégories, pannes injectées"""
+
+    def __init__(self, failures=0, drop_after_create=0):
+        self.products = {}
+        self.categories = {'Composants Électroniques': 7}
+        self.failures = failures
+        # create appliqué puis connexion coupée avant la réponse
+        self.drop_after_create = drop_after_create
+        self.connections = 0
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def execute(self, model, method, args, kwargs):
+        if model == 'product.category' and method == 'search_read':
+            names = args[0][0][2]
+            return [{'id': self.categories[n], 'name': n} for n in names if n in self.categories]
+        if method == 'search_read':
+            codes = args[0][0][2]
+            fields = kwargs.get('fields') or ['id', 'default_code']
+            return [{field: p.get(field, False) for field in fields}
+                    for code, p in self.products.items() if code in codes]
+        if method == 'create':
+            ids = []
+            for values in args[0]:
+                product = dict(values, id=len(self.products) + 1)
+                self.products[values['default_code']] = product
+                ids.append(product['id'])
+            return ids
+        if method == 'write':
+            for product in self.products.values():
+                if product['id'] in args[0]:
+                    product.update(args[1])
+            return True
+        raise ValueError(f"Méthode inconnue: {model}.{method}")
+
+
+def _start_server(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            super().setup()
+            with state.lock:
+                state.connections += 1
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            params = request['params']
+            with state.lock:
+                if state.failures:
+                    state.failures -= 1
+                    self._reply(503, {})
+                    return
+                if params['service'] == 'common':
+                    state.calls.append(params['method'])
+                    result = 2 if params['args'][2] == 'secret' else False
+                    self._reply(200, {'jsonrpc': '2.0', 'id': request['id'], 'result': result})
+                    return
+                _, _, _, model, method, args, kwargs = params['args']
+                state.calls.append(method)
+                result = state.execute(model, method, args, kwargs)
+                if method == 'create' and state.drop_after_create:
+                    state.drop_after_create -= 1
+                    self.close_connection = True
+                    return
+            self._reply(200, {'jsonrpc': '2.0', 'id': request['id'], 'result': result})
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_push_products():
+    """Création puis mise à jour par default_code, lots parallèles, nouvelles tentatives"""
+    print("📤 Test de l'envoi JSON-RPC vers ODOO")
+    print("=" * 50)
+
+    state = FakeOdoo(failures=2)
+    server = _start_server(state)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        client = ODOOPushClient(url, 'test', 'admin', 'secret',
+                                batch_size=2, max_workers=2, backoff=0.01)
+        summary = ODOOIntegration().push_to_odoo(_example_results(), client=client)
+        assert summary['created'] == 3 and summary['updated'] == 0 and summary['failed'] == 0
+        assert summary['batches'] == 2
+
+        resist = state.products['ELEC-RESIST-AAAA']
+        assert resist['categ_id'] == 7
+        # Catégorie inconnue côté ODOO: champ omis plutôt qu'un identifiant invalide
+        assert 'categ_id' not in state.products['MECA-VISSER-AAAA']
+        print(f"   ✅ {summary['created']} produits créés malgré 2 réponses 503")
+
+        # Second envoi: mises à jour, aucune création en double
+        results = _example_results()
+        results['Mécanique'].loc[0, 'Name'] = 'Vis M6 inox'
+        summary = ODOOIntegration().push_to_odoo(results, client=client)
+        assert summary['created'] == 0 and summary['updated'] == 1 and summary['unchanged'] == 2
+        assert len(state.products) == 3
+        assert state.products['MECA-VISSER-AAAA']['name'] == 'Vis M6 inox'
+        # Produits déjà à jour: aucun write
+        assert state.calls.count('write') == 1
+
+        # Connexions persistantes: une par thread, pas une par requête
+        assert state.connections <= 3, state.connections
+        print(f"   ✅ Mise à jour idempotente, {len(state.calls)} appels sur {state.connections} connexions")
+
+        # Fermeture: connexions des threads du pool comprises
+        connections = list(client._connections)
+        assert len(connections) >= 2 and client.open_connections >= 2
+        client.close()
+        assert client.open_connections == 0
+        assert all(conn.sock is None for conn in connections)
+        print(f"   ✅ {len(connections)} connexions fermées à l'arrêt du pool")
+
+        # Mauvais mot de passe
+        try:
+            ODOOPushClient(url, 'test', 'admin', 'wrong', backoff=0.01).login()
+            assert False, "Authentification invalide acceptée"
+        except ODOOPushError as e:
+            print(f"   ✅ Erreur d'authentification: {e}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_lost_create_response():
+    """Réponse perdue après un create appliqué: aucun doublon; mises à jour groupées"""
+    print("\n🔌 Test d'une connexion coupée après création")
+    print("=" * 50)
+
+    state = FakeOdoo(drop_after_create=1)
+    server = _start_server(state)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with ODOOPushClient(url, 'test', 'admin', 'secret', batch_size=10, max_workers=1, backoff=0.01) as client:
+            summary = ODOOIntegration().push_to_odoo(_example_results(), client=client)
+            assert summary['failed'] == 0 and summary['created'] == 3, summary
+            # Le create n'est pas rejoué: les codes sont recherchés et tous trouvés
+            assert state.drop_after_create == 0, "La connexion doit avoir été coupée"
+            assert state.calls.count('create') == 1, state.calls
+            assert len(state.products) == 3
+            print("   ✅ Create non rejoué, aucun produit en double")
+
+            # Même valeur pour plusieurs produits: un seul write
+            products = [{'default_code': code, 'active': False} for code in sorted(state.products)]
+            writes = state.calls.count('write')
+            counts = client._push_batch(products)
+            assert counts == {'created': 0, 'updated': 3, 'unchanged': 0}
+            assert state.calls.count('write') == writes + 1
+            assert not any(product['active'] for product in state.products.values())
+            print("   ✅ 3 mises à jour identiques en un seul write")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    test_push_products()
+    test_lost_create_response()
+    print("\n🎉 Test terminé avec succès!")
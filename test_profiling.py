@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test du mode profilage (artefact cProfile + trace SQL)
+"""
+
+import json
+import os
+import sys
+import tempfile
+import zipfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import instrumentation
+from profiling import ProfileSession, profiled
+from sku_generator import Component, SKUGenerator
+
+
+def test_profile_session():
+    """Dossier horodaté avec profil, trace SQL, étapes et métadonnées"""
+    print("🔬 Test du mode profilage")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = SKUGenerator(os.path.join(tmp, "profil.db"))
+        component = Component(name="R1", description="Résistance 10k", domain="ELEC",
+                              component_type="Résistances", route="", routing="",
+                              manufacturer="Vishay", manufacturer_part="PN1")
+
+        with ProfileSession("generation test", output_dir=os.path.join(tmp, "profiles")) as session:
+            generator.generate_sku(component)
+
+        # L'instrumentation revient à son état précédent
+        assert not instrumentation.is_enabled()
+
+        files = sorted(os.listdir(session.directory))
+        assert files == ['instrumentation.json', 'meta.json', 'profile.prof', 'profile.txt', 'sql_trace.log']
+        assert os.path.basename(session.directory).endswith("_generation_test")
+
+        with open(os.path.join(session.directory, "sql_trace.log"), encoding='utf-8') as f:
+            trace = f.read().splitlines()
+        assert any("INSERT INTO components" in line for line in trace)
+        assert all(len(line.split('\t')) == 3 for line in trace)
+
+        with open(os.path.join(session.directory, "meta.json"), encoding='utf-8') as f:
+            meta = json.load(f)
+        assert meta['tache'] == "generation test" and meta['erreur'] is None
+        assert meta['requetes_sql'] == len(trace)
+        with open(os.path.join(session.directory, "profile.txt"), encoding='utf-8') as f:
+            assert "generate_sku" in f.read()
+
+        with zipfile.ZipFile(session.archive_path) as archive:
+            assert "profile.prof" in archive.namelist()
+
+        # Erreur dans la tâche: profil quand même écrit, exception propagée
+        try:
+            with ProfileSession("echec", output_dir=os.path.join(tmp, "profiles"), archive=False) as failed:
+                raise RuntimeError("BOM illisible")
+        except RuntimeError:
+            pass
+        with open(os.path.join(failed.directory, "meta.json"), encoding='utf-8') as f:
+            assert json.load(f)['erreur'] == "RuntimeError: BOM illisible"
+
+        with profiled("inactif", False) as nothing:
+            assert nothing is None
+        print("   ✅ Artefact de profilage complet")
+
+
+if __name__ == "__main__":
+    test_profile_session()
+    print("\n🎉 Test terminé avec succès!")
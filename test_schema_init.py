@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test de l'initialisation unique du schéma (registre par processus + PRAGMA user_version)
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import instrumentation
+import sku_generator
+from sku_generator import SCHEMA_VERSION, Component, SKUGenerator, forget_schema
+
+
+class _Statements:
+    """Requêtes SQL exécutées pendant le bloc with"""
+
+    def __enter__(self):
+        self.statements = []
+        instrumentation.recorder.add_statement_listener(self.statements.append)
+        return self
+
+    def __exit__(self, *exc_info):
+        instrumentation.recorder.remove_statement_listener(self.statements.append)
+        return False
+
+    def ddl(self):
+        return [s for s in self.statements if s.lstrip().upper().startswith(('CREATE', 'PRAGMA USER_VERSION ='))]
+
+
+def test_schema_created_once():
+    """Première construction: schéma complet; suivantes: aucune requête"""
+    print("🏗️ Test de l'initialisation unique du schéma")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "schema.db")
+
+        with _Statements() as first:
+            generator = SKUGenerator(db_path)
+        assert first.ddl(), "Le schéma doit être créé à la première construction"
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        conn.close()
+        assert {'components', 'sku_counters_simplified', 'component_stats', 'export_watermarks'} <= tables
+
+        with _Statements() as again:
+            for _ in range(50):
+                SKUGenerator(db_path)
+        assert again.statements == [], again.statements
+        print("✅ 50 constructions sans aucune requête")
+
+        with _Statements() as allocation:
+            generator.generate_sku(Component("R1", "Résistance 10k", "ELEC", "Résistances", "", ""))
+            generator.get_next_sequence_simplified("ELEC", "RESIST")
+        assert allocation.ddl() == [], allocation.ddl()
+        print("✅ Allocation de séquences sans DDL")
+
+        # Autre processus (registre vide): user_version suffit, pas de DDL
+        forget_schema(db_path)
+        with _Statements() as other_process:
+            SKUGenerator(db_path)
+        assert other_process.ddl() == []
+        assert [s.split()[0].upper() for s in other_process.statements] == ['PRAGMA']
+        print("✅ Base à jour: une seule lecture de user_version")
+
+
+def test_schema_upgrade_and_memory():
+    """Base d'une version antérieure mise à jour; ':memory:' jamais mémorisée"""
+    print("\n⬆️ Test de la mise à jour du schéma")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "ancienne.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE components (id INTEGER PRIMARY KEY AUTOINCREMENT, sku TEXT UNIQUE NOT NULL, "
+                     "name TEXT NOT NULL, description TEXT, domain TEXT NOT NULL, component_type TEXT, "
+                     "route TEXT, routing TEXT, manufacturer TEXT, manufacturer_part TEXT, "
+                     "component_hash TEXT UNIQUE, created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP, "
+                     "updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+        conn.execute("INSERT INTO components (sku, name, domain) VALUES ('ELEC-RESIST-AAAA', 'R1', 'ELEC')")
+        conn.commit()
+        conn.close()
+
+        SKUGenerator(db_path)
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        # Statistiques reconstruites à partir des composants existants
+        assert conn.execute("SELECT count FROM component_stats WHERE dimension = 'total'").fetchone()[0] == 1
+        conn.close()
+        print(f"✅ Base v0 passée en v{SCHEMA_VERSION}")
+
+    SKUGenerator(":memory:")
+    assert ":memory:" not in {os.path.basename(path) for path in sku_generator._schema_registry}
+    print("✅ ':memory:' hors du registre")
+
+
+if __name__ == "__main__":
+    test_schema_created_once()
+    test_schema_upgrade_and_memory()
+    print("\n🎉 Tous les tests du schéma sont passés")
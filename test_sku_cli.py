@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test de l'interface en ligne de commande (sku_cli.py)
+"""
+
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+from contextlib import redirect_stderr
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks import SyntheticBOMSpec, write_synthetic_bom
+from bom_cache import bom_cache
+import instrumentation
+from sku_cli import run
+
+
+def _run(*argv, stdin_text=None):
+    """Exécuter une commande: (code, résultat JSON, lignes de progression)"""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    previous_stdin = sys.stdin
+    if stdin_text is not None:
+        sys.stdin = io.StringIO(stdin_text)
+    try:
+        with redirect_stderr(stderr):
+            code = run(list(argv), stdout=stdout)
+    finally:
+        sys.stdin = previous_stdin
+    return code, json.loads(stdout.getvalue()), stderr.getvalue().splitlines()
+
+
+def test_cli_workflow():
+    """analyze -> generate -> search -> decode -> export-odoo -> stats sur une même base"""
+    print("💻 Test de la ligne de commande")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bom_file = os.path.join(tmp, "BOM_test.xlsx")
+        write_synthetic_bom(bom_file, SyntheticBOMSpec(rows=120, duplicate_ratio=0.0))
+        bom_cache.clear()
+        db = ["--db", os.path.join(tmp, "cli.db")]
+
+        code, result, _ = _run(*db, "--progress", "none", "analyze", bom_file)
+        assert code == 0 and result['nouveau'] == 120 and result['existant'] == 0, result
+        print(f"✅ analyze: {result['nouveau']} nouveaux")
+
+        # Progression JSON en flux sur stderr, un événement par lot
+        code, result, events = _run(*db, "--progress", "json", "generate", bom_file,
+                                    "--format", "excel", "--format", "odoo_delta_csv",
+                                    "--output-dir", os.path.join(tmp, "out"), "--include-skus")
+        assert code == 0, result
+        assert result['composants'] == 120 and result['nouveaux_sku'] == 120
+        outputs = result['fichiers'][0]['sorties']
+        assert os.path.exists(outputs['excel']['fichier'])
+        assert outputs['odoo_delta_csv']['lignes'] == 120
+        events = [json.loads(line) for line in events]
+        generation = [event for event in events if event['evenement'] == 'generation']
+        assert generation and generation[-1]['faits'] == generation[-1]['total'] == 120
+        sku = result['fichiers'][0]['skus']['Électrique'][0]['SKU']
+        print(f"✅ generate: {result['composants']} SKU, {len(events)} événements de progression")
+
+        # Rien de nouveau au second passage
+        code, result, _ = _run(*db, "--progress", "none", "generate", bom_file, "--only-new",
+                               "--domain", "ELEC", "--output-dir", os.path.join(tmp, "out"))
+        assert code == 0 and result['composants'] == 0, result
+        print("✅ generate --only-new: aucun composant")
+
+        code, result, _ = _run(*db, "--progress", "none", "search", sku[:8])
+        assert any(entry['sku'] == sku for entry in result['resultats']), result
+        print(f"✅ search: {len(result['resultats'])} résultat(s)")
+
+        code, result, _ = _run(*db, "--progress", "none", "decode", "-", stdin_text=f"{sku}\nINVALIDE\n")
+        assert result['skus'][0]['famille_code'] == 'ELEC'
+        assert result['skus'][1]['format'] == 'invalide' and result['invalides'] == 1
+        print("✅ decode: SKU lus sur stdin")
+
+        json_file = os.path.join(tmp, "odoo.json")
+        code, result, _ = _run(*db, "--progress", "none", "export-odoo", outputs['excel']['fichier'],
+                               "--format", "json", "--output", json_file)
+        assert code == 0 and result['produits'] == 120 and os.path.exists(json_file), result
+        print("✅ export-odoo: JSON écrit")
+
+        handlers = list(logging.getLogger().handlers)
+        code, result, _ = _run(*db, "--progress", "none", "--timings", "stats")
+        assert result['total'] == 120 and 'instrumentation' in result, result
+        # Appel en processus: journalisation et instrumentation de l'appelant inchangées
+        assert logging.getLogger().handlers == handlers
+        assert not instrumentation.is_enabled()
+        print(f"✅ stats: {result['total']} composants")
+
+
+def test_cli_errors():
+    """Fichier introuvable ou options incohérentes: code 2 et erreur dans le JSON"""
+    print("\n🚫 Test des erreurs d'utilisation")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = ["--db", os.path.join(tmp, "cli.db")]
+        code, result, _ = _run(*db, "--progress", "none", "analyze", os.path.join(tmp, "absent.xlsx"))
+        assert code == 2 and 'introuvable' in result['erreur'], result
+
+        code, result, _ = _run(*db, "--progress", "none", "export-odoo")
+        assert code == 2 and result['commande'] == 'export-odoo', result
+    print("✅ Erreurs rapportées en JSON avec le code 2")
+
+
+if __name__ == "__main__":
+    test_cli_workflow()
+    test_cli_errors()
+    print("\n🎉 Tous les tests de la ligne de commande sont passés")
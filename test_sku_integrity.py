@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test de l'analyse d'intégrité des compteurs SKU
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sku_generator import SKUGenerator, Component
+from sku_integrity import analyze_counters, repair_counters
+
+
+def test_counter_integrity():
+    """Dérive, lacunes et réparation des compteurs"""
+    print("🔎 Test d'intégrité des compteurs")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "integrity.db")
+        generator = SKUGenerator(db_path)
+
+        skus = []
+        for i in range(5):
+            skus.append(generator.generate_sku(Component(
+                name=f"Vis {i}", description="Vis", domain="MECA",
+                component_type="BOULONNERIE", route="", routing=""
+            )))
+
+        # Aperçu sans sauvegarde: compteur consommé pour rien
+        generator.get_next_sequence_simplified("MECA", "VISSER")
+        generator.get_next_sequence_simplified("ELEC", "RESIST")
+
+        # Suppression d'un composant: lacune dans la séquence
+        conn = sqlite3.connect(db_path)
+        conn.execute("DELETE FROM components WHERE sku = ?", (skus[1],))
+        conn.commit()
+        conn.close()
+
+        result = analyze_counters(db_path)
+        report = result['rapport'].set_index(['famille', 'sous_famille'])
+        print(result['rapport'].to_string(index=False))
+
+        visser = report.loc[('MECA', 'VISSER')]
+        assert result['skus_analyses'] == 4
+        assert visser['sequence_max'] == 5
+        assert visser['lacunes'] == 1
+        assert visser['premieres_lacunes'] == "2"
+        assert visser['compteur'] == 6
+        assert visser['derive'] == 1
+        assert report.loc[('ELEC', 'RESIST')]['skus'] == 0
+
+        # Réparation par défaut: les compteurs en avance ne sont jamais ramenés
+        assert repair_counters(db_path) == 0
+        assert generator.get_next_sequence_simplified("MECA", "VISSER") == 7
+
+        # Compteur en retard (ex: base restaurée): remonté sur la plus grande séquence stockée
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE sku_counters_simplified SET counter = 2 WHERE sous_famille = 'VISSER'")
+        conn.commit()
+        conn.close()
+        assert repair_counters(db_path) == 1
+        assert generator.get_next_sequence_simplified("MECA", "VISSER") == 6
+
+        # Écrivain actif: la réparation attend son commit au lieu de lire un état périmé
+        writer = sqlite3.connect(db_path)
+        writer.execute("BEGIN IMMEDIATE")
+        writer.execute("UPDATE sku_counters_simplified SET counter = 1 WHERE sous_famille = 'VISSER'")
+        repaired = []
+        thread = threading.Thread(target=lambda: repaired.append(repair_counters(db_path)))
+        thread.start()
+        time.sleep(0.3)
+        assert thread.is_alive(), "La réparation doit attendre le verrou d'écriture"
+        writer.commit()
+        writer.close()
+        thread.join()
+        assert repaired == [1]
+        assert generator.get_next_sequence_simplified("MECA", "VISSER") == 6
+
+        # Réalignement complet explicite: compteurs ramenés, orphelins supprimés
+        assert repair_counters(db_path, rewind=True) == 2
+        report = analyze_counters(db_path)['rapport']
+        assert (report['derive'] == 0).all()
+        assert list(report['sous_famille']) == ['VISSER']
+
+        # La prochaine allocation reprend juste après la plus grande séquence stockée
+        assert generator.get_next_sequence_simplified("MECA", "VISSER") == 6
+        print("   ✅ Compteurs réalignés")
+
+
+if __name__ == "__main__":
+    test_counter_integrity()
+    print("\n🎉 Test terminé avec succès!")
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Test du journal des allocations (écriture, reprise après incident, réplique)
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import db_backup
+import sku_journal
+from config import JOURNAL_CONFIG
+from db_backup import BackupManager, create_snapshot, restore_snapshot
+from sku_generator import Component, SKUGenerator, forget_schema
+from sku_integrity import repair_counters
+from sku_journal import ReplicaTailer, SKUJournal, read_header, read_records, replay, unused_allocations
+
+
+def _component(i: int) -> Component:
+    return Component(f"R{i}", f"Résistance {i}k 0603", "ELEC", "Résistances", "Yageo", f"RC0603-{i}")
+
+
+def _contents(db_path: str):
+    conn = sqlite3.connect(db_path)
+    try:
+        components = conn.execute("SELECT sku, name, component_hash FROM components ORDER BY sku").fetchall()
+        counters = conn.execute("SELECT famille, sous_famille, counter FROM sku_counters_simplified "
+                                "ORDER BY famille, sous_famille").fetchall()
+        legacy = conn.execute("SELECT domain, route, routing, type_code, counter FROM sku_counters "
+                              "ORDER BY domain, route, routing, type_code").fetchall()
+    finally:
+        conn.close()
+    return components, counters + legacy
+
+
+def _epoch(db_path: str) -> str:
+    conn = sqlite3.connect(db_path)
+    try:
+        return sku_journal.read_epoch(conn)
+    finally:
+        conn.close()
+
+
+def test_journal_records():
+    """En-tête d'époque, une ligne par allocation et par insertion, fsync groupé"""
+    print("📓 Test de l'écriture du journal")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "sku.db")
+        generator = SKUGenerator(db_path)
+        journal = sku_journal.enable_journal(db_path, fsync_every=4, fsync_interval=0)
+        assert journal is not None and journal.path == os.path.join(tmp, "journal", "sku.jsonl")
+        try:
+            skus = [generator.generate_sku(_component(i)) for i in range(5)]
+            # Composant déjà connu: rien de journalisé
+            generator.generate_sku(_component(0))
+            # Aperçu: séquence consommée sans composant
+            preview = generator.get_next_sequence_simplified("ELEC", "RESIST")
+            assert journal.records_written == 12
+            assert journal.syncs == 3
+        finally:
+            sku_journal.disable_journal(db_path)
+        assert journal.syncs == 4, "Les lignes en attente sont écrites à la fermeture"
+
+        records, position, invalid = read_records(journal.path)
+        assert invalid == 0 and position == os.path.getsize(journal.path)
+        assert [r['op'] for r in records[:3]] == ['epoch', 'alloc', 'insert']
+        assert records[0]['epoch'] == _epoch(db_path)
+        assert [r['component']['sku'] for r in records if r['op'] == 'insert'] == skus
+
+        unused = unused_allocations(journal.path)
+        assert [(r['famille'], r['sous_famille'], r['counter']) for r in unused] == [("ELEC", "RESIST", preview)]
+
+        # Sans journal actif: aucun fichier touché
+        generator.generate_sku(_component(10))
+        assert len(read_records(journal.path)[0]) == 12
+    print("✅ 12 lignes, 4 fsync, allocation d'aperçu repérée")
+
+
+def test_torn_line_recovery():
+    """Ligne tronquée par un arrêt brutal: ignorée, la suivante reste lisible"""
+    print("\n✂️ Test d'une ligne tronquée")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "journal.jsonl")
+        journal = SKUJournal(path, fsync_interval=0)
+        journal.allocation("ELEC", "RESIST", 1)
+        journal.close()
+        with open(path, 'ab') as f:
+            f.write(b'{"op":"alloc","famille":"EL')
+
+        records, position, _ = read_records(path)
+        assert len(records) == 1 and position < os.path.getsize(path)
+
+        journal = SKUJournal(path, fsync_interval=0)
+        journal.allocation("ELEC", "RESIST", 2)
+        journal.close()
+        records, _, invalid = read_records(path)
+        assert [r['counter'] for r in records] == [1, 2] and invalid == 1
+    print("✅ Ligne tronquée isolée, écriture reprise")
+
+
+def test_recovery_from_backup_and_journal():
+    """Base perdue: sauvegarde restaurée puis journal rejoué, aucun SKU réattribué"""
+    print("\n🚑 Test de la reprise")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "sku.db")
+        generator = SKUGenerator(db_path)
+        journal = sku_journal.enable_journal(db_path, fsync_interval=0)
+        try:
+            for i in range(3):
+                generator.generate_sku(_component(i))
+            snapshot = create_snapshot(db_path)
+            for i in range(3, 8):
+                generator.generate_sku(_component(i))
+            generator.get_next_sequence_simplified("ELEC", "RESIST")
+        finally:
+            sku_journal.disable_journal(db_path)
+        expected = _contents(db_path)
+
+        restore_snapshot(snapshot, db_path, safety_backup=False)
+        assert len(_contents(db_path)[0]) == 3
+
+        stats = replay(journal.path, db_path)
+        assert stats['composants_ajoutes'] == 5 and stats['composants_existants'] == 3, stats
+        assert _contents(db_path) == expected
+        assert replay(journal.path, db_path)['composants_ajoutes'] == 0
+        assert _contents(db_path) == expected
+
+        # Le compteur rejoué inclut la séquence d'aperçu
+        next_sku = SKUGenerator(db_path).generate_sku(_component(8))
+        assert next_sku not in {sku for sku, _, _ in expected[0]}
+        assert next_sku.endswith(SKUGenerator(db_path).format_sequence(expected[1][0][2] + 1))
+    print(f"✅ {stats['composants_ajoutes']} composants rejoués, rejeu idempotent")
+
+
+def test_replica_tailer():
+    """Réplique tenue à jour au fil du journal"""
+    print("\n🔁 Test de la réplique")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "sku.db")
+        replica_path = os.path.join(tmp, "replique", "sku_replique.db")
+        os.makedirs(os.path.dirname(replica_path))
+        generator = SKUGenerator(db_path)
+        journal = sku_journal.enable_journal(db_path, fsync_interval=0)
+        try:
+            for i in range(4):
+                generator.generate_sku(_component(i))
+
+            tailer = ReplicaTailer(journal.path, replica_path, poll_interval=0.05)
+            stats = tailer.catch_up()
+            assert stats['composants_ajoutes'] == 4
+            assert _contents(replica_path) == _contents(db_path)
+            assert tailer.catch_up()['composants_ajoutes'] == 0
+
+            thread = threading.Thread(target=tailer.run)
+            thread.start()
+            try:
+                later = [generator.generate_sku(_component(i)) for i in range(4, 10)]
+                deadline = time.time() + 5
+                while time.time() < deadline and tailer.position < os.path.getsize(journal.path):
+                    time.sleep(0.05)
+            finally:
+                tailer.stop()
+                thread.join()
+        finally:
+            sku_journal.disable_journal(db_path)
+
+        assert _contents(replica_path) == _contents(db_path)
+        assert SKUGenerator(replica_path).search_component_by_sku(later[-1]) is not None
+
+        # Position conservée d'une instance à l'autre
+        assert ReplicaTailer(journal.path, replica_path).position == os.path.getsize(journal.path)
+    print("✅ Réplique identique à la base principale")
+
+
+def test_journal_seeded_with_counter_rewrites():
+    """Journal ouvert sur une base existante, compteurs réécrits et ancien format journalisés"""
+    print("\n🌱 Test de l'instantané initial et des réécritures de compteurs")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "sku.db")
+        generator = SKUGenerator(db_path)
+        for i in range(3):
+            generator.generate_sku(_component(i))
+        generator.get_next_sequence("ELECTRIQUE", "", "", "RES")
+
+        journal = sku_journal.enable_journal(db_path, fsync_interval=0)
+        try:
+            # Instantané: la base existante est entièrement dans le journal
+            records, _, _ = read_records(journal.path)
+            assert [r['op'] for r in records] == ['epoch'] + ['insert'] * 3 + ['alloc', 'alloc_legacy']
+
+            generator.get_next_sequence_simplified("ELEC", "RESIST")
+            generator.get_next_sequence_simplified("MECA", "VISSER")
+            generator.get_next_sequence("ELECTRIQUE", "", "", "RES")
+            assert repair_counters(db_path, rewind=True) == 2
+        finally:
+            sku_journal.disable_journal(db_path)
+
+        records, _, _ = read_records(journal.path)
+        assert [(r['famille'], r['counter']) for r in records if r['op'] == 'counter'] == [("ELEC", 3), ("MECA", None)]
+        assert records[-3]['op'] == 'alloc_legacy' and records[-3]['counter'] == 2
+
+        # Rejeu complet dans une base vide: même contenu, compteurs ramenés compris
+        rebuilt = os.path.join(tmp, "reconstruite.db")
+        stats = replay(journal.path, rebuilt)
+        assert stats['composants_ajoutes'] == 3
+        assert _contents(rebuilt) == _contents(db_path)
+        assert _epoch(rebuilt) == _epoch(db_path)
+    print("✅ Base reconstruite depuis le seul journal")
+
+
+def test_reset_archives_journal_and_resyncs_replica():
+    """Base réinitialisée: journal archivé, rejeu croisé refusé, réplique reconstruite"""
+    print("\n🧹 Test de la réinitialisation")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "sku.db")
+        replica_path = os.path.join(tmp, "sku_replique.db")
+        generator = SKUGenerator(db_path)
+        journal = sku_journal.enable_journal(db_path, fsync_interval=0)
+        before = generator.generate_sku(_component(1))
+        tailer = ReplicaTailer(journal.path, replica_path)
+        tailer.catch_up()
+
+        # Comme reset_database.py: sauvegarde, journal archivé puis base recréée
+        snapshot = create_snapshot(db_path)
+        archived = sku_journal.archive_journal(db_path)
+        assert archived and not os.path.exists(journal.path)
+        assert tailer.catch_up()['composants_ajoutes'] == 0, "Journal absent: réplique inchangée"
+        os.remove(db_path)
+        forget_schema(db_path)
+
+        generator = SKUGenerator(db_path)
+        journal = sku_journal.enable_journal(db_path, fsync_interval=0)
+        try:
+            after = generator.generate_sku(_component(2))
+        finally:
+            sku_journal.disable_journal(db_path)
+        assert after == before, "Même SKU réattribué dans le nouveau catalogue"
+
+        stats = tailer.catch_up()
+        assert stats['resynchronisation'] == 1
+        assert _contents(replica_path) == _contents(db_path)
+        assert SKUGenerator(replica_path).search_component_by_sku(after)['nom'] == "R2"
+        assert tailer.epoch == read_header(journal.path)['epoch'] == _epoch(db_path)
+        assert tailer.catch_up()['resynchronisation'] == 0
+
+        # Journal de l'ancien catalogue: rejeu refusé dans la nouvelle base
+        try:
+            replay(archived, db_path)
+            raise AssertionError("Un journal d'une autre époque doit être refusé")
+        except ValueError:
+            pass
+        assert len(_contents(db_path)[0]) == 1
+
+        # Base supprimée sans reset_database.py: le journal périmé est archivé à l'ouverture
+        restore_snapshot(snapshot, db_path, safety_backup=False)
+        forget_schema(db_path)
+        journal = sku_journal.enable_journal(db_path, fsync_interval=0)
+        sku_journal.disable_journal(db_path)
+        assert read_header(journal.path)['epoch'] == _epoch(db_path) != tailer.epoch
+        assert len([f for f in os.listdir(os.path.dirname(journal.path)) if f.startswith("sku.")]) == 3
+        tailer.catch_up()
+        assert _contents(replica_path) == _contents(db_path)
+        assert SKUGenerator(replica_path).search_component_by_sku(before)['nom'] == "R1"
+    print("✅ Journal archivé, réplique reconstruite sur le nouveau catalogue")
+
+
+def _archives(journal_path: str):
+    directory = os.path.dirname(journal_path)
+    return sorted(name for name in os.listdir(directory) if name != os.path.basename(journal_path))
+
+
+def test_rotation_after_backup_and_size():
+    """Journal recommencé après chaque sauvegarde et au-delà de max_bytes, réplique suivie"""
+    print("\n🔄 Test de la rotation du journal")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "sku.db")
+        replica_path = os.path.join(tmp, "sku_replique.db")
+        generator = SKUGenerator(db_path)
+        journal = sku_journal.enable_journal(db_path, fsync_interval=0)
+        manager = BackupManager(db_path, interval=5, schedule_minutes=0)
+        db_backup._managers[os.path.abspath(db_path)] = manager
+        try:
+            tailer = ReplicaTailer(journal.path, replica_path)
+            for i in range(4):
+                generator.generate_sku(_component(i))
+            tailer.catch_up()
+            first_id = read_header(journal.path)['id']
+
+            # 5e insertion: sauvegarde puis journal recommencé depuis un instantané
+            generator.generate_sku(_component(4))
+            assert manager.wait(10) and manager.snapshots_taken == 1
+            assert len(_archives(journal.path)) == 1
+            records, _, _ = read_records(journal.path)
+            assert records[0]['id'] != first_id
+            assert [r['op'] for r in records] == ['epoch'] + ['insert'] * 5 + ['alloc']
+
+            # Nouveau fichier plus long que la position de la réplique: reconstruite, pas relue au milieu
+            for i in range(5, 9):
+                generator.generate_sku(_component(i))
+            assert os.path.getsize(journal.path) > tailer.position
+            assert tailer.catch_up()['resynchronisation'] == 1
+            assert _contents(replica_path) == _contents(db_path)
+
+            # Taille dépassée: rotation en arrière-plan, archives élaguées
+            previous = dict(JOURNAL_CONFIG)
+            JOURNAL_CONFIG.update(max_bytes=1, archive_keep=2)
+            try:
+                for i in range(9, 12):
+                    generator.generate_sku(_component(i))
+                    deadline = time.time() + 5
+                    while time.time() < deadline and sku_journal._rotations:
+                        time.sleep(0.02)
+            finally:
+                JOURNAL_CONFIG.clear()
+                JOURNAL_CONFIG.update(previous)
+            assert len(_archives(journal.path)) == 2
+        finally:
+            db_backup.disable_auto_backup(db_path)
+            sku_journal.disable_journal(db_path)
+
+        # Le journal courant suffit à reconstruire la base
+        rebuilt = os.path.join(tmp, "reconstruite.db")
+        replay(journal.path, rebuilt)
+        assert _contents(rebuilt) == _contents(db_path)
+        tailer.catch_up()
+        assert _contents(replica_path) == _contents(db_path)
+    print("✅ Journal recommencé, archives limitées, réplique reconstruite")
+
+
+if __name__ == "__main__":
+    test_journal_records()
+    test_torn_line_recovery()
+    test_recovery_from_backup_and_journal()
+    test_replica_tailer()
+    test_journal_seeded_with_counter_rewrites()
+    test_reset_archives_journal_and_resyncs_replica()
+    test_rotation_after_backup_and_size()
+    print("\n🎉 Tous les tests du journal sont passés")
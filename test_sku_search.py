@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test de l'index de recherche incrémentale des SKU
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sku_generator import SKUGenerator
+from sku_search import SKUSearchIndex
+
+
+def _populate(db_path: str, count: int):
+    """Remplir une base de test avec un grand catalogue synthétique"""
+    generator = SKUGenerator(db_path)
+    conn = sqlite3.connect(db_path)
+    rows = []
+    for i in range(count):
+        famille = "ELEC" if i % 2 == 0 else "MECA"
+        sous_famille = ("RESIST", "CONDEN", "VISSER", "PLIAGE")[i % 4]
+        sku = f"{famille}-{sous_famille}-{generator.format_sequence(i + 1)}"
+        rows.append((sku, f"Composant {i}", famille, f"hash{i}"))
+    conn.executemany(
+        "INSERT INTO components (sku, name, domain, component_hash) VALUES (?, ?, ?, ?)", rows
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_live_search_index():
+    """Recherche par préfixe, sous-chaîne, cache et rafraîchissement"""
+    print("🔎 Test de l'index de recherche incrémentale")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "search.db")
+        _populate(db_path, 50000)
+
+        index = SKUSearchIndex(db_path)
+        start = time.perf_counter()
+        index.ensure_loaded()
+        print(f"   Chargement: {len(index)} SKU en {(time.perf_counter() - start) * 1000:.1f} ms")
+        assert len(index) == 50000
+
+        # Préfixe: résultats triés et bornés
+        start = time.perf_counter()
+        results = index.search("ELEC-RES", limit=10)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"   Préfixe 'ELEC-RES': {len(results)} résultats en {elapsed_ms:.2f} ms")
+        assert len(results) == 10
+        assert all(r['sku'].startswith("ELEC-RESIST-") for r in results)
+        assert [r['sku'] for r in results] == sorted(r['sku'] for r in results)
+        assert elapsed_ms < 50
+
+        # Cache: même objet retourné
+        assert index.search_prefix("ELEC-RES", limit=10) is index.search_prefix("elec-res", limit=10)
+
+        # Sous-chaîne quand aucun préfixe ne correspond
+        results = index.search("RESIST-AAA", limit=5)
+        assert results and all("RESIST-AAA" in r['sku'] for r in results)
+
+        # Annulation d'une recherche périmée
+        assert index.search_substring("ZZZZZZ", is_cancelled=lambda: True) is None
+
+        # Nouvelles insertions détectées automatiquement
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO components (sku, name, domain, component_hash) "
+                     "VALUES ('PACK-BOITE-AAAA', 'Boîte', 'MECA', 'hashpack')")
+        conn.commit()
+        conn.close()
+        results = index.search("PACK-")
+        assert [r['sku'] for r in results] == ['PACK-BOITE-AAAA']
+        print("   ✅ Nouvelles insertions visibles sans rechargement manuel")
+
+
+if __name__ == "__main__":
+    test_live_search_index()
+    print("\n🎉 Test terminé avec succès!")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test de l'encodage base 29 des séquences SKU
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sku_sequence import (
+    BASE, capacity, decode_sequence, decode_sequences, encode_sequence, encode_sequences
+)
+
+
+def test_sequence_roundtrip():
+    """Encodage/décodage unitaire et vectorisé, croissance de largeur"""
+    print("🔢 Test des séquences base 29")
+    print("=" * 50)
+
+    # Codes historiques inchangés
+    assert encode_sequence(1) == "AAAA"
+    assert encode_sequence(2) == "AAAB"
+    assert encode_sequence(BASE) == "AAA9"
+    assert encode_sequence(capacity(4)) == "9999"
+    assert encode_sequence(0) == "2222"
+
+    # Croissance au lieu de boucler après 29^4 séquences
+    assert encode_sequence(capacity(4) + 1) == "BAAAA"
+    assert decode_sequence("BAAAA") == capacity(4) + 1
+    print(f"   {capacity(4)} → 9999, {capacity(4) + 1} → BAAAA")
+
+    # Capacité maximale configurable
+    try:
+        encode_sequence(capacity(5) + 1, max_width=5)
+        assert False, "Dépassement non détecté"
+    except ValueError as e:
+        print(f"   ✅ Dépassement détecté: {e}")
+
+    # Aller-retour vectorisé, toutes largeurs confondues
+    sequences = np.concatenate([np.arange(1, 50000), [capacity(4), capacity(4) + 1, capacity(5) + 7]])
+    codes = encode_sequences(sequences)
+    assert [encode_sequence(int(s)) for s in sequences[:100]] == list(codes[:100])
+    assert (decode_sequences(codes) == sequences).all()
+    print(f"   ✅ Aller-retour vectorisé sur {len(sequences)} séquences")
+
+    # Codes invalides ou non canoniques
+    assert list(decode_sequences(["AIAA", "", None, "AAA", "AAAAA"])) == [-1, -1, -1, -1, -1]
+    for code in ("AIAA", "AAAAA"):
+        try:
+            decode_sequence(code)
+            assert False, f"Code invalide accepté: {code}"
+        except ValueError:
+            pass
+
+
+if __name__ == "__main__":
+    test_sequence_roundtrip()
+    print("\n🎉 Test terminé avec succès!")
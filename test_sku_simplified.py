@@ -128,6 +128,37 @@ def test_backward_compatibility():
     else:
         print(f"❌ Erreur décodage nouveau format")
 
+def test_decode_many():
+    """Test du décodage vectorisé d'une colonne de SKU"""
+    print("\n📚 Test du décodage en lot (decode_many)")
+    print("=" * 50)
+
+    generator = SKUGenerator("test_sku_simplified.db")
+
+    skus = [
+        "ELEC-RESIST-2222",
+        "MECA-VISSER-AAAB",
+        "ELEC-ASS-ASM-PLIAGE-AAAA",
+        "INVALIDE",
+        "A-B-C-D"
+    ]
+    decoded = generator.decode_many(skus)
+
+    # Même contrat que decode_sku_parts pour chaque SKU
+    for position, sku in enumerate(skus):
+        expected = generator.decode_sku_parts(sku)
+        row = decoded.iloc[position]
+        for key, value in expected.items():
+            assert row[key] == value, f"{sku}: {key} = {row[key]} au lieu de {value}"
+        print(f"✅ {sku:<26} → {row['format']}")
+
+    # Les tables inverses ne sont reconstruites qu'au changement de version
+    reverse = generator._get_reverse_mappings()
+    assert generator._get_reverse_mappings() is reverse
+    generator.type_mapping["Capteurs"] = "CAPTER"
+    generator.invalidate_mappings()
+    assert generator.decode_sku_parts("ELEC-CAPTER-2222")['sous_famille_nom'] == "Capteurs"
+
 if __name__ == "__main__":
     print("🚀 Test du générateur SKU simplifié")
     print("Nouveau format : FAMILLE-SOUS_FAMILLE-SEQUENCE")
@@ -136,6 +167,7 @@ if __name__ == "__main__":
     try:
         test_new_simplified_format()
         test_backward_compatibility()
+        test_decode_many()
 
         print("\n🎉 Tous les tests réussis !")
         print("\n💡 Avantages du nouveau format :")
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test du démon d'ingestion d'un dossier de BOM
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import watch_folder
+from watch_folder import STATE_FILE_NAME, WatchFolderDaemon, is_bom_candidate
+
+
+def _write_bom(file_path, names):
+    with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
+        pd.DataFrame({
+            'Name': names,
+            'Description': [f"Résistance {name}" for name in names],
+            'ComponentType': 'Résistances',
+            'Manufacturer': 'Vishay',
+            'Manufacturer PN': [f"PN-{name}" for name in names],
+            'Quantity': 1,
+        }).to_excel(writer, sheet_name='BOM Électrique', index=False)
+
+
+def test_watch_folder():
+    """Attente de stabilité, sorties à côté du BOM, idempotence et reprise"""
+    print("📂 Test du démon d'ingestion")
+    print("=" * 50)
+
+    assert is_bom_candidate("BOM_V2.xlsx")
+    assert not is_bom_candidate("~$BOM_V2.xlsx")
+    assert not is_bom_candidate("SKU_BOM_V2.xlsx")
+    assert not is_bom_candidate("notes.txt")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inbox = os.path.join(tmp, "inbox")
+        os.mkdir(inbox)
+        db_path = os.path.join(tmp, "watch.db")
+        bom_file = os.path.join(inbox, "BOM_A.xlsx")
+        _write_bom(bom_file, ["R1", "R2", "R3"])
+
+        daemon = WatchFolderDaemon(inbox, db_path, workers=2, settle_seconds=5)
+        # Premier passage: fichier vu mais pas encore stable
+        assert daemon.scan(now=100.0) == 0
+        assert daemon.scan(now=102.0) == 0
+        # Stable depuis 5 s: mis en file une seule fois
+        assert daemon.scan(now=105.0) == 1
+        assert daemon.scan(now=110.0) == 0
+
+        daemon.start()
+        daemon.shutdown()
+        assert daemon.processed == 1
+        assert os.path.exists(os.path.join(inbox, "SKU_BOM_A.xlsx"))
+        odoo = pd.read_csv(os.path.join(inbox, "ODOO_BOM_A.csv"))
+        assert len(odoo) == 3
+        print("   ✅ BOM traité, sorties écrites à côté")
+
+        # Même contenu recopié sous un autre nom: déjà traité
+        shutil.copy(bom_file, os.path.join(inbox, "BOM_A_copie.xlsx"))
+        daemon = WatchFolderDaemon(inbox, db_path, settle_seconds=0)
+        daemon.run_once()
+        assert daemon.processed == 0
+        print("   ✅ Idempotence par empreinte du contenu")
+
+        # Arrêt pendant un traitement: repris au redémarrage
+        state_file = os.path.join(inbox, STATE_FILE_NAME)
+        bom_b = os.path.join(inbox, "BOM_B.xlsx")
+        _write_bom(bom_b, ["R10", "R11"])
+        interrupted = WatchFolderDaemon(inbox, db_path, settle_seconds=0)
+        interrupted.scan(now=0.0)
+        interrupted.scan(now=1.0)
+        with open(state_file, encoding='utf-8') as f:
+            assert 'en_attente' in [entry['statut'] for entry in json.load(f).values()]
+
+        daemon = WatchFolderDaemon(inbox, db_path, settle_seconds=0)
+        daemon.run_once()
+        assert daemon.processed == 1
+        assert len(pd.read_csv(os.path.join(inbox, "ODOO_BOM_B.csv"))) == 2
+        with open(state_file, encoding='utf-8') as f:
+            statuses = [entry['statut'] for entry in json.load(f).values()]
+        assert statuses == ['termine', 'termine']
+        print("   ✅ Reprise après arrêt")
+
+
+def test_scan_hashes_once():
+    """Un fichier inchangé n'est lu qu'une fois, quel que soit son statut"""
+    print("\n#️⃣ Test de la lecture unique des fichiers inchangés")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bom_file = os.path.join(tmp, "BOM_C.xlsx")
+        _write_bom(bom_file, ["R1", "R2"])
+        daemon = WatchFolderDaemon(tmp, os.path.join(tmp, "watch.db"), settle_seconds=5)
+
+        hashed = []
+        original_sha256 = watch_folder.file_sha256
+        watch_folder.file_sha256 = lambda path: hashed.append(path) or original_sha256(path)
+        try:
+            daemon.scan(now=100.0)
+            assert daemon.scan(now=105.0) == 1
+            # Statut final quelconque: les passages suivants ne relisent rien
+            daemon.checkpoint.update(daemon._observed[bom_file][3], fichier=bom_file, statut='echec')
+            for second in range(106, 136):
+                assert daemon.scan(now=float(second)) == 0
+            assert hashed == [bom_file]
+
+            # Contenu modifié: nouvelle attente de stabilité puis une seule lecture
+            _write_bom(bom_file, ["R1", "R2", "R3"])
+            os.utime(bom_file, ns=(10 ** 9, 10 ** 9))
+            assert daemon.scan(now=140.0) == 0
+            assert daemon.scan(now=145.0) == 1
+            assert daemon.scan(now=150.0) == 0
+            assert hashed == [bom_file, bom_file]
+        finally:
+            watch_folder.file_sha256 = original_sha256
+    print("   ✅ 2 lectures pour 33 passages")
+
+
+def test_run_once_waits_for_settling():
+    """--once: attendre les fichiers en cours d'écriture, au plus le délai, et signaler les autres"""
+    print("\n⏳ Test de l'exécution unique avec fichiers en cours d'écriture")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inbox = os.path.join(tmp, "inbox")
+        os.mkdir(inbox)
+        late_file = os.path.join(inbox, "BOM_D.xlsx")
+        busy_file = os.path.join(inbox, "BOM_E.xlsx")
+        _write_bom(late_file, ["R20"])
+        _write_bom(busy_file, ["R30"])
+
+        # BOM_D modifié pendant 1 s (plus que la stabilité), BOM_E jusqu'à la fin
+        stop = threading.Event()
+
+        def writer():
+            start, tick = time.monotonic(), 0
+            while not stop.wait(0.05):
+                tick += 1
+                if time.monotonic() - start < 1.0:
+                    os.utime(late_file, ns=(tick * 10 ** 9, tick * 10 ** 9))
+                os.utime(busy_file, ns=(tick * 10 ** 9, tick * 10 ** 9))
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            daemon = WatchFolderDaemon(inbox, os.path.join(tmp, "watch.db"), poll_interval=0.1, settle_seconds=0.3)
+            skipped = daemon.run_once(timeout=3)
+        finally:
+            stop.set()
+            thread.join()
+
+        assert daemon.processed == 1
+        assert os.path.exists(os.path.join(inbox, "ODOO_BOM_D.csv"))
+        assert skipped == [busy_file]
+        assert not os.path.exists(os.path.join(inbox, "ODOO_BOM_E.csv"))
+    print("   ✅ Fichier stabilisé tardivement traité, fichier instable signalé")
+
+
+if __name__ == "__main__":
+    test_watch_folder()
+    test_scan_hashes_once()
+    test_run_once_waits_for_settling()
+    print("\n🎉 Test terminé avec succès!")
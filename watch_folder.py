@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Démon d'ingestion d'un dossier partagé de BOM
+
+Le PLM dépose les exports Altium/SolidWorks dans un dossier; ce démon y détecte
+les nouveaux classeurs (watchdog/inotify si le module est installé, sinon
+scrutation périodique), attend qu'ils soient entièrement écrits (taille et date
+stables), puis génère les SKU et écrit SKU_<bom>.xlsx et ODOO_<bom>.csv à côté.
+
+- File de travail + `workers` threads: plusieurs BOM lus/exportés en parallèle,
+  la génération des SKU (compteurs SQLite) restant sérialisée.
+- Idempotence par empreinte SHA-256 du contenu: un fichier déjà traité, même
+  renommé ou recopié, n'est pas retraité.
+- Point de reprise JSON (écriture atomique): après un arrêt, les fichiers en
+  cours ou en attente sont repris, les fichiers terminés ignorés.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import db_backup
+from export_stage import ExportJob, run_export_stage
+from logging_setup import setup_logging
+from main import BOMProcessor
+from profiling import profiled
+from sku_generator import SKUGenerator
+import sku_journal
+
+logger = logging.getLogger(__name__)
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    HAS_WATCHDOG = True
+except ImportError:
+    HAS_WATCHDOG = False
+
+STATE_FILE_NAME = ".sku_watch_state.json"
+
+# Préfixes des fichiers produits par le démon (jamais réingérés)
+OUTPUT_PREFIXES = ("SKU_", "ODOO_")
+
+
+def file_sha256(file_path: str, block_size: int = 1024 * 1024) -> str:
+    """Empreinte du contenu, lue par blocs"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_bom_candidate(file_name: str) -> bool:
+    """Classeur déposé par le PLM (ni verrou Excel, ni fichier produit par le démon)"""
+    return (Path(file_name).suffix.lower() == '.xlsx'
+            and not file_name.startswith('~$')
+            and not file_name.startswith(OUTPUT_PREFIXES))
+
+
+class CheckpointStore:
+    """État persistant {sha256: {'fichier', 'statut', 'sorties', 'date', 'erreur'}}"""
+
+    def __init__(self, state_file: str):
+        self.state_file = state_file
+        self._lock = threading.Lock()
+        self.entries: Dict[str, dict] = {}
+        if os.path.exists(state_file):
+            with open(state_file, encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def status(self, digest: str) -> Optional[str]:
+        with self._lock:
+            entry = self.entries.get(digest)
+            return entry['statut'] if entry else None
+
+    def update(self, digest: str, **values):
+        with self._lock:
+            entry = self.entries.setdefault(digest, {})
+            entry.update(values, date=datetime.now().isoformat(timespec='seconds'))
+            # Écriture atomique: un arrêt brutal laisse l'ancien ou le nouvel état, jamais un mélange
+            tmp_file = f"{self.state_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.state_file)
+
+    def unfinished(self) -> Dict[str, str]:
+        """Fichiers en attente ou en cours au dernier arrêt: {sha256: chemin}"""
+        with self._lock:
+            return {digest: entry['fichier'] for digest, entry in self.entries.items()
+                    if entry.get('statut') in ('en_attente', 'en_cours')}
+
+
+class WatchFolderDaemon:
+    """Surveillance d'un dossier et traitement des BOM déposés"""
+
+    def __init__(self, directory: str, db_path: str = "sku_database.db", workers: int = 2,
+                 poll_interval: float = 2.0, settle_seconds: float = 3.0,
+                 state_file: Optional[str] = None, profile: bool = False):
+        self.directory = os.path.abspath(directory)
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.profile = profile  # Un profil (profiling.py) par fichier traité
+        self.checkpoint = CheckpointStore(state_file or os.path.join(self.directory, STATE_FILE_NAME))
+
+        self.generator = SKUGenerator(db_path)
+        self.processor = BOMProcessor(self.generator)
+        # Un seul lot de génération à la fois: les compteurs de séquence sont partagés
+        self._generation_lock = threading.Lock()
+
+        self._queue: "queue.Queue[Optional[Tuple[str, str]]]" = queue.Queue()
+        # chemin -> (taille, mtime_ns, stable depuis, sha256 une fois lu): un fichier n'est
+        # relu que si sa taille ou sa date change, pas à chaque passage
+        self._observed: Dict[str, Tuple[int, int, float, Optional[str]]] = {}
+        self._queued = set()
+        self._queued_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads = []
+        self._observer = None
+        self.processed = 0
+
+    # ---------- Détection ----------
+    def scan(self, now: Optional[float] = None) -> int:
+        """Un passage sur le dossier: met en file les fichiers stables. Retourne le nombre ajouté."""
+        now = time.monotonic() if now is None else now
+        added = 0
+        present = set()
+
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or not is_bom_candidate(entry.name):
+                continue
+            present.add(entry.path)
+            stat = entry.stat()
+            signature = (stat.st_size, stat.st_mtime_ns)
+
+            previous = self._observed.get(entry.path)
+            if previous is None or previous[:2] != signature:
+                # Nouveau ou encore en cours d'écriture: relancer l'attente
+                self._observed[entry.path] = (*signature, now, None)
+                continue
+            if previous[3] is not None:
+                # Contenu déjà identifié (en file, traité ou en échec) et inchangé
+                continue
+            if now - previous[2] < self.settle_seconds:
+                continue
+            try:
+                # Fichier encore verrouillé par l'écrivain (Windows): réessayé au prochain passage
+                digest = file_sha256(entry.path)
+            except OSError:
+                continue
+            self._observed[entry.path] = (*signature, previous[2], digest)
+            if self._enqueue_if_new(entry.path, digest):
+                added += 1
+
+        for path in list(self._observed):
+            if path not in present:
+                del self._observed[path]
+        return added
+
+    def pending(self) -> List[str]:
+        """Fichiers vus mais pas encore identifiés (en cours d'écriture ou d'attente de stabilité)"""
+        return sorted(path for path, observed in self._observed.items() if observed[3] is None)
+
+    def _enqueue_if_new(self, file_path: str, digest: str) -> bool:
+        with self._queued_lock:
+            if digest in self._queued or self.checkpoint.status(digest) in ('termine', 'echec'):
+                return False
+            self._queued.add(digest)
+
+        self.checkpoint.update(digest, fichier=file_path, statut='en_attente')
+        self._queue.put((file_path, digest))
+        logger.info(f"BOM en file: {Path(file_path).name}")
+        return True
+
+    # ---------- Traitement ----------
+    def output_files(self, file_path: str) -> Dict[str, str]:
+        stem = Path(file_path).stem
+        folder = os.path.dirname(file_path)
+        return {
+            'excel': os.path.join(folder, f"SKU_{stem}.xlsx"),
+            'odoo_csv': os.path.join(folder, f"ODOO_{stem}.csv"),
+        }
+
+    def process_file(self, file_path: str, digest: str):
+        """Générer les SKU d'un BOM et écrire ses sorties à côté de lui"""
+        self.checkpoint.update(digest, fichier=file_path, statut='en_cours')
+        start = time.perf_counter()
+        try:
+            components_by_domain = self.processor.extract_components_from_bom(file_path)
+            with self._generation_lock:
+                results = self.processor.generate_skus_for_selected_components(components_by_domain)
+
+            outputs = self.output_files(file_path)
+            report = run_export_stage(results, [ExportJob(name, path) for name, path in outputs.items()])
+            errors = {name: entry['erreur'] for name, entry in report['formats'].items() if entry['erreur']}
+            if errors:
+                raise RuntimeError(f"Exports en échec: {errors}")
+
+            total = sum(len(df) for df in results.values())
+            self.checkpoint.update(digest, fichier=file_path, statut='termine',
+                                   sorties=list(outputs.values()), composants=total)
+            self.processed += 1
+            logger.info(f"BOM traité: {Path(file_path).name} ({total} composants, "
+                        f"{time.perf_counter() - start:.1f} s)")
+        except Exception as e:
+            self.checkpoint.update(digest, fichier=file_path, statut='echec', erreur=str(e))
+            logger.error(f"Échec du traitement de {Path(file_path).name}: {e}")
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                with profiled(f"watch_{Path(item[0]).stem}", self.profile):
+                    self.process_file(*item)
+            finally:
+                self._queue.task_done()
+
+    # ---------- Cycle de vie ----------
+    def _resume_unfinished(self):
+        """Reprendre les fichiers interrompus par l'arrêt précédent"""
+        for digest, file_path in self.checkpoint.unfinished().items():
+            if os.path.exists(file_path) and file_sha256(file_path) == digest:
+                with self._queued_lock:
+                    if digest in self._queued:
+                        continue
+                    self._queued.add(digest)
+                self._queue.put((file_path, digest))
+                logger.info(f"Reprise: {Path(file_path).name}")
+            else:
+                self.checkpoint.update(digest, fichier=file_path, statut='abandonne')
+
+    def _start_observer(self):
+        if not HAS_WATCHDOG:
+            return
+
+        daemon = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                daemon._wake.set()
+
+        self._observer = Observer()
+        self._observer.schedule(_Handler(), self.directory, recursive=False)
+        self._observer.start()
+
+    def start(self):
+        self._resume_unfinished()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"watch-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._start_observer()
+
+    def run(self):
+        """Boucle principale jusqu'à stop()"""
+        self.start()
+        mode = "inotify/watchdog" if self._observer else f"scrutation toutes les {self.poll_interval} s"
+        logger.info(f"Surveillance de {self.directory} ({mode}, {self.workers} traitement(s) en parallèle)")
+        try:
+            while not self._stop.is_set():
+                self.scan()
+                # Un événement réveille la boucle; sinon délai d'attente de stabilité
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+        finally:
+            self.shutdown()
+
+    def run_once(self, timeout: float = 60.0) -> List[str]:
+        """
+        Traiter les BOM présents puis s'arrêter (tâche planifiée). Les passages
+        continuent tant qu'un fichier attend sa stabilité, au plus `timeout`
+        secondes. Retourne les fichiers laissés pour la prochaine exécution.
+        """
+        self.start()
+        deadline = time.monotonic() + timeout
+        interval = max(min(self.poll_interval, self.settle_seconds), 0.05)
+        try:
+            self.scan()
+            while self.pending() and time.monotonic() < deadline and not self._stop.is_set():
+                self._stop.wait(interval)
+                self.scan()
+            skipped = self.pending()
+            for file_path in skipped:
+                logger.warning(f"BOM non stable après {timeout:.0f} s, laissé pour la prochaine exécution: "
+                               f"{Path(file_path).name}")
+        finally:
+            self.shutdown()
+        return skipped
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def shutdown(self):
+        """Terminer les fichiers en file puis arrêter les threads"""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+
+def main():
+    """Point d'entrée: python watch_folder.py DOSSIER"""
+    parser = argparse.ArgumentParser(description="Ingestion automatique des BOM d'un dossier")
+    parser.add_argument("directory", help="Dossier surveillé")
+    parser.add_argument("--db", dest="db_path", default="sku_database.db", help="Base de données SKU")
+    parser.add_argument("--workers", type=int, default=2, help="BOM traités en parallèle")
+    parser.add_argument("--poll", type=float, default=2.0, help="Intervalle de scrutation (s)")
+    parser.add_argument("--settle", type=float, default=3.0, help="Durée de stabilité avant traitement (s)")
+    parser.add_argument("--state", help=f"Fichier de reprise (défaut: DOSSIER/{STATE_FILE_NAME})")
+    parser.add_argument("--once", action="store_true", help="Traiter les fichiers présents puis quitter")
+    parser.add_argument("--once-timeout", type=float, default=60.0,
+                        help="Avec --once: attente maximale des fichiers en cours d'écriture (s)")
+    parser.add_argument("--profile", action="store_true", help="Enregistrer un profil par fichier traité")
+    args = parser.parse_args()
+
+    setup_logging()
+
+    if not os.path.isdir(args.directory):
+        logger.error(f"Dossier introuvable: {args.directory}")
+        return 1
+
+    daemon = WatchFolderDaemon(args.directory, args.db_path, args.workers,
+                               args.poll, args.settle, args.state, args.profile)
+    db_backup.enable_auto_backup(args.db_path)
+    sku_journal.enable_journal(args.db_path)
+    if args.once:
+        daemon.run_once(args.once_timeout)
+        return 0
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: daemon.stop())
+    daemon.run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())